@@ -0,0 +1,127 @@
+# ConfigSyncDialog.py
+
+import logging
+import os
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QLabel, QFileDialog, \
+    QTableWidget, QTableWidgetItem, QCheckBox, QHeaderView, QMessageBox
+from config_sync import ConfigSyncThread
+
+
+class ConfigSyncDialog(QDialog):
+    """Синхронизация локального каталога конфигурации Klipper на выбранные принтеры."""
+
+    COL_NAME, COL_HOST, COL_STATUS = range(3)
+
+    def __init__(self, records, network_utils, cache, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Синхронизация конфигурации")
+        self.setGeometry(100, 100, 820, 520)
+        self.setModal(True)
+        self.network_utils = network_utils
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+        self.sync_thread = None
+        self.rows = {}
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Каталог с файлами конфигурации (структура как в корне config на принтере):"))
+        directory_layout = QHBoxLayout()
+        self.directory_input = QLineEdit()
+        self.directory_input.setReadOnly(True)
+        self.directory_input.setPlaceholderText("Каталог не выбран")
+        directory_layout.addWidget(self.directory_input)
+        browse_button = QPushButton("Выбрать...")
+        browse_button.clicked.connect(self.choose_directory)
+        directory_layout.addWidget(browse_button)
+        layout.addLayout(directory_layout)
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Имя", "Хост", "Статус"])
+        self.table.horizontalHeader().setSectionResizeMode(self.COL_STATUS, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        for record in records:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            name_item = QTableWidgetItem(record.display_name)
+            name_item.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
+            name_item.setCheckState(Qt.CheckState.Checked if record.online else Qt.CheckState.Unchecked)
+            self.table.setItem(row, self.COL_NAME, name_item)
+            self.table.setItem(row, self.COL_HOST, QTableWidgetItem(record.address))
+            self.table.setItem(row, self.COL_STATUS, QTableWidgetItem(""))
+            self.rows[record.address] = row
+        layout.addWidget(self.table)
+
+        self.dry_run_checkbox = QCheckBox("Только сравнить, ничего не загружать")
+        layout.addWidget(self.dry_run_checkbox)
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.sync_button = QPushButton("Синхронизировать")
+        self.sync_button.clicked.connect(self.start_sync)
+        button_layout.addWidget(self.sync_button)
+        self.cancel_button = QPushButton("Отменить")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_sync)
+        button_layout.addWidget(self.cancel_button)
+        close_button = QPushButton("Закрыть")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+        # finished приходит и при закрытии окна, и по Escape (reject), минуя closeEvent
+        self.finished.connect(self.stop_sync)
+
+    def choose_directory(self):
+        directory = QFileDialog.getExistingDirectory(self, "Выберите каталог конфигурации")
+        if directory:
+            self.directory_input.setText(directory)
+
+    def selected_hosts(self):
+        return [host for host, row in self.rows.items()
+                if self.table.item(row, self.COL_NAME).checkState() == Qt.CheckState.Checked]
+
+    def start_sync(self):
+        directory = self.directory_input.text()
+        hosts = self.selected_hosts()
+        if not directory or not os.path.isdir(directory):
+            QMessageBox.warning(self, "Ошибка", "Выберите каталог конфигурации.")
+            return
+        if not hosts:
+            QMessageBox.warning(self, "Ошибка", "Выберите хотя бы один принтер.")
+            return
+        for host in hosts:
+            self.table.item(self.rows[host], self.COL_STATUS).setText("В очереди")
+        self.summary_label.setText("")
+        self.sync_thread = ConfigSyncThread(directory, hosts, self.network_utils, self.cache,
+                                            dry_run=self.dry_run_checkbox.isChecked())
+        self.sync_thread.host_progress.connect(self.update_status)
+        self.sync_thread.host_finished.connect(self.host_finished)
+        self.sync_thread.sync_finished.connect(self.sync_finished)
+        self.sync_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.sync_thread.start()
+        self.logger.debug(f"Started config sync of {directory} to {hosts}")
+
+    def update_status(self, host, text):
+        self.table.item(self.rows[host], self.COL_STATUS).setText(text)
+
+    def host_finished(self, host, ok, message, files, size):
+        self.table.item(self.rows[host], self.COL_STATUS).setText(message if ok else f"Ошибка: {message}")
+
+    def sync_finished(self, succeeded, total, files, size, duration):
+        self.sync_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.summary_label.setText(f"Готово за {duration:.1f} с: успешно {succeeded} из {total} принтеров, "
+                                   f"загружено файлов {files} ({size / 1024:.1f} КБ).")
+
+    def cancel_sync(self):
+        if self.sync_thread is not None:
+            self.sync_thread.cancel()
+
+    def stop_sync(self):
+        if self.sync_thread is not None and self.sync_thread.isRunning():
+            self.sync_thread.cancel()
+            self.sync_thread.wait()
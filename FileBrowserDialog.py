@@ -0,0 +1,165 @@
+# FileBrowserDialog.py
+
+import logging
+from PyQt6.QtCore import Qt, QTimer, QSortFilterProxyModel
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QLabel, QTableView, \
+    QHeaderView, QAbstractItemView, QMessageBox
+from file_browser import RemoteFileModel, SORT_ROLE
+from utils import FILE_BROWSER_REFRESH_MS
+
+ROOT = "gcodes"
+
+
+class FileBrowserDialog(QDialog):
+    """Немодальный просмотр G-code файлов принтера с печатью и удалением.
+
+    Каталог сначала показывается из кэша, затем сверяется со свежим листингом;
+    пока окно открыто, листинг перепроверяется раз в FILE_BROWSER_REFRESH_MS.
+    """
+
+    def __init__(self, host, title, network_utils, cache, loader, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Файлы: {title}")
+        self.setGeometry(100, 100, 760, 560)
+        self.host = host
+        self.network_utils = network_utils
+        self.cache = cache
+        self.loader = loader
+        self.path = ROOT
+        self.logger = logging.getLogger(__name__)
+
+        layout = QVBoxLayout()
+        path_layout = QHBoxLayout()
+        self.up_button = QPushButton("Вверх")
+        self.up_button.clicked.connect(self.go_up)
+        path_layout.addWidget(self.up_button)
+        self.path_label = QLabel()
+        path_layout.addWidget(self.path_label, 1)
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Фильтр по имени")
+        path_layout.addWidget(self.filter_input)
+        layout.addLayout(path_layout)
+
+        self.model = RemoteFileModel(self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(SORT_ROLE)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.proxy.setFilterKeyColumn(RemoteFileModel.COL_NAME)
+        self.filter_input.textChanged.connect(self.proxy.setFilterFixedString)
+        self.view = QTableView()
+        self.view.setModel(self.proxy)
+        self.view.setSortingEnabled(True)
+        self.view.sortByColumn(RemoteFileModel.COL_NAME, Qt.SortOrder.AscendingOrder)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.view.verticalHeader().setVisible(False)
+        # Одинаковая высота строк: представлению не нужно измерять каждую строку большого каталога
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.view.horizontalHeader().setSectionResizeMode(RemoteFileModel.COL_NAME, QHeaderView.ResizeMode.Stretch)
+        self.view.doubleClicked.connect(self.open_index)
+        layout.addWidget(self.view)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        button_layout = QHBoxLayout()
+        refresh_button = QPushButton("Обновить")
+        refresh_button.clicked.connect(self.refresh)
+        button_layout.addWidget(refresh_button)
+        print_button = QPushButton("Печать")
+        print_button.clicked.connect(self.print_selected)
+        button_layout.addWidget(print_button)
+        delete_button = QPushButton("Удалить")
+        delete_button.clicked.connect(self.delete_selected)
+        button_layout.addWidget(delete_button)
+        button_layout.addStretch()
+        close_button = QPushButton("Закрыть")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.loader.listed.connect(self.on_listed)
+        self.loader.action_finished.connect(self.on_action_finished)
+        self.finished.connect(self.disconnect_loader)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(FILE_BROWSER_REFRESH_MS)
+        self.open_path(ROOT)
+
+    def disconnect_loader(self):
+        self.refresh_timer.stop()
+        self.loader.listed.disconnect(self.on_listed)
+        self.loader.action_finished.disconnect(self.on_action_finished)
+
+    def open_path(self, path):
+        self.path = path
+        self.path_label.setText(f"/{path}")
+        self.up_button.setEnabled(path != ROOT)
+        self.filter_input.clear()
+        cached = self.cache.get(self.host, path)
+        self.model.set_listing(cached or {})
+        self.status_label.setText("Из кэша, проверяется..." if cached is not None else "Загрузка...")
+        self.refresh()
+
+    def refresh(self):
+        self.loader.request(self.host, self.path)
+
+    def on_listed(self, host, path, entries):
+        if host != self.host or path != self.path:
+            return
+        if entries is None:
+            self.status_label.setText("Не удалось получить список файлов.")
+            return
+        added, removed, changed = self.model.apply_listing(entries)
+        if added or removed or changed or self.cache.get(host, path) is None:
+            self.cache.put(host, path, entries)
+        self.status_label.setText(f"Файлов и каталогов: {len(entries)}"
+                                  + (f" (изменения: +{added} −{removed} ~{changed})"
+                                     if added or removed or changed else ""))
+
+    def open_index(self, index):
+        name, (is_dir, _, _) = self.model.entry(self.proxy.mapToSource(index).row())
+        if is_dir:
+            self.open_path(f"{self.path}/{name}")
+
+    def go_up(self):
+        if self.path != ROOT:
+            self.open_path(self.path.rsplit("/", 1)[0])
+
+    def selected_entries(self):
+        rows = {self.proxy.mapToSource(index).row() for index in self.view.selectionModel().selectedRows()}
+        return [self.model.entry(row) for row in sorted(rows)]
+
+    def print_selected(self):
+        files = [name for name, (is_dir, _, _) in self.selected_entries() if not is_dir]
+        if len(files) != 1:
+            QMessageBox.warning(self, "Печать", "Выберите один файл.")
+            return
+        # Путь для печати задаётся относительно корня gcodes
+        filename = f"{self.path}/{files[0]}".split("/", 1)[1]
+        reply = QMessageBox.question(self, "Печать", f"Начать печать {filename}?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            self.loader.submit_action(self.host, f"Печать {filename}", self.network_utils.start_print_file,
+                                      self.host, filename)
+
+    def delete_selected(self):
+        files = [name for name, (is_dir, _, _) in self.selected_entries() if not is_dir]
+        if not files:
+            QMessageBox.warning(self, "Удаление", "Выберите файлы (каталоги не удаляются).")
+            return
+        reply = QMessageBox.question(self, "Удаление", f"Удалить файлов: {len(files)}?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        for name in files:
+            self.loader.submit_action(self.host, f"Удаление {name}", self.network_utils.delete_file,
+                                      self.host, f"{self.path}/{name}")
+
+    def on_action_finished(self, host, description, ok):
+        if host != self.host:
+            return
+        self.status_label.setText(f"{description}: {'готово' if ok else 'ошибка'}")
+        self.logger.debug(f"{description} on {host}: ok={ok}")
+        self.refresh()
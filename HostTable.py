@@ -1,18 +1,26 @@
 from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView, QPushButton, QWidget, QHBoxLayout, QMessageBox
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtGui import QIcon, QPixmap
 import logging
+import time
+from utils import JOB_THUMBNAIL_ICON_SIZE
 
 
 class HostTable(QTableWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setColumnCount(6)
-        self.setHorizontalHeaderLabels(["Имя", "Хост", "SSH", "Статус", "Камера", ""])
+        self.setColumnCount(7)
+        self.setHorizontalHeaderLabels(["Имя", "Хост", "SSH", "Статус", "Задание", "Камера", ""])
         self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.verticalHeader().setVisible(False)
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.parent = parent
         self.expanded_rows = {}  # Словарь для отслеживания открытых строк {host: row_index}
+        self.host_details = {}  # Поля расширенного статуса {host: {field: value}}
+        self.job_info = {}  # Сведения о текущем файле из кэша заданий {host: info}
+        self._thumbnails = {}  # Декодированные миниатюры {путь: QIcon}, только для показанных строк
+        self.setIconSize(QSize(JOB_THUMBNAIL_ICON_SIZE, JOB_THUMBNAIL_ICON_SIZE))
+        self.verticalScrollBar().valueChanged.connect(self.load_visible_thumbnails)
         self.logger = logging.getLogger(__name__)
 
         # Индексы колонок
@@ -20,18 +28,20 @@ class HostTable(QTableWidget):
         self.COL_HOST = 1
         self.COL_SSH = 2
         self.COL_STATE = 3
-        self.COL_CAMERA = 4
-        self.COL_ACTIONS = 5
+        self.COL_DETAILS = 4
+        self.COL_CAMERA = 5
+        self.COL_ACTIONS = 6
+        self.setColumnHidden(self.COL_DETAILS, True)
 
-    def add_host(self, row, host, hostname, state, known_hosts):
+    def add_host(self, row, record):
         """Добавляет хост в таблицу."""
-        host_info = known_hosts.get(host, {})
-        custom_name = host_info.get("custom_name") if host_info.get("custom_name") is not None else hostname
+        host = record.address
         items = [
-            QTableWidgetItem(f"▶ {custom_name}"),  # Добавляем треугольник
-            QTableWidgetItem(f"{'🟢' if state != 'Оффлайн' else '🔴'} {host}"),
-            QTableWidgetItem("Подключиться"),
-            QTableWidgetItem(state),
+            QTableWidgetItem(f"▶ {record.display_name}"),  # Добавляем треугольник
+            QTableWidgetItem(self.format_host(record)),
+            QTableWidgetItem(self.format_ssh(record)),
+            QTableWidgetItem(record.state),
+            QTableWidgetItem(self.format_details(self.host_details.get(host, {}))),
             QTableWidgetItem("Открыть")
         ]
         for item in items:
@@ -39,14 +49,19 @@ class HostTable(QTableWidget):
             item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
         for j, item in enumerate(items):
             self.setItem(row, j, item)
+        items[self.COL_DETAILS].setToolTip(self.format_job_tooltip(self.job_info.get(host)))
 
         items[self.COL_NAME].setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
         items[self.COL_HOST].setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
+        # Адрес хранится в данных ячейки, а не извлекается из отображаемого текста
+        items[self.COL_HOST].setData(Qt.ItemDataRole.UserRole, host)
+        items[self.COL_HOST].setToolTip(self.format_host_tooltip(record))
+        items[self.COL_SSH].setToolTip(self.format_ssh_tooltip(record))
 
         delete_button = QPushButton("Удалить")
         delete_button.setFixedWidth(100)
         delete_button.setStyleSheet("background-color: #ff4d4d; color: white;")
-        delete_button.clicked.connect(lambda: self.parent.delete_host(host, row))
+        delete_button.clicked.connect(lambda: self.parent.delete_host(host))
 
         container = QWidget()
         layout = QHBoxLayout(container)
@@ -55,38 +70,158 @@ class HostTable(QTableWidget):
         layout.addStretch()
         layout.setContentsMargins(0, 0, 0, 0)
         self.setCellWidget(row, self.COL_ACTIONS, container)
+        if host in self.job_info:
+            self.load_visible_thumbnails()
 
-    def update_host_state(self, host, hostname, state, known_hosts):
+    def update_host_state(self, record):
         """Обновляет состояние хоста в таблице или добавляет новый."""
-        for row in range(self.rowCount()):
-            if self.item(row, self.COL_HOST) and self.item(row, self.COL_HOST).text().lstrip('🟢🔴 ').strip() == host:
-                host_info = known_hosts.get(host, {})
-                custom_name = host_info.get("custom_name") if host_info.get("custom_name") is not None else hostname
-                # Сохраняем состояние треугольника
-                triangle = "▼" if host in self.expanded_rows else "▶"
-                item_name = QTableWidgetItem(f"{triangle} {custom_name}")
-                item_host = QTableWidgetItem(f"{'🟢' if state != 'Оффлайн' else '🔴'} {host}")
-                item_state = QTableWidgetItem(state)
-                item_state.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.setItem(row, self.COL_NAME, item_name)
-                self.setItem(row, self.COL_HOST, item_host)
-                self.setItem(row, self.COL_STATE, item_state)
-                delete_button = QPushButton("Удалить")
-                delete_button.setFixedWidth(100)
-                delete_button.setStyleSheet("background-color: #ff4d4d; color: white;")
-                delete_button.clicked.connect(lambda: self.parent.delete_host(host, row))
-                container = QWidget()
-                layout = QHBoxLayout(container)
-                layout.addStretch()
-                layout.addWidget(delete_button)
-                layout.addStretch()
-                layout.setContentsMargins(0, 0, 0, 0)
-                self.setCellWidget(row, self.COL_ACTIONS, container)
-                return True
-        row = self.rowCount()
-        self.insertRow(row)
-        self.add_host(row, host, hostname, state, known_hosts)
-        return False
+        row = self.find_host_row(record.address)
+        if row is None:
+            row = self.rowCount()
+            self.insertRow(row)
+            self.add_host(row, record)
+            return False
+        # Сохраняем состояние треугольника
+        triangle = "▼" if record.address in self.expanded_rows else "▶"
+        self._set_text(row, self.COL_NAME, f"{triangle} {record.display_name}")
+        self._set_text(row, self.COL_HOST, self.format_host(record))
+        self._set_text(row, self.COL_STATE, record.state)
+        self._set_text(row, self.COL_SSH, self.format_ssh(record))
+        self.item(row, self.COL_HOST).setToolTip(self.format_host_tooltip(record))
+        self.item(row, self.COL_SSH).setToolTip(self.format_ssh_tooltip(record))
+        return True
+
+    def _set_text(self, row, column, text):
+        item = self.item(row, column)
+        if item.text() != text:
+            item.setText(text)
+
+    @staticmethod
+    def format_host(record):
+        return f"{'🟢' if record.online else '🔴'} {record.address}"
+
+    @staticmethod
+    def format_host_tooltip(record):
+        parts = []
+        if record.latency is not None:
+            parts.append(f"RTT: {record.latency * 1000:.1f} мс")
+        if record.last_seen is not None:
+            parts.append(f"Последний ответ: {time.strftime('%H:%M:%S', time.localtime(record.last_seen))}")
+        return "\n".join(parts)
+
+    @staticmethod
+    def format_ssh(record):
+        return "Недоступен" if record.ssh is False else "Подключиться"
+
+    @staticmethod
+    def format_ssh_tooltip(record):
+        if record.ssh is None:
+            return "Доступность SSH ещё не проверялась"
+        return "SSH-порт отвечал при последней проверке" if record.ssh else "SSH-порт не отвечал при последней проверке"
+
+    def _display_name(self, host):
+        record = self.parent.known_hosts.get(host)
+        return record.display_name if record is not None else host
+
+    def host_at(self, row):
+        """Адрес хоста основной строки или None для строки управления."""
+        item = self.item(row, self.COL_HOST)
+        return item.data(Qt.ItemDataRole.UserRole) if item is not None else None
+
+    def set_details_visible(self, visible):
+        self.setColumnHidden(self.COL_DETAILS, not visible)
+        self.load_visible_thumbnails()
+
+    @staticmethod
+    def format_details(details):
+        """Форматирует поля расширенного статуса для ячейки «Задание»."""
+        parts = []
+        if details.get("progress") is not None:
+            parts.append(f"{details['progress'] * 100:.0f}%")
+        if details.get("filename"):
+            parts.append(details["filename"])
+        if details.get("eta") is not None:
+            parts.append(f"~{int(details['eta']) // 60} мин")
+        if details.get("print_duration"):
+            parts.append(f"{int(details['print_duration']) // 60} мин печати")
+        for field, label in (("extruder", "E"), ("heater_bed", "B")):
+            value = details.get(field)
+            if value and value[0] is not None:
+                parts.append(f"{label} {value[0]}/{value[1] if value[1] is not None else '—'}°")
+        return " · ".join(parts)
+
+    def update_host_details(self, host, changes):
+        """Применяет только изменившиеся поля статуса и перерисовывает одну ячейку."""
+        details = self.host_details.setdefault(host, {})
+        for field, value in changes.items():
+            if value is None:
+                details.pop(field, None)
+            else:
+                details[field] = value
+        row = self.find_host_row(host)
+        if row is None:
+            return
+        item = self.item(row, self.COL_DETAILS)
+        text = self.format_details(details)
+        if item is None:
+            item = QTableWidgetItem(text)
+            item.setFlags(Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled)
+            self.setItem(row, self.COL_DETAILS, item)
+        elif item.text() != text:
+            item.setText(text)
+
+    @staticmethod
+    def format_job_tooltip(info):
+        if not info:
+            return ""
+        parts = [info["filename"]]
+        if info.get("estimated_time"):
+            minutes = int(info["estimated_time"]) // 60
+            parts.append(f"Оценка слайсера: {minutes // 60} ч {minutes % 60} мин")
+        if info.get("size"):
+            parts.append(f"Размер: {info['size'] / 1048576:.1f} МБ")
+        return "\n".join(parts)
+
+    def update_job_info(self, host, info):
+        """Сохраняет сведения о задании; миниатюра декодируется, только когда строка видна."""
+        if info is None:
+            self.job_info.pop(host, None)
+        else:
+            self.job_info[host] = info
+        row = self.find_host_row(host)
+        if row is None or self.item(row, self.COL_DETAILS) is None:
+            return
+        item = self.item(row, self.COL_DETAILS)
+        item.setToolTip(self.format_job_tooltip(info))
+        item.setIcon(QIcon())
+        self.load_visible_thumbnails()
+
+    def load_visible_thumbnails(self):
+        if self.isColumnHidden(self.COL_DETAILS) or not self.job_info:
+            return
+        first = self.rowAt(0)
+        last = self.rowAt(self.viewport().height() - 1)
+        if first < 0:
+            return
+        if last < 0:
+            last = self.rowCount() - 1
+        for row in range(first, last + 1):
+            host = self.host_at(row)
+            info = self.job_info.get(host)
+            item = self.item(row, self.COL_DETAILS)
+            if not info or not info.get("thumbnail") or item is None or not item.icon().isNull():
+                continue
+            path = info["thumbnail"]
+            if path not in self._thumbnails:
+                pixmap = QPixmap(path)
+                if pixmap.isNull():
+                    continue
+                self._thumbnails[path] = QIcon(pixmap)
+            item.setIcon(self._thumbnails[path])
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.load_visible_thumbnails()
 
     def toggle_control_row(self, host):
         """Переключает отображение строки с кнопками управления."""
@@ -102,7 +237,7 @@ class HostTable(QTableWidget):
             del self.expanded_rows[host]
             name_item = self.item(main_row, 0)  # Имя — теперь колонка 0
             if name_item:
-                name_item.setText(f"▶ {name_item.text().lstrip('▼ ')}")
+                name_item.setText(f"▶ {self._display_name(host)}")
             self.logger.debug(f"Collapsed control row for host {host}")
         else:
             # --- Показываем строку ---
@@ -113,7 +248,7 @@ class HostTable(QTableWidget):
             # Меняем треугольник на ▼
             name_item = self.item(main_row, 0)  # Имя — теперь колонка 0
             if name_item:
-                name_item.setText(f"▼ {name_item.text().lstrip('▶ ')}")
+                name_item.setText(f"▼ {self._display_name(host)}")
 
             # Контейнер с кнопками
             container = QWidget()
@@ -142,7 +277,7 @@ class HostTable(QTableWidget):
     def find_host_row(self, host):
         """Возвращает индекс основной строки по хосту."""
         for r in range(self.rowCount()):
-            if self.item(r, self.COL_HOST) and self.item(r, self.COL_HOST).text().lstrip('🟢🔴 ').strip() == host:
+            if self.host_at(r) == host:
                 return r
         return None
 
@@ -152,8 +287,9 @@ class HostTable(QTableWidget):
             success, status_code = self.parent.network_utils.send_printer_command(host, command)
             if success:
                 self.logger.debug(f"Successfully sent {command} command to {host}")
-                hostname, state = self.parent.network_utils.get_printer_info(host)
-                self.parent.add_host_to_table(host, hostname, state)
+                # Состояние изменилось: сбрасываем кэш и обновляем в фоне, не блокируя интерфейс
+                self.parent.network_utils.printer_info_cache.invalidate(host)
+                self.parent.refresh_hosts(auto=True)
             else:
                 status_text = status_code if status_code is not None else "unknown"
                 self.logger.error(f"Failed to send {command} command to {host}: {status_text}")
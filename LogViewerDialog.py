@@ -0,0 +1,84 @@
+# LogViewerDialog.py
+
+from PyQt6.QtGui import QTextCursor, QFontDatabase
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTabWidget, QPlainTextEdit, QCheckBox
+from utils import LOG_VIEW_MAX_LINES
+
+
+class LogViewerDialog(QDialog):
+    """Немодальное окно с хвостами klippy.log нескольких принтеров, по вкладке на хост."""
+
+    def __init__(self, follower, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Логи принтеров")
+        self.setGeometry(100, 100, 900, 600)
+        self.follower = follower
+        self.views = {}
+
+        layout = QVBoxLayout()
+        self.tabs = QTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.tabs.tabCloseRequested.connect(self.close_tab)
+        layout.addWidget(self.tabs)
+
+        button_layout = QHBoxLayout()
+        self.autoscroll_checkbox = QCheckBox("Прокручивать к новым строкам")
+        self.autoscroll_checkbox.setChecked(True)
+        button_layout.addWidget(self.autoscroll_checkbox)
+        button_layout.addStretch()
+        close_button = QPushButton("Закрыть")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.follower.text_received.connect(self.append_text)
+        # finished приходит и при закрытии кнопкой, и по Escape (reject), минуя closeEvent
+        self.finished.connect(self.unfollow_all)
+
+    def open_host(self, host, title):
+        if host not in self.views:
+            view = QPlainTextEdit()
+            view.setReadOnly(True)
+            view.setMaximumBlockCount(LOG_VIEW_MAX_LINES)
+            view.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+            self.views[host] = view
+            self.tabs.addTab(view, title)
+            # Закэшированный хвост показывается сразу, новые строки догружаются по Range
+            view.setPlainText(self.follower.follow(host))
+            view.moveCursor(QTextCursor.MoveOperation.End)
+        self.tabs.setCurrentWidget(self.views[host])
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def append_text(self, host, text, reset):
+        view = self.views.get(host)
+        if view is None:
+            return
+        if reset:
+            view.setPlainText(text)
+        elif text:
+            scrollbar = view.verticalScrollBar()
+            at_bottom = scrollbar.value() == scrollbar.maximum()
+            cursor = QTextCursor(view.document())
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(text)
+            if not (self.autoscroll_checkbox.isChecked() and at_bottom):
+                return
+        if self.autoscroll_checkbox.isChecked():
+            view.moveCursor(QTextCursor.MoveOperation.End)
+
+    def close_tab(self, index):
+        view = self.tabs.widget(index)
+        host = next((h for h, v in self.views.items() if v is view), None)
+        self.tabs.removeTab(index)
+        if host is not None:
+            del self.views[host]
+            self.follower.unfollow(host)
+
+    def unfollow_all(self):
+        for host in list(self.views):
+            self.follower.unfollow(host)
+        self.views.clear()
+        self.tabs.clear()
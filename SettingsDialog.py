@@ -1,13 +1,20 @@
-import ipaddress
 import json
 import logging
 import os
 
-from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTabWidget, QWidget, QPushButton, QListWidget, QInputDialog, QMessageBox, QCheckBox, QLineEdit, QLabel, QComboBox, QTextEdit, QHBoxLayout
+from hosts import hosts_from_config
+from network import STATUS_FIELDS, DEFAULT_STATUS_FIELDS
+from scan_plan import ScanPlan, parse_subnet
+from profiling import format_report
+from utils import SCAN_SHARD_MIN_HOSTS, DISCOVERY_PASS_PAUSE_S, DEFAULT_DISCOVERY_PPS, DEFAULT_TELEMETRY_INTERVAL_S
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTabWidget, QWidget, QPushButton, QListWidget, QInputDialog, QMessageBox, QCheckBox, QLineEdit, QLabel, QComboBox, QTextEdit, QHBoxLayout, QSpinBox
 
 class SettingsDialog(QDialog):
     """Модальное окно настроек с вкладками."""
-    def __init__(self, subnets, notification_states, ssh_user, log_level, config_manager, parent=None):
+    def __init__(self, subnets, notification_states, ssh_user, log_level, config_manager, parent=None,
+                 scan_rate_limit=0, metrics_port=0, api_port=0, rich_status=False, status_fields=None,
+                 scan_processes=0, discovery_pps=0, export_sinks=None, coordination_port=0,
+                 telemetry_interval=0):
         super().__init__(parent)
         self.setWindowTitle("Настройки")
         # Устанавливаем размер окна таким же, как у MainWindow
@@ -20,6 +27,16 @@ class SettingsDialog(QDialog):
         self.notification_states = notification_states.copy()
         self.ssh_user = ssh_user
         self.log_level = log_level
+        self.scan_rate_limit = scan_rate_limit
+        self.scan_processes = scan_processes
+        self.discovery_pps = discovery_pps
+        self.metrics_port = metrics_port
+        self.api_port = api_port
+        self.export_sinks = list(export_sinks) if export_sinks is not None else []
+        self.coordination_port = coordination_port
+        self.telemetry_interval = telemetry_interval
+        self.rich_status = rich_status
+        self.status_fields = list(status_fields) if status_fields is not None else list(DEFAULT_STATUS_FIELDS)
         self.config_manager = config_manager
         self.logger = logging.getLogger(__name__)
 
@@ -41,6 +58,21 @@ class SettingsDialog(QDialog):
         self.setup_ssh_tab()
         self.tabs.addTab(self.ssh_tab, "SSH")
 
+        # Вкладка "Сканирование"
+        self.scan_tab = QWidget()
+        self.setup_scan_tab()
+        self.tabs.addTab(self.scan_tab, "Сканирование")
+
+        # Вкладка "Интеграции"
+        self.integrations_tab = QWidget()
+        self.setup_integrations_tab()
+        self.tabs.addTab(self.integrations_tab, "Интеграции")
+
+        # Вкладка "История печати"
+        self.history_tab = QWidget()
+        self.setup_history_tab()
+        self.tabs.addTab(self.history_tab, "История печати")
+
         # Вкладка "Конфигурация"
         self.config_tab = QWidget()
         self.setup_config_tab()
@@ -51,6 +83,11 @@ class SettingsDialog(QDialog):
         self.setup_logs_tab()
         self.tabs.addTab(self.logs_tab, "Логи")
 
+        # Вкладка "Диагностика"
+        self.diagnostics_tab = QWidget()
+        self.setup_diagnostics_tab()
+        self.tabs.addTab(self.diagnostics_tab, "Диагностика")
+
         # Вкладка "About"
         self.about_tab = QWidget()
         self.setup_about_tab()
@@ -68,7 +105,7 @@ class SettingsDialog(QDialog):
 
     def update_save_button_text(self, index):
         """Обновляет текст кнопки 'Сохранить' в зависимости от активной вкладки."""
-        if index in [3, 4, 5]:  # Индексы вкладок "Логи" (3) и "Конфигурация" (4)
+        if self.tabs.widget(index) in (self.history_tab, self.config_tab, self.logs_tab, self.about_tab):
             self.save_button.setText("Закрыть")
         else:
             self.save_button.setText("Сохранить")
@@ -92,13 +129,28 @@ class SettingsDialog(QDialog):
         remove_button.clicked.connect(self.remove_subnet)
         layout.addWidget(remove_button)
 
+        detect_button = QPushButton("Определить автоматически")
+        detect_button.setToolTip("Добавить подсети локальных интерфейсов (без loopback, Docker и VPN)")
+        detect_button.clicked.connect(self.detect_subnets)
+        layout.addWidget(detect_button)
+
         self.subnet_tab.setLayout(layout)
 
+    def detect_subnets(self):
+        detected = self.parent().network_utils.get_local_subnets()
+        added = [subnet for subnet in detected if subnet not in self.subnets]
+        self.subnets.extend(added)
+        self.subnet_list.addItems(added)
+        self.logger.debug(f"Detected subnets: {detected}, added: {added}")
+        if not added:
+            QMessageBox.information(self, "Подсети", "Новых подсетей не найдено: " + ", ".join(detected))
+
     def add_subnet(self):
-        subnet, ok = QInputDialog.getText(self, "Добавить подсеть", "Введите подсеть (например, 192.168.1.0/24):")
+        subnet, ok = QInputDialog.getText(self, "Добавить подсеть", "Введите подсеть (например, 192.168.1.0/24;\n"
+                                                                      "!192.168.1.0/28 — исключить диапазон):")
         if ok and subnet and subnet not in self.subnets:
             try:
-                ipaddress.ip_network(subnet, strict=False)
+                parse_subnet(subnet)
                 self.subnets.append(subnet)
                 self.subnet_list.addItem(subnet)
                 self.logger.debug(f"Added subnet: {subnet}")
@@ -111,7 +163,7 @@ class SettingsDialog(QDialog):
             subnet, ok = QInputDialog.getText(self, "Изменить подсеть", "Введите новую подсеть:", text=current.text())
             if ok and subnet:
                 try:
-                    ipaddress.ip_network(subnet, strict=False)
+                    parse_subnet(subnet)
                     index = self.subnets.index(current.text())
                     self.subnets[index] = subnet
                     current.setText(subnet)
@@ -153,6 +205,244 @@ class SettingsDialog(QDialog):
         layout.addStretch()
         self.ssh_tab.setLayout(layout)
 
+    def setup_scan_tab(self):
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Ограничение скорости сканирования, пакетов/с (0 — без ограничения):"))
+        self.scan_rate_input = QSpinBox()
+        self.scan_rate_input.setRange(0, 100000)
+        self.scan_rate_input.setSingleStep(100)
+        self.scan_rate_input.setValue(self.scan_rate_limit)
+        layout.addWidget(self.scan_rate_input)
+        layout.addWidget(QLabel("Тайм-ауты подключения и число параллельных проверок подбираются автоматически "
+                                "по времени ответа каждой подсети."))
+        layout.addWidget(QLabel("Процессов для больших подсетей (0 — сканировать в одном процессе):"))
+        self.scan_processes_input = QSpinBox()
+        self.scan_processes_input.setRange(0, os.cpu_count() or 1)
+        self.scan_processes_input.setValue(min(self.scan_processes, self.scan_processes_input.maximum()))
+        layout.addWidget(self.scan_processes_input)
+        layout.addWidget(QLabel(f"Подсети от {SCAN_SHARD_MIN_HOSTS} адресов делятся на диапазоны, "
+                                "которые проверяются параллельно в отдельных процессах."))
+        layout.addWidget(QLabel("Фоновый поиск новых принтеров, проверок/с (0 — выключен):"))
+        self.discovery_pps_input = QSpinBox()
+        self.discovery_pps_input.setRange(0, 1000)
+        self.discovery_pps_input.setValue(self.discovery_pps)
+        layout.addWidget(self.discovery_pps_input)
+        self.discovery_estimate_label = QLabel()
+        layout.addWidget(self.discovery_estimate_label)
+        self.discovery_pps_input.valueChanged.connect(self.update_discovery_estimate)
+        self.update_discovery_estimate()
+
+        self.rich_status_checkbox = QCheckBox(
+            "Расширенный статус (прогресс, файл, температуры — одним запросом /printer/objects/query)")
+        self.rich_status_checkbox.setChecked(self.rich_status)
+        layout.addWidget(self.rich_status_checkbox)
+        self.status_field_checkboxes = {}
+        for field, (_, _, label) in STATUS_FIELDS.items():
+            checkbox = QCheckBox(label)
+            checkbox.setChecked(field in self.status_fields)
+            checkbox.setEnabled(self.rich_status)
+            self.rich_status_checkbox.toggled.connect(checkbox.setEnabled)
+            self.status_field_checkboxes[field] = checkbox
+            layout.addWidget(checkbox)
+
+        layout.addWidget(QLabel("Фоновая телеметрия всех принтеров, период в секундах "
+                                "(0 — только принтеры с открытым окном телеметрии):"))
+        self.telemetry_interval_input = QSpinBox()
+        self.telemetry_interval_input.setRange(0, 3600)
+        self.telemetry_interval_input.setValue(self.telemetry_interval)
+        layout.addWidget(self.telemetry_interval_input)
+        layout.addWidget(QLabel("При включённом расширенном статусе с температурами они берутся из него, "
+                                "отдельно запрашивается только нагрузка хоста."))
+        layout.addStretch()
+        self.scan_tab.setLayout(layout)
+
+    def update_discovery_estimate(self):
+        """Показывает, за какое время фоновый поиск обходит все подсети при выбранной скорости."""
+        pps = self.discovery_pps_input.value()
+        if not pps:
+            self.discovery_estimate_label.setText("Новые принтеры находятся только кнопкой «Сканировать».")
+            return
+        parent = self.parent()
+        known = parent.known_hosts if parent is not None else ()
+        total = ScanPlan(self.subnets, known).subnet_total
+        minutes = total / pps / 60
+        self.discovery_estimate_label.setText(
+            f"Полный обход {total} адресов — около {minutes:.0f} мин; новый принтер появится не позже чем "
+            f"через {minutes + DISCOVERY_PASS_PAUSE_S / 60:.0f} мин.")
+
+    def setup_integrations_tab(self):
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Порт локального API состояния парка на 127.0.0.1 (0 — выключен):"))
+        self.api_port_input = QSpinBox()
+        self.api_port_input.setRange(0, 65535)
+        self.api_port_input.setValue(self.api_port)
+        layout.addWidget(self.api_port_input)
+        layout.addWidget(QLabel("GET /api/fleet — снимок (поддерживает ETag), GET /api/fleet/<хост> — один хост, "
+                                "GET /api/events — поток изменений (server-sent events)."))
+        layout.addWidget(QLabel("Экспорт смен статусов: URL приёмников (по одному в строке), "
+                                "события отправляются пакетами POST {\"events\": [...]}:"))
+        self.export_sinks_input = QTextEdit()
+        self.export_sinks_input.setAcceptRichText(False)
+        self.export_sinks_input.setPlainText("\n".join(self.export_sinks))
+        layout.addWidget(self.export_sinks_input)
+        layout.addWidget(QLabel("Пока приёмник недоступен, события копятся в файле и досылаются по порядку "
+                                "после восстановления."))
+        layout.addWidget(QLabel("Порт координации копий приложения в локальной сети (0 — выключена):"))
+        self.coordination_port_input = QSpinBox()
+        self.coordination_port_input.setRange(0, 65535)
+        self.coordination_port_input.setValue(self.coordination_port)
+        layout.addWidget(self.coordination_port_input)
+        layout.addWidget(QLabel("Копии с одинаковым портом выбирают одну ведущую: только она опрашивает и сканирует "
+                                "принтеры, остальные получают от неё состояние парка. Порт нужен и по UDP, и по TCP."))
+        layout.addStretch()
+        self.integrations_tab.setLayout(layout)
+
+    def setup_diagnostics_tab(self):
+        layout = QVBoxLayout()
+        self.diagnostics_text = QTextEdit()
+        self.diagnostics_text.setReadOnly(True)
+        self.diagnostics_text.setFontFamily("Courier")
+        layout.addWidget(self.diagnostics_text)
+
+        refresh_button = QPushButton("Обновить")
+        refresh_button.clicked.connect(self.refresh_diagnostics)
+        layout.addWidget(refresh_button)
+
+        layout.addWidget(QLabel("Порт экспорта метрик Prometheus на 127.0.0.1 (0 — выключен):"))
+        self.metrics_port_input = QSpinBox()
+        self.metrics_port_input.setRange(0, 65535)
+        self.metrics_port_input.setValue(self.metrics_port)
+        layout.addWidget(self.metrics_port_input)
+
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(QLabel("Профилировать следующие циклы сканирования/обновления:"))
+        self.profile_cycles_input = QSpinBox()
+        self.profile_cycles_input.setRange(1, 100)
+        self.profile_cycles_input.setValue(3)
+        profile_layout.addWidget(self.profile_cycles_input)
+        self.profile_button = QPushButton("Запустить")
+        self.profile_button.clicked.connect(self.start_profiling)
+        profile_layout.addWidget(self.profile_button)
+        layout.addLayout(profile_layout)
+        self.diagnostics_tab.setLayout(layout)
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self):
+        """Показывает сводку метрик сканера и HTTP-слоя."""
+        parent = self.parent()
+        metrics = parent.network_utils.metrics if parent is not None else None
+        if metrics is None:
+            self.diagnostics_text.setText("Метрики недоступны.")
+            return
+
+        def ms(value):
+            return f"{value * 1000:.1f} мс" if value is not None else "—"
+
+        lines = []
+        probes = {result: metrics.counter_value("scanner_probes_total", {"result": result})
+                  for result in ("open", "closed", "timeout", "error")}
+        lines.append("Пробы портов: " + ", ".join(f"{name}={count}" for name, count in probes.items()))
+        count, p50, p99 = metrics.summary_stats("scanner_connect_latency_seconds").get("", (0, None, None))
+        lines.append(f"Задержка подключения: p50={ms(p50)}, p99={ms(p99)} (замеров: {count})")
+        hit_rate = metrics.cache_hit_rate()
+        cache_stats = parent.network_utils.printer_info_cache.stats
+        lines.append("Кэш /printer/info: " + (f"попаданий {hit_rate * 100:.0f}%" if hit_rate is not None else "—")
+                     + f" (свежих {cache_stats['hit']}, устаревших {cache_stats['stale']}, "
+                       f"ошибок {cache_stats['negative']}, промахов {cache_stats['miss']}, "
+                       f"фоновых обновлений {cache_stats['refresh']}, вытеснений {cache_stats['eviction']})")
+        lines.append(f"Объединённых одновременных запросов: {parent.network_utils.single_flight.shared}")
+        resolver_stats = parent.network_utils.resolver.stats
+        if any(resolver_stats.values()):
+            count, p50, p99 = metrics.summary_stats("resolver_latency_seconds").get("", (0, None, None))
+            lines.append(f"Кэш DNS-имён: свежих {resolver_stats['hit']}, устаревших {resolver_stats['stale']}, "
+                         f"ошибок {resolver_stats['negative']}, промахов {resolver_stats['miss']}; "
+                         f"разрешение p50={ms(p50)}, p99={ms(p99)} (запросов: {count})")
+        lines.append(f"Очередь проб: {metrics.gauge_value('scanner_queue_depth', default=0)}, "
+                     f"окно параллелизма: {metrics.gauge_value('scanner_concurrency_window', default='—')}")
+        for kind, (count, p50, p99) in sorted(
+                metrics.summary_stats("scan_cycle_duration_seconds", "kind").items()):
+            lines.append(f"Цикл «{kind}»: p50={ms(p50)}, p99={ms(p99)} (циклов: {count})")
+        lines.append("")
+        lines.append("Самые медленные хосты (/printer/info, p99):")
+        hosts = metrics.summary_stats("printer_info_latency_seconds", "host")
+        for host, (count, p50, p99) in sorted(hosts.items(), key=lambda item: item[1][2] or 0, reverse=True)[:10]:
+            errors = metrics.counter_value("printer_info_errors_total", {"host": host})
+            lines.append(f"  {host:<24} p50={ms(p50):>10} p99={ms(p99):>10} запросов={count} ошибок={errors}")
+        if not hosts:
+            lines.append("  нет данных")
+        exporter = getattr(parent, "event_exporter", None)
+        if exporter is not None and exporter.sinks:
+            lines.append("")
+            lines.append("Экспорт событий:")
+            for url, sink in exporter.sinks.items():
+                sent = metrics.counter_value("export_events_total", {"sink": url, "result": "sent"})
+                dropped = metrics.counter_value("export_events_total", {"sink": url, "result": "dropped"})
+                lines.append(f"  {url}: {'недоступен' if sink.down else 'доступен'}, отправлено {sent}, "
+                             f"в очереди {sink.queued}, в файле {sink.spooled_bytes} байт, потеряно {dropped}")
+        coordinator = getattr(parent, "coordinator", None)
+        if coordinator is not None:
+            lines.append("")
+            lines.append(f"Координация: роль {coordinator.role}"
+                         + (f", ведущий {coordinator.leader_address}" if coordinator.leader_address else "")
+                         + f", других копий {coordinator.peer_count}")
+        profiler = getattr(parent, "profiler", None)
+        if profiler is not None:
+            lines.append("")
+            if profiler.armed:
+                lines.append(f"Профилирование: осталось циклов {profiler.remaining}")
+            if profiler.last_report is not None:
+                lines.extend(format_report(profiler.last_report))
+        self.diagnostics_text.setText("\n".join(lines))
+
+    def start_profiling(self):
+        """Включает профилирование сразу, без сохранения настроек; результат — в этой вкладке."""
+        self.parent().profiler.arm(self.profile_cycles_input.value())
+        self.refresh_diagnostics()
+
+    def setup_history_tab(self):
+        layout = QVBoxLayout()
+        self.history_text = QTextEdit()
+        self.history_text.setReadOnly(True)
+        self.history_text.setFontFamily("Courier")
+        layout.addWidget(self.history_text)
+        buttons = QHBoxLayout()
+        refresh_button = QPushButton("Обновить")
+        refresh_button.clicked.connect(self.refresh_history)
+        buttons.addWidget(refresh_button)
+        self.history_sync_button = QPushButton("Синхронизировать сейчас")
+        self.history_sync_button.clicked.connect(self.sync_history)
+        buttons.addWidget(self.history_sync_button)
+        layout.addLayout(buttons)
+        self.history_tab.setLayout(layout)
+        self.refresh_history()
+
+    def refresh_history(self):
+        """Сводка по локальной истории печати, без запросов к принтерам."""
+        parent = self.parent()
+        store = getattr(parent, "history_store", None)
+        if store is None:
+            self.history_text.setText("История недоступна.")
+            return
+        jobs, completed, failed, hours, filament = store.fleet_totals()
+        lines = [f"Парк: заданий {jobs}, завершено {completed}, с ошибкой {failed}, "
+                 f"печать {hours:.1f} ч, филамент {filament:.1f} м", ""]
+        summary = store.host_summary()
+        for host, (jobs, completed, failed, hours, filament) in summary.items():
+            record = parent.known_hosts.get(host)
+            name = record.display_name if record is not None else host
+            rate = f"{completed * 100 / jobs:.0f}%" if jobs else "—"
+            lines.append(f"  {name[:20]:<20} {host:<16} заданий={jobs:<5} успешно={rate:>4} ошибок={failed:<4} "
+                         f"{hours:7.1f} ч {filament:8.1f} м")
+        if not summary:
+            lines.append("  История ещё не загружена.")
+        self.history_text.setText("\n".join(lines))
+
+    def sync_history(self):
+        thread = self.parent().sync_history()
+        self.history_sync_button.setEnabled(False)
+        thread.finished.connect(lambda: self.history_sync_button.setEnabled(True))
+        thread.sync_finished.connect(lambda total: self.refresh_history())
+
     def setup_logs_tab(self):
         layout = QVBoxLayout()
         self.log_level_combo = QComboBox()
@@ -213,12 +503,29 @@ class SettingsDialog(QDialog):
             # Обновляем данные в MainWindow
             parent = self.parent()
             parent.config = config
-            parent.subnets = config.get("subnets", [parent.network_utils.get_local_subnet()])
-            parent.known_hosts = config.get("hosts", {})
+            parent.subnets = config.get("subnets") or parent.network_utils.get_local_subnets()
+            parent.known_hosts = hosts_from_config(config.get("hosts", {}))
             parent.notification_states = config.get("notification_states", [])
             parent.ssh_user = config.get("ssh_user", "")
             parent.log_level = config.get("log_level", "INFO")
             parent.auto_refresh = config.get("auto_refresh", True)
+            parent.scan_rate_limit = config.get("scan_rate_limit", 0)
+            parent.scan_processes = config.get("scan_processes", 0)
+            parent.discovery_pps = config.get("discovery_pps", DEFAULT_DISCOVERY_PPS)
+            parent.apply_discovery()
+            parent.metrics_port = config.get("metrics_port", 0)
+            parent.apply_metrics_server()
+            parent.api_port = config.get("api_port", 0)
+            parent.apply_fleet_api()
+            parent.export_sinks = config.get("export_sinks", [])
+            parent.event_exporter.configure(parent.export_sinks)
+            parent.coordination_port = config.get("coordination_port", 0)
+            parent.apply_coordination()
+            parent.telemetry_interval = config.get("telemetry_interval", DEFAULT_TELEMETRY_INTERVAL_S)
+            parent.apply_telemetry()
+            parent.rich_status = config.get("rich_status", False)
+            parent.status_fields = config.get("status_fields", list(DEFAULT_STATUS_FIELDS))
+            parent.table.set_details_visible(parent.rich_status)
             parent.current_hosts = list(parent.known_hosts.keys())
             parent.table.setRowCount(0)
             parent.initialize_table()
@@ -268,13 +575,32 @@ class SettingsDialog(QDialog):
             self.config_manager.clear_config()
             # Сбрасываем данные в MainWindow
             parent = self.parent()
-            parent.subnets = [parent.network_utils.get_local_subnet()]
+            parent.subnets = parent.network_utils.get_local_subnets()
             parent.known_hosts = {}
             parent.notification_states = []
             parent.ssh_user = ""
             parent.log_level = "INFO"
+            parent.scan_rate_limit = 0
+            parent.scan_processes = 0
+            parent.discovery_pps = DEFAULT_DISCOVERY_PPS
+            parent.apply_discovery()
+            parent.metrics_port = 0
+            parent.apply_metrics_server()
+            parent.api_port = 0
+            parent.apply_fleet_api()
+            parent.export_sinks = []
+            parent.event_exporter.configure([])
+            parent.coordination_port = 0
+            parent.apply_coordination()
+            parent.telemetry_interval = DEFAULT_TELEMETRY_INTERVAL_S
+            parent.apply_telemetry()
+            parent.rich_status = False
+            parent.status_fields = list(DEFAULT_STATUS_FIELDS)
+            parent.table.set_details_visible(False)
             parent.current_hosts = []
             parent.previous_states = {}
+            parent.notifications.clear()
+            parent.fleet_state.clear()
             # Обновляем UI
             self.subnet_list.clear()
             self.subnet_list.addItems(parent.subnets)
@@ -282,6 +608,17 @@ class SettingsDialog(QDialog):
                 checkbox.setChecked(False)
             self.ssh_user_input.setText("")
             self.log_level_combo.setCurrentText("INFO")
+            self.scan_rate_input.setValue(0)
+            self.scan_processes_input.setValue(0)
+            self.discovery_pps_input.setValue(DEFAULT_DISCOVERY_PPS)
+            self.metrics_port_input.setValue(0)
+            self.api_port_input.setValue(0)
+            self.export_sinks_input.clear()
+            self.coordination_port_input.setValue(0)
+            self.telemetry_interval_input.setValue(DEFAULT_TELEMETRY_INTERVAL_S)
+            self.rich_status_checkbox.setChecked(False)
+            for field, checkbox in self.status_field_checkboxes.items():
+                checkbox.setChecked(field in DEFAULT_STATUS_FIELDS)
             parent.table.setRowCount(0)  # Очищаем таблицу
             self.config_editor.setText(json.dumps({}, indent=4, ensure_ascii=False))  # Очищаем редактор
             QMessageBox.information(self, "Успех", "Конфигурация очищена.")
@@ -297,4 +634,34 @@ class SettingsDialog(QDialog):
         return self.ssh_user_input.text()
 
     def get_log_level(self):
-        return self.log_level_combo.currentText()
\ No newline at end of file
+        return self.log_level_combo.currentText()
+
+    def get_scan_rate_limit(self):
+        return self.scan_rate_input.value()
+
+    def get_scan_processes(self):
+        return self.scan_processes_input.value()
+
+    def get_discovery_pps(self):
+        return self.discovery_pps_input.value()
+
+    def get_metrics_port(self):
+        return self.metrics_port_input.value()
+
+    def get_api_port(self):
+        return self.api_port_input.value()
+
+    def get_coordination_port(self):
+        return self.coordination_port_input.value()
+
+    def get_telemetry_interval(self):
+        return self.telemetry_interval_input.value()
+
+    def get_export_sinks(self):
+        return [line.strip() for line in self.export_sinks_input.toPlainText().splitlines() if line.strip()]
+
+    def get_rich_status(self):
+        return self.rich_status_checkbox.isChecked()
+
+    def get_status_fields(self):
+        return [field for field, checkbox in self.status_field_checkboxes.items() if checkbox.isChecked()]
\ No newline at end of file
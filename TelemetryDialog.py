@@ -0,0 +1,159 @@
+# TelemetryDialog.py
+
+import math
+import time
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QPainter, QPen, QColor
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QWidget, QComboBox, QPushButton
+
+# Окна просмотра: подпись -> секунды
+CHART_WINDOWS = {"5 минут": 300, "15 минут": 900, "30 минут": 1800}
+
+# Флаги throttled_state Raspberry Pi (младшие биты — текущее состояние)
+THROTTLED_FLAGS = {
+    0x1: "пониженное напряжение",
+    0x2: "ограничена частота",
+    0x4: "троттлинг",
+    0x8: "перегрев",
+}
+
+
+class TelemetryChart(QWidget):
+    """График одной-двух метрик хоста: полоса минимум–максимум на каждый пиксельный столбец."""
+
+    def __init__(self, store, host, title, series, fixed_range=None, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.host = host
+        self.title = title
+        self.series = series  # [(метрика, цвет)]
+        self.fixed_range = fixed_range
+        self.window = 900
+        self.setMinimumHeight(120)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.palette().base())
+        area = QRectF(self.rect()).adjusted(40, 18, -6, -6)
+        now = time.time()
+        since = now - self.window
+        width = max(int(area.width()), 1)
+        # Корзин не больше, чем пикселей по ширине: перерисовка не зависит от глубины истории
+        data = [(self.store.downsample(self.host, metric, width, since), color) for metric, color in self.series]
+        values = [v for points, _ in data for _, low, high in points for v in (low, high)]
+        if self.fixed_range is not None:
+            bottom, top = self.fixed_range
+        elif values:
+            bottom, top = min(values), max(values)
+            margin = max((top - bottom) * 0.1, 1.0)
+            bottom, top = math.floor(bottom - margin), math.ceil(top + margin)
+        else:
+            bottom, top = 0, 1
+
+        painter.setPen(self.palette().text().color())
+        painter.drawText(QRectF(area.left(), 0, area.width(), 16), Qt.AlignmentFlag.AlignLeft, self.title)
+        painter.drawText(QRectF(0, area.top() - 6, 36, 14), Qt.AlignmentFlag.AlignRight, f"{top:g}")
+        painter.drawText(QRectF(0, area.bottom() - 8, 36, 14), Qt.AlignmentFlag.AlignRight, f"{bottom:g}")
+        painter.setPen(QPen(QColor(128, 128, 128, 90)))
+        painter.drawRect(area)
+
+        def to_point(at, value):
+            x = area.left() + (at - since) / self.window * area.width()
+            y = area.bottom() - (value - bottom) / (top - bottom) * area.height() if top > bottom else area.bottom()
+            return x, min(max(y, area.top()), area.bottom())
+
+        for points, color in data:
+            painter.setPen(QPen(QColor(color), 1))
+            previous = None
+            for at, low, high in points:
+                x, y_low = to_point(at, low)
+                _, y_high = to_point(at, high)
+                painter.drawLine(QPointF(x, y_low), QPointF(x, y_high))
+                if previous is not None:
+                    painter.drawLine(previous, QPointF(x, (y_low + y_high) / 2))
+                previous = QPointF(x, (y_low + y_high) / 2)
+        painter.end()
+
+
+class TelemetryDialog(QDialog):
+    """Немодальное окно с графиками температур и нагрузки одного принтера."""
+
+    def __init__(self, host, title, store, poller, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Телеметрия: {title}")
+        self.setGeometry(100, 100, 640, 560)
+        self.host = host
+        self.store = store
+        self.poller = poller
+
+        layout = QVBoxLayout()
+        top_layout = QHBoxLayout()
+        self.summary_label = QLabel()
+        top_layout.addWidget(self.summary_label)
+        top_layout.addStretch()
+        self.window_combo = QComboBox()
+        self.window_combo.addItems(list(CHART_WINDOWS))
+        self.window_combo.setCurrentIndex(1)
+        self.window_combo.currentTextChanged.connect(self.set_window)
+        top_layout.addWidget(self.window_combo)
+        layout.addLayout(top_layout)
+
+        self.charts = [
+            TelemetryChart(store, host, "Экструдер, °C",
+                           [("extruder_target", "#9e9e9e"), ("extruder_temperature", "#e53935")]),
+            TelemetryChart(store, host, "Стол, °C",
+                           [("heater_bed_target", "#9e9e9e"), ("heater_bed_temperature", "#fb8c00")]),
+            TelemetryChart(store, host, "CPU и память, %",
+                           [("memory_usage", "#43a047"), ("cpu_usage", "#1e88e5")], fixed_range=(0, 100)),
+        ]
+        for chart in self.charts:
+            layout.addWidget(chart, 1)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        close_button = QPushButton("Закрыть")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.poller.sampled.connect(self.on_sampled)
+        self.poller.view(host)
+        self.finished.connect(self.stop_viewing)
+        self.set_window(self.window_combo.currentText())
+
+    def stop_viewing(self):
+        self.poller.sampled.disconnect(self.on_sampled)
+        self.poller.unview(self.host)
+
+    def set_window(self, text):
+        for chart in self.charts:
+            chart.window = CHART_WINDOWS.get(text, 900)
+        self.refresh()
+
+    def on_sampled(self, host):
+        if host == self.host:
+            self.refresh()
+
+    def refresh(self):
+        at, latest = self.store.latest(self.host)
+        if at is None:
+            self.summary_label.setText("Данных пока нет")
+        else:
+            parts = []
+            if "extruder_temperature" in latest:
+                parts.append(f"Экструдер {latest['extruder_temperature']:.0f}/{latest.get('extruder_target', 0):.0f}°C")
+            if "heater_bed_temperature" in latest:
+                parts.append(f"Стол {latest['heater_bed_temperature']:.0f}/{latest.get('heater_bed_target', 0):.0f}°C")
+            if "cpu_usage" in latest:
+                parts.append(f"CPU {latest['cpu_usage']:.0f}%")
+            if "cpu_temp" in latest:
+                parts.append(f"{latest['cpu_temp']:.0f}°C")
+            if "memory_usage" in latest:
+                parts.append(f"память {latest['memory_usage']:.0f}%")
+            flags = [label for bit, label in THROTTLED_FLAGS.items() if int(latest.get("throttled", 0)) & bit]
+            if flags:
+                parts.append("⚠ " + ", ".join(flags))
+            self.summary_label.setText(" · ".join(parts))
+        for chart in self.charts:
+            chart.update()
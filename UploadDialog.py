@@ -0,0 +1,138 @@
+# UploadDialog.py
+
+import logging
+import os
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QLabel, QFileDialog, \
+    QTableWidget, QTableWidgetItem, QProgressBar, QCheckBox, QSpinBox, QHeaderView, QMessageBox
+from uploads import UploadThread
+
+
+class UploadDialog(QDialog):
+    """Загрузка одного G-code файла на выбранные принтеры с прогрессом по каждому хосту."""
+
+    COL_NAME, COL_HOST, COL_PROGRESS, COL_STATUS = range(4)
+
+    def __init__(self, records, network_utils, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Загрузка G-code")
+        self.setGeometry(100, 100, 720, 480)
+        self.setModal(True)
+        self.network_utils = network_utils
+        self.logger = logging.getLogger(__name__)
+        self.upload_thread = None
+        self.rows = {}
+
+        layout = QVBoxLayout()
+        file_layout = QHBoxLayout()
+        self.file_input = QLineEdit()
+        self.file_input.setReadOnly(True)
+        self.file_input.setPlaceholderText("Файл не выбран")
+        file_layout.addWidget(self.file_input)
+        browse_button = QPushButton("Выбрать...")
+        browse_button.clicked.connect(self.choose_file)
+        file_layout.addWidget(browse_button)
+        layout.addLayout(file_layout)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Имя", "Хост", "Прогресс", "Статус"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        for record in records:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            name_item = QTableWidgetItem(record.display_name)
+            name_item.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
+            name_item.setCheckState(Qt.CheckState.Checked if record.online else Qt.CheckState.Unchecked)
+            self.table.setItem(row, self.COL_NAME, name_item)
+            self.table.setItem(row, self.COL_HOST, QTableWidgetItem(record.address))
+            progress = QProgressBar()
+            progress.setValue(0)
+            self.table.setCellWidget(row, self.COL_PROGRESS, progress)
+            self.table.setItem(row, self.COL_STATUS, QTableWidgetItem(record.state))
+            self.rows[record.address] = row
+        layout.addWidget(self.table)
+
+        self.start_print_checkbox = QCheckBox("Начать печать после загрузки")
+        layout.addWidget(self.start_print_checkbox)
+        layout.addWidget(QLabel("Общее ограничение скорости, КБ/с (0 — без ограничения):"))
+        self.bandwidth_input = QSpinBox()
+        self.bandwidth_input.setRange(0, 1000000)
+        self.bandwidth_input.setSingleStep(512)
+        layout.addWidget(self.bandwidth_input)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.upload_button = QPushButton("Загрузить")
+        self.upload_button.clicked.connect(self.start_upload)
+        button_layout.addWidget(self.upload_button)
+        self.cancel_button = QPushButton("Отменить")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_upload)
+        button_layout.addWidget(self.cancel_button)
+        close_button = QPushButton("Закрыть")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+        # finished приходит и при закрытии окна, и по Escape (reject), минуя closeEvent
+        self.finished.connect(self.stop_upload)
+
+    def choose_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Выберите G-code", "",
+                                              "G-code (*.gcode *.gco *.g);;Все файлы (*)")
+        if path:
+            self.file_input.setText(path)
+
+    def selected_hosts(self):
+        return [host for host, row in self.rows.items()
+                if self.table.item(row, self.COL_NAME).checkState() == Qt.CheckState.Checked]
+
+    def start_upload(self):
+        path = self.file_input.text()
+        hosts = self.selected_hosts()
+        if not path or not os.path.isfile(path):
+            QMessageBox.warning(self, "Ошибка", "Выберите файл для загрузки.")
+            return
+        if not hosts:
+            QMessageBox.warning(self, "Ошибка", "Выберите хотя бы один принтер.")
+            return
+        for host in hosts:
+            row = self.rows[host]
+            self.table.cellWidget(row, self.COL_PROGRESS).setValue(0)
+            self.table.item(row, self.COL_STATUS).setText("В очереди")
+        self.upload_thread = UploadThread(path, hosts, self.network_utils,
+                                          bandwidth_limit=self.bandwidth_input.value() * 1024,
+                                          start_print=self.start_print_checkbox.isChecked())
+        self.upload_thread.progress_updated.connect(self.update_progress)
+        self.upload_thread.host_finished.connect(self.host_finished)
+        self.upload_thread.upload_finished.connect(self.upload_finished)
+        self.upload_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.upload_thread.start()
+        self.logger.debug(f"Started upload of {path} to {hosts}")
+
+    def update_progress(self, host, sent, total):
+        row = self.rows[host]
+        self.table.cellWidget(row, self.COL_PROGRESS).setValue(int(sent * 100 / total) if total else 100)
+        self.table.item(row, self.COL_STATUS).setText(f"{sent / 1048576:.1f} / {total / 1048576:.1f} МБ")
+
+    def host_finished(self, host, ok, message):
+        row = self.rows[host]
+        if ok:
+            self.table.cellWidget(row, self.COL_PROGRESS).setValue(100)
+        self.table.item(row, self.COL_STATUS).setText(message if ok else f"Ошибка: {message}")
+
+    def upload_finished(self, succeeded, total):
+        self.upload_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.logger.debug(f"Upload finished: {succeeded}/{total}")
+
+    def cancel_upload(self):
+        if self.upload_thread is not None:
+            self.upload_thread.cancel()
+
+    def stop_upload(self):
+        if self.upload_thread is not None and self.upload_thread.isRunning():
+            self.upload_thread.cancel()
+            self.upload_thread.wait()
@@ -28,14 +28,27 @@ class ConfigManager:
             self.logger.error(f"Failed to load config: {e}")
             return {}
 
-    def save_config(self, subnets, hosts, notification_states, ssh_user="", log_level="INFO", auto_refresh=True):
+    def save_config(self, subnets, hosts, notification_states, ssh_user="", log_level="INFO", auto_refresh=True,
+                    scan_rate_limit=0, metrics_port=0, api_port=0, rich_status=False, status_fields=None,
+                    scan_processes=0, discovery_pps=0, export_sinks=None, coordination_port=0,
+                    telemetry_interval=0):
         config = {
             "subnets": subnets,
             "hosts": hosts,
             "notification_states": notification_states,
             "ssh_user": ssh_user,
             "log_level": log_level,
-            "auto_refresh": auto_refresh
+            "auto_refresh": auto_refresh,
+            "scan_rate_limit": scan_rate_limit,
+            "metrics_port": metrics_port,
+            "api_port": api_port,
+            "rich_status": rich_status,
+            "status_fields": status_fields if status_fields is not None else [],
+            "scan_processes": scan_processes,
+            "discovery_pps": discovery_pps,
+            "export_sinks": export_sinks if export_sinks is not None else [],
+            "coordination_port": coordination_port,
+            "telemetry_interval": telemetry_interval
         }
         try:
             with open(self.config_file, "w", encoding="utf-8") as f:
@@ -57,11 +70,22 @@ class ConfigManager:
         """
         Сохраняет текущую конфигурацию, извлекая параметры из экземпляра MainWindow.
         """
+        from hosts import hosts_to_config  # utils импортирует config, а hosts — utils
         self.save_config(
             main_window.subnets,
-            main_window.known_hosts,
+            hosts_to_config(main_window.known_hosts),
             main_window.notification_states,
             main_window.ssh_user,
             main_window.log_level,
-            main_window.auto_refresh
+            main_window.auto_refresh,
+            main_window.scan_rate_limit,
+            main_window.metrics_port,
+            main_window.api_port,
+            main_window.rich_status,
+            main_window.status_fields,
+            main_window.scan_processes,
+            main_window.discovery_pps,
+            main_window.export_sinks,
+            main_window.coordination_port,
+            main_window.telemetry_interval
         )
\ No newline at end of file
@@ -0,0 +1,223 @@
+# config_sync.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt6.QtCore import QThread, pyqtSignal
+from uploads import ChunkCache, MultipartFileStream
+from utils import CONFIG_SYNC_MAX_PARALLEL, CONFIG_SYNC_EXTENSIONS, UPLOAD_CHUNK_SIZE
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def local_manifest(directory):
+    """Файлы конфигурации в каталоге (рекурсивно): {путь через /: (sha256, размер, полный путь)}."""
+    manifest = {}
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.startswith(".") or not name.lower().endswith(CONFIG_SYNC_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, directory).replace(os.sep, "/")
+            manifest[relative] = (file_sha256(path), os.path.getsize(path), path)
+    return manifest
+
+
+class RemoteHashCache:
+    """Хэши файлов конфигурации на принтерах, привязанные к размеру и времени изменения из листинга.
+
+    Пока размер и modified файла на принтере совпадают с сохранёнными, его хэш известен без
+    скачивания. Файл изменили на принтере — запись не совпадёт и хэш будет посчитан заново.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.hosts = json.load(f)  # хост -> {путь: [sha256, размер, modified]}
+        except FileNotFoundError:
+            self.hosts = {}
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Failed to load config sync cache: {e}")
+            self.hosts = {}
+
+    def get(self, host, path, size, modified):
+        with self._lock:
+            entry = self.hosts.get(host, {}).get(path)
+        if entry is not None and entry[1] == size and entry[2] == modified:
+            return entry[0]
+        return None
+
+    def put(self, host, path, sha256, size, modified):
+        with self._lock:
+            self.hosts.setdefault(host, {})[path] = [sha256, size, modified]
+
+    def discard(self, host, path):
+        with self._lock:
+            self.hosts.get(host, {}).pop(path, None)
+
+    def forget(self, host):
+        with self._lock:
+            self.hosts.pop(host, None)
+        self.save()
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self.hosts, ensure_ascii=False)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_file = self.path + ".tmp"
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(temp_file, self.path)
+        except OSError as e:
+            self.logger.error(f"Failed to save config sync cache: {e}")
+
+
+class ConfigSyncThread(QThread):
+    """Разностная синхронизация каталога конфигурации Klipper на несколько принтеров.
+
+    На хост — один запрос листинга корня config. Локальные хэши сравниваются с кэшем
+    RemoteHashCache; файл скачивается для хэширования, только если на принтере он изменился
+    с прошлой синхронизации, а размер совпадает с локальным. Загружаются лишь отличающиеся
+    файлы, хосты обрабатываются параллельно, блоки файла читаются с диска один раз на всех.
+    Файлы, которых нет локально, на принтерах не удаляются.
+    """
+
+    # Хост, текст состояния
+    host_progress = pyqtSignal(str, str)
+    # Хост, успех, сообщение, загружено файлов, загружено байт
+    host_finished = pyqtSignal(str, bool, str, int, int)
+    # Успешных хостов, всего хостов, загружено файлов, загружено байт, длительность в секундах
+    sync_finished = pyqtSignal(int, int, int, int, float)
+
+    def __init__(self, directory, hosts, network_utils, cache, dry_run=False):
+        super().__init__()
+        self.directory = directory
+        self.hosts = list(hosts)
+        self.network_utils = network_utils
+        self.cache = cache
+        self.dry_run = dry_run
+        self.logger = logging.getLogger(__name__)
+        self._cancel_event = threading.Event()
+        self._chunks = {}
+        self._chunks_lock = threading.Lock()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def _chunk_cache(self, path):
+        with self._chunks_lock:
+            if path not in self._chunks:
+                self._chunks[path] = ChunkCache(path)
+            return self._chunks[path]
+
+    def _remote_hash(self, host, relative, remote):
+        """Хэш файла на принтере: из кэша или скачиванием; None — не удалось определить."""
+        size, modified = remote
+        sha256 = self.cache.get(host, relative, size, modified)
+        if sha256 is not None:
+            return sha256
+        content = self.network_utils.download_file(host, relative, root="config")
+        if content is None:
+            return None
+        sha256 = hashlib.sha256(content).hexdigest()
+        self.cache.put(host, relative, sha256, size, modified)
+        return sha256
+
+    def _changed_files(self, host, manifest, listing):
+        changed = []
+        for relative, (sha256, size, _) in manifest.items():
+            remote = listing.get(relative)
+            # Разный размер — файлы заведомо различаются, скачивать для сравнения не нужно
+            if remote is None or remote[0] != size or self._remote_hash(host, relative, remote) != sha256:
+                changed.append(relative)
+        return changed
+
+    def _sync_host(self, host, manifest):
+        self.host_progress.emit(host, "Сравнение")
+        listing = self.network_utils.list_files(host, root="config")
+        if listing is None:
+            return False, "Не удалось получить список файлов", 0, 0
+        changed = self._changed_files(host, manifest, listing)
+        if not changed:
+            return True, "Без изменений", 0, 0
+        if self.dry_run:
+            return True, "Отличаются: " + ", ".join(changed), 0, 0
+        uploaded, sent = [], 0
+        for index, relative in enumerate(changed, 1):
+            if self._cancel_event.is_set():
+                break
+            sha256, size, path = manifest[relative]
+            self.host_progress.emit(host, f"Загрузка {index}/{len(changed)}: {relative}")
+            directory, _, filename = relative.rpartition("/")
+            fields = {"root": "config", "checksum": sha256}
+            if directory:
+                fields["path"] = directory
+            ok, message = self.network_utils.upload_file(
+                host, MultipartFileStream(self._chunk_cache(path), filename, fields))
+            self.cache.discard(host, relative)
+            if not ok:
+                return False, f"{relative}: {message}", len(uploaded), sent
+            uploaded.append(relative)
+            sent += size
+        # Новые modified загруженных файлов берутся из повторного листинга, чтобы следующая
+        # синхронизация знала их хэши без скачивания
+        listing = self.network_utils.list_files(host, root="config") or {}
+        for relative in uploaded:
+            if relative in listing:
+                self.cache.put(host, relative, manifest[relative][0], *listing[relative])
+        if len(uploaded) < len(changed):
+            return False, f"Отменено, загружено {len(uploaded)} из {len(changed)}", len(uploaded), sent
+        return True, "Загружено: " + ", ".join(uploaded), len(uploaded), sent
+
+    def run(self):
+        started = time.monotonic()
+        try:
+            manifest = local_manifest(self.directory)
+        except OSError as e:
+            self.logger.error(f"Failed to read config directory {self.directory}: {e}")
+            for host in self.hosts:
+                self.host_finished.emit(host, False, str(e), 0, 0)
+            self.sync_finished.emit(0, len(self.hosts), 0, 0, time.monotonic() - started)
+            return
+        self.logger.debug(f"Config sync of {len(manifest)} files from {self.directory} to {len(self.hosts)} hosts"
+                          f"{' (dry run)' if self.dry_run else ''}")
+        succeeded = files = sent = 0
+        try:
+            with ThreadPoolExecutor(max_workers=CONFIG_SYNC_MAX_PARALLEL, thread_name_prefix="config-sync") as executor:
+                futures = {executor.submit(self._sync_host, host, manifest): host for host in self.hosts}
+                for future in as_completed(futures):
+                    host = futures[future]
+                    try:
+                        ok, message, count, size = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Config sync of {host} failed: {e}")
+                        ok, message, count, size = False, str(e), 0, 0
+                    succeeded += ok
+                    files += count
+                    sent += size
+                    self.host_finished.emit(host, ok, message, count, size)
+        finally:
+            with self._chunks_lock:
+                for chunks in self._chunks.values():
+                    chunks.close()
+                self._chunks.clear()
+            self.cache.save()
+        duration = time.monotonic() - started
+        self.logger.info(f"Config sync finished in {duration:.1f}s: {succeeded}/{len(self.hosts)} hosts, "
+                         f"{files} files ({sent} bytes) uploaded")
+        self.sync_finished.emit(succeeded, len(self.hosts), files, sent, duration)
@@ -0,0 +1,242 @@
+# coordination.py
+
+import json
+import logging
+import random
+import socket
+import threading
+import time
+import uuid
+import requests
+from PyQt6.QtCore import QObject, pyqtSignal
+from fleet_api import FleetApiServer
+from utils import COORDINATION_BEACON_INTERVAL_S, COORDINATION_LEADER_TIMEOUT_S, DEFAULT_HTTP_TIMEOUT_S, \
+    FLEET_API_SSE_KEEPALIVE_S
+
+LEADER, FOLLOWER, CANDIDATE = "leader", "follower", "candidate"
+# Ведущий, который закрывается, сообщает об этом — ведомые переизбирают сразу, не дожидаясь тайм-аута
+RESIGNED = "resigned"
+# Широковещательные адреса маяков: копии на этой машине и в сегменте локальной сети
+BEACON_ADDRESSES = ("127.255.255.255", "255.255.255.255")
+
+
+class Coordinator(QObject):
+    """Выбор одной опрашивающей принтеры копии приложения среди копий в сети и на этой машине.
+
+    Копии раз в COORDINATION_BEACON_INTERVAL_S рассылают UDP-маяки на порт координации.
+    Ведущим становится самая давно запущенная копия; остальные подписываются на её снимок
+    парка и поток изменений (FleetApiServer на том же TCP-порту) и сами принтеры не опрашивают.
+    Если маяков ведущего нет дольше COORDINATION_LEADER_TIMEOUT_S, кандидаты по очереди старшинства
+    пытаются занять TCP-порт; на одной машине это удаётся только одной копии.
+    """
+
+    # Роль этой копии и адрес ведущего ("" — ведущий неизвестен или это мы)
+    role_changed = pyqtSignal(str, str)
+    # Событие потока ведущего: snapshot, update или remove, данные события
+    fleet_event = pyqtSignal(str, object)
+
+    def __init__(self, fleet_state, port, parent=None):
+        super().__init__(parent)
+        self.fleet_state = fleet_state
+        self.port = port
+        self.logger = logging.getLogger(__name__)
+        self.instance_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self.role = CANDIDATE
+        self.leader_address = ""
+        self._peers = {}  # id -> {"address", "started", "role", "seen"}
+        self._server = None
+        self._socket = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._follow_lock = threading.Lock()
+        self._follow_generation = 0
+        self._follow_response = None
+
+    @property
+    def polls_printers(self):
+        return self.role == LEADER
+
+    @property
+    def peer_count(self):
+        return len(self._peers)
+
+    def _priority(self):
+        return self.started, self.instance_id
+
+    def start(self):
+        try:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        except OSError as e:
+            self.logger.error(f"Failed to open coordination port {self.port}: {e}")
+            self._socket = None
+            return False
+        try:
+            # Несколько копий на одной машине слушают один порт; широковещательный маяк получает каждая
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self._socket.bind(("", self.port))
+            self._socket.settimeout(0.2)
+        except OSError as e:
+            self.logger.error(f"Failed to open coordination port {self.port}: {e}")
+            self._socket.close()
+            self._socket = None
+            return False
+        self._thread = threading.Thread(target=self._run, name="coordination", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Coordination started on port {self.port} as {self.instance_id}")
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(COORDINATION_BEACON_INTERVAL_S * 2)
+            self._thread = None
+        self._unfollow()
+        if self._server is not None:
+            self._send_beacon(RESIGNED)
+            self._server.stop()
+            self._server = None
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+    def _send_beacon(self, role):
+        beacon = json.dumps({"id": self.instance_id, "started": self.started, "role": role}).encode("utf-8")
+        for address in BEACON_ADDRESSES:
+            try:
+                self._socket.sendto(beacon, (address, self.port))
+            except OSError as e:
+                self.logger.debug(f"Failed to send coordination beacon to {address}: {e}")
+
+    def _receive_beacons(self):
+        deadline = time.monotonic() + COORDINATION_BEACON_INTERVAL_S
+        while not self._stop_event.is_set() and time.monotonic() < deadline:
+            try:
+                data, (address, _) = self._socket.recvfrom(1024)
+                beacon = json.loads(data)
+                peer_id = str(beacon["id"])
+                started = float(beacon["started"])
+                role = str(beacon["role"])
+            except socket.timeout:
+                continue
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.logger.debug(f"Ignoring coordination datagram: {e}")
+                continue
+            if peer_id == self.instance_id:
+                continue
+            if role == RESIGNED:
+                self._peers.pop(peer_id, None)
+                continue
+            peer = self._peers.get(peer_id)
+            # Маяк копии на этой машине приходит и с 127.0.0.1, и с адреса интерфейса — предпочитаем локальный
+            if peer is not None and peer["address"].startswith("127.") and not address.startswith("127."):
+                address = peer["address"]
+            self._peers[peer_id] = {"address": address, "started": started, "role": role,
+                                    "seen": time.monotonic()}
+
+    def _run(self):
+        # Два интервала маяков достаточно, чтобы услышать уже работающего ведущего
+        claim_at = time.monotonic() + COORDINATION_BEACON_INTERVAL_S * (2 + random.random())
+        while not self._stop_event.is_set():
+            self._send_beacon(self.role)
+            self._receive_beacons()
+            now = time.monotonic()
+            for peer_id in [peer_id for peer_id, peer in self._peers.items()
+                            if now - peer["seen"] > COORDINATION_LEADER_TIMEOUT_S]:
+                del self._peers[peer_id]
+            leaders = [(peer["started"], peer_id) for peer_id, peer in self._peers.items() if peer["role"] == LEADER]
+            best = min(leaders) if leaders else None
+            if self.role == LEADER:
+                if best is not None and best < self._priority():
+                    # Два ведущих в разных сегментах сети: уступает более новая копия
+                    self.logger.info(f"Yielding leadership to older instance {best[1]}")
+                    self._server.stop()
+                    self._server = None
+                    self._follow(best[1])
+                continue
+            if best is not None:
+                address = self._peers[best[1]]["address"]
+                if self.role != FOLLOWER or address != self.leader_address:
+                    self._follow(best[1])
+                continue
+            if self.role == FOLLOWER:
+                self.logger.info(f"Leader {self.leader_address} is gone, starting election")
+                self._unfollow()
+                self._set_role(CANDIDATE, "")
+                claim_at = now
+            # Кандидаты претендуют по старшинству: следующий ждёт, пока более старший не займёт порт
+            rank = sum(1 for peer_id, peer in self._peers.items() if (peer["started"], peer_id) < self._priority())
+            if now >= claim_at + rank * COORDINATION_BEACON_INTERVAL_S * 2:
+                self._claim()
+                if self.role != LEADER:
+                    claim_at = now + random.uniform(0, COORDINATION_BEACON_INTERVAL_S)
+
+    def _claim(self):
+        server = FleetApiServer(self.fleet_state, self.port, host="0.0.0.0")
+        if not server.start():
+            # Порт занят ведущим на этой машине, чей маяк ещё не дошёл
+            return
+        self._server = server
+        self.logger.info(f"Became the polling leader, serving fleet state on port {self.port}")
+        self._set_role(LEADER, "")
+        self._send_beacon(LEADER)
+
+    def _set_role(self, role, address):
+        self.role = role
+        self.leader_address = address
+        self.role_changed.emit(role, address)
+
+    def _follow(self, leader_id):
+        self._unfollow()
+        address = self._peers[leader_id]["address"]
+        with self._follow_lock:
+            generation = self._follow_generation
+        self.logger.info(f"Following leader {leader_id} at {address}:{self.port}")
+        self._set_role(FOLLOWER, address)
+        threading.Thread(target=self._subscribe, args=(address, generation), name="coordination-follow",
+                         daemon=True).start()
+
+    def _unfollow(self):
+        with self._follow_lock:
+            self._follow_generation += 1
+            response, self._follow_response = self._follow_response, None
+        if response is not None:
+            # Закрытие соединения прерывает ожидание следующей строки потока
+            response.close()
+
+    def _following(self, generation):
+        with self._follow_lock:
+            return generation == self._follow_generation and not self._stop_event.is_set()
+
+    def _subscribe(self, address, generation):
+        """Читает поток server-sent events ведущего и пересылает события в GUI-поток."""
+        url = f"http://{address}:{self.port}/api/events"
+        while self._following(generation):
+            try:
+                response = requests.get(url, stream=True,
+                                        timeout=(DEFAULT_HTTP_TIMEOUT_S, FLEET_API_SSE_KEEPALIVE_S * 2))
+                with self._follow_lock:
+                    if generation != self._follow_generation:
+                        response.close()
+                        return
+                    self._follow_response = response
+                event_type, data = None, []
+                # Поток не разбит на блоки HTTP: больший chunk_size задерживал бы события до заполнения буфера
+                for line in response.iter_lines(chunk_size=1, decode_unicode=True):
+                    if not self._following(generation):
+                        return
+                    if line.startswith("event:"):
+                        event_type = line[len("event:"):].strip()
+                    elif line.startswith("data:"):
+                        data.append(line[len("data:"):].strip())
+                    elif not line and event_type is not None:
+                        self.fleet_event.emit(event_type, json.loads("\n".join(data)))
+                        event_type, data = None, []
+            except (requests.RequestException, ValueError, AttributeError) as e:
+                if self._following(generation):
+                    self.logger.debug(f"Leader stream {url} interrupted: {e}")
+            self._stop_event.wait(COORDINATION_BEACON_INTERVAL_S)
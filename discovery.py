@@ -0,0 +1,137 @@
+# discovery.py
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from PyQt6.QtCore import QThread, pyqtSignal
+from hosts import HostRecord
+from scan_control import RateLimiter
+from scan_plan import ScanPlan
+from utils import DISCOVERY_MAX_WORKERS, DISCOVERY_PASS_PAUSE_S
+
+
+class DiscoveryThread(QThread):
+    """Непрерывный медленный обход подсетей в поисках новых принтеров.
+
+    Адреса проверяются по одному под общим лимитом проверок в секунду, поэтому
+    сеть не получает всплесков трафика, а полный обход занимает не больше
+    subnet_total / pps секунд (плюс DISCOVERY_PASS_PAUSE_S между обходами).
+    Известные хосты пропускаются — их состояние обновляет обычный цикл обновления.
+    """
+
+    host_found = pyqtSignal(object)  # HostRecord нового хоста
+    pass_finished = pyqtSignal(int, float)  # проверено адресов, длительность обхода в секундах
+
+    def __init__(self, subnets, known_hosts, network_utils, pps):
+        super().__init__()
+        self.network_utils = network_utils
+        self.logger = logging.getLogger(__name__)
+        self.rate_limiter = RateLimiter(pps, burst=1)
+        self._lock = threading.Lock()
+        self._subnets = list(subnets)
+        self._known = set(known_hosts)
+        self._plan_changed = True
+        self._stop_event = threading.Event()
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self.position = 0  # адресов проверено в текущем обходе
+        self.total = 0
+
+    def update_targets(self, subnets=None, known_hosts=None):
+        """Новые подсети применяются со следующего обхода, новые известные хосты — сразу."""
+        with self._lock:
+            if subnets is not None and list(subnets) != self._subnets:
+                self._subnets = list(subnets)
+                self._plan_changed = True
+            if known_hosts is not None:
+                self._known = set(known_hosts)
+
+    def set_rate(self, pps):
+        self.rate_limiter.rate = pps
+
+    def pause(self):
+        """Приостанавливает обход, например на время полного сканирования."""
+        self._resume_event.clear()
+
+    def resume(self):
+        self._resume_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._resume_event.set()
+
+    def _is_known(self, ip):
+        with self._lock:
+            return ip in self._known
+
+    def _probe(self, ip, timeout):
+        is_open, rtt, error = self.network_utils.probe_port(ip, timeout=timeout)
+        if not is_open:
+            return is_open, rtt, error, None
+        hostname, state = self.network_utils.get_printer_info(ip)
+        return is_open, rtt, error, HostRecord(ip, hostname, state=state, latency=rtt, last_seen=time.time(),
+                                               ssh=self.network_utils.check_ssh(ip))
+
+    def _targets(self):
+        """План обхода строится сразу, адреса выдаются лениво по интервалам плана."""
+        with self._lock:
+            plan = ScanPlan(self._subnets, self._known)
+            self._plan_changed = False
+        self.total = plan.subnet_total
+        return (target for subnet in plan.subnets() for target in plan.subnet_targets(subnet))
+
+    def run(self):
+        metrics = self.network_utils.metrics
+        with ThreadPoolExecutor(max_workers=DISCOVERY_MAX_WORKERS, thread_name_prefix="discovery") as executor:
+            while not self._stop_event.is_set():
+                started = time.monotonic()
+                self.position = 0
+                pending = {}
+                targets = self._targets()
+                exhausted = False
+                while not self._stop_event.is_set() and (pending or not exhausted):
+                    self._resume_event.wait()
+                    if self._plan_changed:
+                        # Подсети изменились: дожидаемся начатых проверок и начинаем обход по новому плану
+                        exhausted = True
+                    while not exhausted and len(pending) < DISCOVERY_MAX_WORKERS:
+                        target = next(targets, None)
+                        if target is None:
+                            exhausted = True
+                            break
+                        ip, key = str(target[0]), target[1]
+                        self.position += 1
+                        if self._is_known(ip):
+                            continue
+                        self.rate_limiter.acquire()
+                        if self._stop_event.is_set():
+                            break
+                        estimator = self.network_utils.get_rtt_estimator(key)
+                        pending[executor.submit(self._probe, ip, estimator.timeout)] = (ip, estimator)
+                    if not pending:
+                        continue
+                    done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        ip, estimator = pending.pop(future)
+                        try:
+                            is_open, rtt, error, record = future.result()
+                        except Exception as e:
+                            self.logger.error(f"Discovery probe of {ip} failed: {e}")
+                            continue
+                        if rtt is not None:
+                            estimator.add_sample(rtt)
+                        metrics.inc("discovery_probes_total",
+                                    {"result": "open" if is_open else "closed" if rtt is not None else "timeout"})
+                        if record is not None and not self._is_known(ip):
+                            with self._lock:
+                                self._known.add(ip)
+                            self.logger.info(f"Discovery found new host {ip} ({record.original_name})")
+                            self.host_found.emit(record)
+                if self._stop_event.is_set() or self._plan_changed:
+                    continue
+                duration = time.monotonic() - started
+                metrics.observe("discovery_pass_duration_seconds", duration)
+                self.logger.debug(f"Discovery pass finished: {self.position} addresses in {duration:.0f}s")
+                self.pass_finished.emit(self.position, duration)
+                self._stop_event.wait(DISCOVERY_PASS_PAUSE_S)
@@ -0,0 +1,331 @@
+# event_export.py
+
+import hashlib
+import json
+import logging
+import os
+import random
+import shutil
+import threading
+import time
+import uuid
+from collections import deque
+import requests
+from utils import EXPORT_QUEUE_SIZE, EXPORT_BATCH_SIZE, EXPORT_FLUSH_INTERVAL_S, EXPORT_RETRY_BASE_S, \
+    EXPORT_RETRY_MAX_S, EXPORT_HTTP_TIMEOUT_S, EXPORT_SPOOL_MAX_BYTES, EXPORT_SPOOL_TRIM_FRACTION
+
+# Коды ответа, при которых пакет стоит повторить; прочие 4xx означают, что приёмник его не примет никогда
+RETRYABLE_STATUS = (408, 425, 429)
+
+
+class SinkExporter:
+    """Отправка событий в один HTTP-приёмник пакетами из ограниченной очереди.
+
+    offer() вызывается из GUI-потока и никогда не блокирует: событие кладётся в очередь
+    в памяти. Рабочий поток отправляет POST {"events": [...]} по EXPORT_BATCH_SIZE событий
+    или раз в EXPORT_FLUSH_INTERVAL_S. При ошибке пакет и очередь сбрасываются в файл на
+    диске, а повтор идёт с экспоненциальной задержкой; после восстановления приёмника
+    сначала досылается файл, поэтому порядок событий сохраняется. Переполненный файл
+    освобождается от самых старых событий. Доставка «хотя бы раз»: у каждого события есть
+    id для устранения повторов на стороне приёмника.
+    """
+
+    def __init__(self, url, spool_dir, metrics, queue_size=EXPORT_QUEUE_SIZE, batch_size=EXPORT_BATCH_SIZE,
+                 flush_interval=EXPORT_FLUSH_INTERVAL_S):
+        self.url = url
+        self.metrics = metrics
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger(__name__)
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+        self.spool_file = os.path.join(spool_dir, f"{name}.jsonl")
+        self.offset_file = os.path.join(spool_dir, f"{name}.offset")
+        self._labels = {"sink": url}
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._failures = 0
+        self._retry_at = 0.0
+        self._session = requests.Session()
+        self._spool_offset = self._load_offset()
+        self._spool_pending = self.spooled_bytes > 0
+        self._thread = threading.Thread(target=self._run, name=f"export-{name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    @property
+    def queued(self):
+        return len(self._queue)
+
+    @property
+    def spooled_bytes(self):
+        try:
+            return max(os.path.getsize(self.spool_file) - self._spool_offset, 0)
+        except OSError:
+            return 0
+
+    @property
+    def down(self):
+        return self._failures > 0
+
+    def offer(self, event):
+        with self._condition:
+            if len(self._queue) >= self.queue_size:
+                # Рабочий поток не успевает даже сбрасывать очередь на диск: теряем самое старое событие
+                self._queue.popleft()
+                self.metrics.inc("export_events_total", {**self._labels, "result": "dropped"})
+            self._queue.append(event)
+            if len(self._queue) == 1 or len(self._queue) >= self.batch_size:
+                self._condition.notify()
+
+    def stop(self):
+        """Останавливает поток; неотправленные события остаются в файле до следующего запуска."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join(EXPORT_HTTP_TIMEOUT_S * 2)
+        self._session.close()
+
+    def _load_offset(self):
+        try:
+            with open(self.offset_file, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _save_offset(self, offset):
+        self._spool_offset = offset
+        try:
+            if offset >= os.path.getsize(self.spool_file):
+                # Файл дослан целиком
+                os.remove(self.spool_file)
+                if os.path.exists(self.offset_file):
+                    os.remove(self.offset_file)
+                self._spool_offset = 0
+                return
+            with open(self.offset_file, "w", encoding="utf-8") as f:
+                f.write(str(offset))
+        except OSError as e:
+            self.logger.error(f"Failed to update export spool offset for {self.url}: {e}")
+
+    def _trim_spool(self, incoming):
+        """Освобождает место под incoming байт, отбрасывая самые старые события файла.
+
+        Отбрасывается не меньше EXPORT_SPOOL_TRIM_FRACTION предела, а остаток переписывается
+        в начало файла: файл не растёт, даже если приёмник недоступен долго, и переписывается
+        не при каждом пакете. Возвращает False, если файл не удалось переписать.
+        """
+        needed = max(self.spooled_bytes + incoming - EXPORT_SPOOL_MAX_BYTES,
+                     int(EXPORT_SPOOL_MAX_BYTES * EXPORT_SPOOL_TRIM_FRACTION))
+        temp_file = self.spool_file + ".tmp"
+        dropped = freed = 0
+        try:
+            with open(self.spool_file, "rb") as source:
+                source.seek(self._spool_offset)
+                while freed < needed:
+                    line = source.readline()
+                    if not line.endswith(b"\n"):
+                        break
+                    freed += len(line)
+                    dropped += 1
+                with open(temp_file, "wb") as target:
+                    shutil.copyfileobj(source, target)
+            os.replace(temp_file, self.spool_file)
+        except OSError as e:
+            self.logger.error(f"Failed to trim export spool {self.spool_file}: {e}")
+            return False
+        self._save_offset(0)
+        self.logger.warning(f"Export spool for {self.url} is full, dropped {dropped} oldest events")
+        self.metrics.inc("export_events_total", {**self._labels, "result": "dropped"}, dropped)
+        return True
+
+    def _spill(self, events):
+        """Дописывает события в файл приёмника, при превышении EXPORT_SPOOL_MAX_BYTES вытесняя самые старые."""
+        if not events:
+            return
+        lines = [json.dumps(event, ensure_ascii=False) + "\n" for event in events]
+        incoming = sum(len(line.encode("utf-8")) for line in lines)
+        if self.spooled_bytes + incoming > EXPORT_SPOOL_MAX_BYTES and not self._trim_spool(incoming):
+            self.metrics.inc("export_events_total", {**self._labels, "result": "dropped"}, len(events))
+            return
+        try:
+            with open(self.spool_file, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+            self._spool_pending = True
+            self.metrics.inc("export_events_total", {**self._labels, "result": "spooled"}, len(events))
+        except OSError as e:
+            self.logger.error(f"Failed to spool {len(events)} events for {self.url}: {e}")
+            self.metrics.inc("export_events_total", {**self._labels, "result": "dropped"}, len(events))
+
+    def _read_spool(self):
+        """Следующий пакет из файла: (события, смещение после пакета) или None, если досылать нечего."""
+        try:
+            with open(self.spool_file, "rb") as f:
+                f.seek(self._spool_offset)
+                events = []
+                offset = self._spool_offset
+                while len(events) < self.batch_size:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        # Конец файла или строка, недописанная при аварийном завершении
+                        break
+                    offset += len(line)
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        self.logger.warning(f"Skipping corrupt line in export spool {self.spool_file}")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.logger.error(f"Failed to read export spool {self.spool_file}: {e}")
+            return None
+        return (events, offset) if offset > self._spool_offset else None
+
+    def _take_batch(self):
+        with self._condition:
+            return [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+
+    def _post(self, events):
+        """Возвращает True (доставлено), False (повторить позже) или None (приёмник отверг пакет)."""
+        started = time.monotonic()
+        try:
+            response = self._session.post(self.url, json={"events": events}, timeout=EXPORT_HTTP_TIMEOUT_S)
+        except requests.RequestException as e:
+            self.logger.debug(f"Export to {self.url} failed: {e}")
+            return False
+        self.metrics.observe("export_batch_latency_seconds", time.monotonic() - started, self._labels)
+        if 200 <= response.status_code < 300:
+            return True
+        if response.status_code in RETRYABLE_STATUS or response.status_code >= 500:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                self._retry_at = time.monotonic() + min(int(retry_after), EXPORT_RETRY_MAX_S)
+            self.logger.debug(f"Export to {self.url} returned {response.status_code}, will retry")
+            return False
+        self.logger.error(f"Export sink {self.url} rejected a batch of {len(events)} events: "
+                          f"HTTP {response.status_code}")
+        return None
+
+    def _backoff(self):
+        self._failures += 1
+        delay = min(EXPORT_RETRY_BASE_S * 2 ** (self._failures - 1), EXPORT_RETRY_MAX_S)
+        # Случайный разброс, чтобы несколько копий приложения не повторяли запросы синхронно
+        self._retry_at = max(self._retry_at, time.monotonic() + delay * random.uniform(0.5, 1.0))
+        if self._failures == 1:
+            self.logger.warning(f"Export sink {self.url} is unavailable, spooling events to {self.spool_file}")
+
+    def _wait(self):
+        """Ждёт полного пакета, истечения flush_interval для самого старого события, конца задержки
+        повтора или остановки."""
+        with self._condition:
+            while not self._stopping:
+                if self._failures:
+                    delay = self._retry_at - time.monotonic()
+                    # Приёмник недоступен: полный пакет не копится в памяти, а уходит в файл
+                    if delay <= 0 or len(self._queue) >= self.batch_size:
+                        return
+                    self._condition.wait(delay)
+                elif self._spool_pending or len(self._queue) >= self.batch_size:
+                    return
+                elif self._queue:
+                    delay = self._queue[0]["time"] + self.flush_interval - time.time()
+                    if delay <= 0:
+                        return
+                    self._condition.wait(delay)
+                else:
+                    self._condition.wait()
+
+    def _take_rest(self):
+        with self._condition:
+            events = list(self._queue)
+            self._queue.clear()
+            return events
+
+    def _deliver(self):
+        """Одна попытка доставки: сначала файл, затем очередь в памяти; False — приёмник недоступен."""
+        spooled = self._read_spool() if self._spool_pending else None
+        if spooled is not None:
+            events, offset = spooled
+            if len(self._queue) >= self.batch_size:
+                # Пока досылается файл, новые события встают за ним, а не вытесняют друг друга в памяти
+                self._spill(self._take_batch())
+        else:
+            self._spool_pending = False
+            events, offset = self._take_batch(), None
+            if not events:
+                return True
+        result = self._post(events) if events else True
+        if result is False:
+            if offset is None:
+                self._spill(events)
+            return False
+        if offset is not None:
+            self._save_offset(offset)
+        if events:
+            self.metrics.inc("export_events_total", {**self._labels, "result": "sent" if result else "rejected"},
+                             len(events))
+        return True
+
+    def _run(self):
+        while True:
+            self._wait()
+            if self._stopping:
+                break
+            if self._failures and time.monotonic() < self._retry_at:
+                self._spill(self._take_batch())
+            elif self._deliver():
+                if self._failures:
+                    self.logger.info(f"Export sink {self.url} is available again")
+                self._failures = 0
+                self._retry_at = 0.0
+            else:
+                self._backoff()
+                self._spill(self._take_batch())
+            self.metrics.set_gauge("export_queue_depth", len(self._queue), self._labels)
+            self.metrics.set_gauge("export_spool_bytes", self.spooled_bytes, self._labels)
+        # Остановка: всё, что осталось в памяти, сохраняется для следующего запуска
+        self._spill(self._take_rest())
+        self.metrics.set_gauge("export_queue_depth", 0, self._labels)
+
+
+class EventExporter:
+    """Рассылка событий смены статусов во все настроенные HTTP-приёмники.
+
+    Каждый приёмник имеет собственные очередь, поток и файл на диске, поэтому
+    недоступный или медленный приёмник не задерживает остальные.
+    """
+
+    def __init__(self, spool_dir, metrics):
+        self.spool_dir = spool_dir
+        self.metrics = metrics
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(spool_dir, exist_ok=True)
+        self.sinks = {}  # url -> SinkExporter
+
+    def configure(self, urls):
+        """Запускает приёмники из urls и останавливает исключённые."""
+        urls = [url.strip() for url in urls if url.strip()]
+        for url in list(self.sinks):
+            if url not in urls:
+                self.sinks.pop(url).stop()
+                self.logger.debug(f"Export sink {url} removed")
+        for url in urls:
+            if url not in self.sinks:
+                sink = SinkExporter(url, self.spool_dir, self.metrics)
+                sink.start()
+                self.sinks[url] = sink
+                self.logger.debug(f"Export sink {url} added")
+
+    def publish(self, event_type, **fields):
+        if not self.sinks:
+            return
+        event = {"id": uuid.uuid4().hex, "type": event_type, "time": time.time(), **fields}
+        for sink in self.sinks.values():
+            sink.offer(event)
+
+    def shutdown(self):
+        for sink in self.sinks.values():
+            sink.stop()
+        self.sinks.clear()
@@ -0,0 +1,228 @@
+# file_browser.py
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import Qt, QObject, QAbstractTableModel, QModelIndex, pyqtSignal
+from utils import FILE_BROWSER_WORKERS, FILE_BROWSER_RESET_FRACTION
+
+# Роль данных для сортировки: каталоги всегда выше файлов
+SORT_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+def diff_listing(old, new):
+    """Сравнивает два листинга {имя: (каталог?, размер, modified)}: (добавленные, удалённые, изменённые)."""
+    added = [name for name in new if name not in old]
+    removed = [name for name in old if name not in new]
+    changed = [name for name, entry in new.items() if name in old and tuple(old[name]) != tuple(entry)]
+    return added, removed, changed
+
+
+def format_size(size):
+    for unit in ("Б", "КБ", "МБ"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "Б" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} ГБ"
+
+
+class ListingCache:
+    """Дисковый кэш листингов каталогов принтеров: один JSON-файл на хост.
+
+    Открытый ранее каталог показывается из кэша мгновенно, а свежий листинг
+    только сверяется с ним. Используется из GUI-потока.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(directory, exist_ok=True)
+        self.hosts = {}  # хост -> {путь каталога: {имя: [каталог?, размер, modified]}}
+
+    def _file(self, host):
+        return os.path.join(self.directory, re.sub(r"[^\w.-]", "_", host) + ".json")
+
+    def _host(self, host):
+        if host not in self.hosts:
+            try:
+                with open(self._file(host), "r", encoding="utf-8") as f:
+                    self.hosts[host] = json.load(f)
+            except FileNotFoundError:
+                self.hosts[host] = {}
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Failed to load file listing cache for {host}: {e}")
+                self.hosts[host] = {}
+        return self.hosts[host]
+
+    def get(self, host, path):
+        listing = self._host(host).get(path)
+        return {name: tuple(entry) for name, entry in listing.items()} if listing is not None else None
+
+    def put(self, host, path, entries):
+        listing = self._host(host)
+        listing[path] = {name: list(entry) for name, entry in entries.items()}
+        temp_file = self._file(host) + ".tmp"
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(listing, f, ensure_ascii=False)
+            os.replace(temp_file, self._file(host))
+        except OSError as e:
+            self.logger.error(f"Failed to save file listing cache for {host}: {e}")
+
+    def forget(self, host):
+        self.hosts.pop(host, None)
+        try:
+            os.remove(self._file(host))
+        except OSError:
+            pass
+
+
+class RemoteFileModel(QAbstractTableModel):
+    """Табличная модель каталога принтера без виджетов на строку.
+
+    Текст ячеек строится в data() только для строк, которые представление
+    действительно рисует, поэтому каталог из тысяч файлов открывается мгновенно.
+    Обновление применяется как разница: вставка, удаление и dataChanged только
+    для изменившихся строк, выделение и прокрутка при этом сохраняются.
+    """
+
+    COL_NAME, COL_SIZE, COL_MODIFIED = range(3)
+    HEADERS = ("Имя", "Размер", "Изменён")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = []
+        self.entries = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        name = self.names[index.row()]
+        is_dir, size, modified = self.entries[name]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == self.COL_NAME:
+                return f"📁 {name}" if is_dir else name
+            if column == self.COL_SIZE:
+                return "" if is_dir else format_size(size)
+            return time.strftime("%d.%m.%Y %H:%M", time.localtime(modified)) if modified else ""
+        if role == SORT_ROLE:
+            if column == self.COL_NAME:
+                return ("0" if is_dir else "1") + name.lower()
+            if column == self.COL_SIZE:
+                return -1 if is_dir else size
+            return modified
+        if role == Qt.ItemDataRole.UserRole:
+            return name
+        return None
+
+    def entry(self, row):
+        name = self.names[row]
+        return name, self.entries[name]
+
+    def set_listing(self, entries):
+        self.beginResetModel()
+        self.entries = dict(entries)
+        self.names = list(self.entries)
+        self.endResetModel()
+
+    def apply_listing(self, entries):
+        """Приводит модель к новому листингу минимальными изменениями; возвращает (+, −, ~)."""
+        added, removed, changed = diff_listing(self.entries, entries)
+        if len(added) + len(removed) > max(len(self.names), 1) * FILE_BROWSER_RESET_FRACTION:
+            self.set_listing(entries)
+            return len(added), len(removed), len(changed)
+        if removed:
+            gone = set(removed)
+            rows = [row for row, name in enumerate(self.names) if name in gone]
+            # Удаляем непрерывными диапазонами с конца, чтобы номера оставшихся строк не сдвигались
+            while rows:
+                last = rows.pop()
+                first = last
+                while rows and rows[-1] == first - 1:
+                    first = rows.pop()
+                self.beginRemoveRows(QModelIndex(), first, last)
+                del self.names[first:last + 1]
+                self.endRemoveRows()
+            for name in removed:
+                del self.entries[name]
+        if changed:
+            rows = {name: row for row, name in enumerate(self.names)}
+            for name in changed:
+                self.entries[name] = entries[name]
+                row = rows[name]
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+        if added:
+            self.beginInsertRows(QModelIndex(), len(self.names), len(self.names) + len(added) - 1)
+            for name in added:
+                self.entries[name] = entries[name]
+            self.names.extend(added)
+            self.endInsertRows()
+        return len(added), len(removed), len(changed)
+
+
+class ListingLoader(QObject):
+    """Фоновые запросы листингов и действий над файлами; результаты приходят сигналами в GUI-поток."""
+
+    # Хост, путь каталога, {имя: (каталог?, размер, modified)} или None при ошибке
+    listed = pyqtSignal(str, str, object)
+    # Хост, описание действия, успех
+    action_finished = pyqtSignal(str, str, bool)
+
+    def __init__(self, network_utils, parent=None):
+        super().__init__(parent)
+        self.network_utils = network_utils
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=FILE_BROWSER_WORKERS, thread_name_prefix="file-list")
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def request(self, host, path):
+        with self._lock:
+            # Повторный запрос того же каталога, пока идёт предыдущий, не ставится в очередь
+            if (host, path) in self._pending:
+                return
+            self._pending.add((host, path))
+        self._executor.submit(self._list, host, path)
+
+    def _list(self, host, path):
+        try:
+            started = time.monotonic()
+            entries = self.network_utils.list_directory(host, path)
+            self.logger.debug(f"Listed {host}:{path} in {time.monotonic() - started:.2f}s "
+                              f"({len(entries) if entries is not None else 'error'} entries)")
+        except Exception as e:
+            self.logger.error(f"Failed to list {host}:{path}: {e}")
+            entries = None
+        finally:
+            with self._lock:
+                self._pending.discard((host, path))
+        self.listed.emit(host, path, entries)
+
+    def submit_action(self, host, description, function, *args):
+        def run():
+            try:
+                ok = function(*args)
+            except Exception as e:
+                self.logger.error(f"{description} on {host} failed: {e}")
+                ok = False
+            self.action_finished.emit(host, description, ok)
+        self._executor.submit(run)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,233 @@
+# fleet_api.py
+
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import unquote
+from utils import FLEET_API_SSE_KEEPALIVE_S, FLEET_API_SSE_QUEUE_SIZE
+
+
+class FleetState:
+    """Снимок состояния парка в памяти с номером версии и подпиской на изменения.
+
+    Обновляется из GUI-потока по мере прихода результатов сканирования;
+    читается потоками API-сервера без обращений к принтерам. Номер версии начинается
+    с нуля при каждом запуске, поэтому ETag дополняется эпохой — случайным id процесса.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hosts = {}
+        self.version = 0
+        self.epoch = uuid.uuid4().hex[:12]
+        self._host_versions = {}  # хост -> версия его последнего изменения
+        self._subscribers = set()
+
+    def update(self, host, name, state, **fields):
+        """Обновляет запись хоста; подписчики уведомляются только при реальном изменении."""
+        with self._lock:
+            return self._merge(host, {"host": host, "name": name, "state": state, **fields})
+
+    def update_fields(self, host, fields):
+        """Сливает дополнительные поля в запись известного хоста; None удаляет поле."""
+        with self._lock:
+            if host not in self.hosts:
+                return False
+            return self._merge(host, fields)
+
+    def _merge(self, host, fields):
+        previous = self.hosts.get(host, {})
+        current = {key: value for key, value in previous.items() if key != "updated"}
+        record = {**current, **fields}
+        record = {key: value for key, value in record.items() if value is not None}
+        if previous and record == current:
+            return False
+        record["updated"] = time.time()
+        self.hosts[host] = record
+        self.version += 1
+        self._host_versions[host] = self.version
+        self._publish({"type": "update", "version": self.version, "host": dict(record)})
+        return True
+
+    def clear(self):
+        with self._lock:
+            for host in list(self.hosts):
+                del self.hosts[host]
+                self._host_versions.pop(host, None)
+                self.version += 1
+                self._publish({"type": "remove", "version": self.version, "host": {"host": host}})
+
+    def remove(self, host):
+        with self._lock:
+            if self.hosts.pop(host, None) is None:
+                return False
+            self._host_versions.pop(host, None)
+            self.version += 1
+            self._publish({"type": "remove", "version": self.version, "host": {"host": host}})
+        return True
+
+    def snapshot(self):
+        """Возвращает (version, список записей) согласованно."""
+        with self._lock:
+            return self.version, [dict(record) for record in self.hosts.values()]
+
+    def get(self, host):
+        """Возвращает (версия последнего изменения хоста, запись) или (None, None)."""
+        with self._lock:
+            record = self.hosts.get(host)
+            if record is None:
+                return None, None
+            return self._host_versions[host], dict(record)
+
+    def etag(self, version):
+        return f'"{self.epoch}-{version}"'
+
+    def subscribe(self):
+        """Регистрирует подписчика; возвращает (очередь событий, version, снимок)."""
+        events = queue.Queue(maxsize=FLEET_API_SSE_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(events)
+            return events, self.version, [dict(record) for record in self.hosts.values()]
+
+    def unsubscribe(self, events):
+        with self._lock:
+            self._subscribers.discard(events)
+
+    def _publish(self, event):
+        # Вызывается под self._lock; медленный подписчик отключается, а не тормозит обновления
+        for events in list(self._subscribers):
+            try:
+                events.put_nowait(event)
+            except queue.Full:
+                self._subscribers.discard(events)
+                while not events.empty():
+                    try:
+                        events.get_nowait()
+                    except queue.Empty:
+                        break
+                events.put_nowait(None)
+
+
+class FleetApiServer:
+    """Локальный HTTP/JSON API и поток server-sent events поверх FleetState.
+
+    GET /api/fleet            — снимок парка (ETag/If-None-Match → 304)
+    GET /api/fleet/<host>     — запись одного хоста
+    GET /api/events           — SSE: событие snapshot, затем update/remove
+    """
+
+    def __init__(self, fleet_state, port, host="127.0.0.1"):
+        self.fleet_state = fleet_state
+        self.port = port
+        self.host = host
+        self.logger = logging.getLogger(__name__)
+        self._server = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        fleet_state = self.fleet_state
+        stopping = self._stopping
+        logger = self.logger
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(f"Fleet API request: {format % args}")
+
+            def _send_json(self, payload, etag=None, status=200):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-cache")
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _not_modified(self, etag):
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return True
+                return False
+
+            def do_GET(self):
+                path = self.path.split("?")[0].rstrip("/")
+                if path == "/api/fleet":
+                    version, hosts = fleet_state.snapshot()
+                    etag = fleet_state.etag(version)
+                    if not self._not_modified(etag):
+                        self._send_json({"version": version, "hosts": hosts}, etag)
+                elif path.startswith("/api/fleet/"):
+                    version, record = fleet_state.get(unquote(path[len("/api/fleet/"):]))
+                    if record is None:
+                        self._send_json({"error": "host not found"}, status=404)
+                        return
+                    etag = fleet_state.etag(version)
+                    if not self._not_modified(etag):
+                        self._send_json(record, etag)
+                elif path == "/api/events":
+                    self._stream_events()
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def _write_event(self, event_type, payload, event_id=None):
+                chunk = ""
+                if event_id is not None:
+                    chunk += f"id: {event_id}\n"
+                chunk += f"event: {event_type}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+                self.wfile.write(chunk.encode("utf-8"))
+                self.wfile.flush()
+
+            def _stream_events(self):
+                events, version, hosts = fleet_state.subscribe()
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+                    self.send_header("Cache-Control", "no-cache")
+                    self.send_header("Connection", "close")
+                    self.end_headers()
+                    self.close_connection = True
+                    self._write_event("snapshot", {"version": version, "hosts": hosts}, version)
+                    while not stopping.is_set():
+                        try:
+                            event = events.get(timeout=FLEET_API_SSE_KEEPALIVE_S)
+                        except queue.Empty:
+                            self.wfile.write(b": keepalive\n\n")
+                            self.wfile.flush()
+                            continue
+                        if event is None:
+                            break
+                        self._write_event(event["type"], event, event["version"])
+                except (BrokenPipeError, ConnectionResetError, OSError) as e:
+                    logger.debug(f"Fleet API SSE client disconnected: {e}")
+                finally:
+                    fleet_state.unsubscribe(events)
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            self.logger.error(f"Failed to start fleet API on {self.host}:{self.port}: {e}")
+            self._server = None
+            return False
+        self._server.daemon_threads = True
+        self._stopping.clear()
+        threading.Thread(target=self._server.serve_forever, name="fleet-api", daemon=True).start()
+        self.logger.debug(f"Fleet API listening on http://{self.host}:{self.port}/api/fleet")
+        return True
+
+    def stop(self):
+        if self._server is not None:
+            self._stopping.set()
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self.logger.debug("Fleet API stopped")
@@ -0,0 +1,158 @@
+# history_sync.py
+
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt6.QtCore import QThread, pyqtSignal
+from utils import HISTORY_PAGE_SIZE, HISTORY_SYNC_WORKERS
+
+# Статусы заданий Moonraker, запись которых ещё может измениться. Все остальные окончательные,
+# включая interrupted — его получает задание, шедшее во время перезапуска Moonraker
+ACTIVE_JOB_STATUSES = ("in_progress",)
+
+
+class HistoryStore:
+    """Локальное хранилище истории печати всех принтеров (SQLite) с курсором синхронизации на хост.
+
+    Каждая операция открывает своё подключение, поэтому хранилищем можно пользоваться
+    из потоков синхронизации и из GUI-потока одновременно.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._write_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    host TEXT NOT NULL,
+                    job_id TEXT NOT NULL,
+                    filename TEXT,
+                    status TEXT,
+                    start_time REAL,
+                    end_time REAL,
+                    print_duration REAL,
+                    total_duration REAL,
+                    filament_used REAL,
+                    PRIMARY KEY (host, job_id)
+                );
+                CREATE INDEX IF NOT EXISTS jobs_start_time ON jobs (start_time);
+                CREATE TABLE IF NOT EXISTS cursors (
+                    host TEXT PRIMARY KEY,
+                    since REAL NOT NULL,
+                    synced_at REAL NOT NULL
+                );
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def cursor(self, host):
+        """start_time последнего задания, до которого история хоста уже окончательно загружена."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT since FROM cursors WHERE host = ?", (host,)).fetchone()
+        return row[0] if row else 0.0
+
+    def add_jobs(self, host, jobs, since):
+        """Сохраняет страницу заданий и новый курсор одной транзакцией."""
+        rows = [
+            (host, str(job.get("job_id")), job.get("filename"), job.get("status"), job.get("start_time"),
+             job.get("end_time"), job.get("print_duration"), job.get("total_duration"), job.get("filament_used"))
+            for job in jobs if job.get("job_id") is not None
+        ]
+        with self._write_lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO cursors VALUES (?, ?, ?)", (host, since, time.time()))
+
+    def host_summary(self, since=0.0):
+        """Сводка по хостам: {host: (заданий, завершено, с ошибкой, часов печати, метров филамента)}."""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT host, COUNT(*),
+                       SUM(status = 'completed'),
+                       SUM(status IN ('error', 'klippy_shutdown', 'klippy_disconnect')),
+                       COALESCE(SUM(print_duration), 0) / 3600.0,
+                       COALESCE(SUM(filament_used), 0) / 1000.0
+                FROM jobs WHERE start_time >= ? GROUP BY host ORDER BY host
+            """, (since,)).fetchall()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def fleet_totals(self, since=0.0):
+        """Те же показатели по всему парку одной строкой."""
+        with self._connect() as conn:
+            row = conn.execute("""
+                SELECT COUNT(*), COALESCE(SUM(status = 'completed'), 0),
+                       COALESCE(SUM(status IN ('error', 'klippy_shutdown', 'klippy_disconnect')), 0),
+                       COALESCE(SUM(print_duration), 0) / 3600.0,
+                       COALESCE(SUM(filament_used), 0) / 1000.0
+                FROM jobs WHERE start_time >= ?
+            """, (since,)).fetchone()
+        return tuple(row)
+
+    def forget(self, host):
+        with self._write_lock, self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE host = ?", (host,))
+            conn.execute("DELETE FROM cursors WHERE host = ?", (host,))
+
+
+class HistorySyncThread(QThread):
+    """Догружает с принтеров только новые записи /server/history/list, хосты — параллельно."""
+
+    host_synced = pyqtSignal(str, int)  # хост, новых/обновлённых заданий
+    sync_finished = pyqtSignal(int)  # всего заданий загружено
+
+    def __init__(self, hosts, network_utils, store):
+        super().__init__()
+        self.hosts = list(hosts)
+        self.network_utils = network_utils
+        self.store = store
+        self.logger = logging.getLogger(__name__)
+
+    def sync_host(self, host):
+        """Страницы по возрастанию start_time начиная с курсора.
+
+        Курсор сдвигается только через непрерывный префикс завершённых заданий, поэтому
+        идущее задание будет перезапрошено в следующий раз и обновится на месте.
+        """
+        since = self.store.cursor(host)
+        fetched = 0
+        offset = 0
+        advancing = True
+        while True:
+            jobs = self.network_utils.get_job_history(host, since, offset, HISTORY_PAGE_SIZE)
+            if jobs is None:
+                break
+            new_since = since
+            for job in jobs:
+                status = job.get("status")
+                if advancing and status and status not in ACTIVE_JOB_STATUSES and job.get("start_time"):
+                    new_since = max(new_since, job["start_time"])
+                else:
+                    advancing = False
+            self.store.add_jobs(host, jobs, new_since)
+            fetched += len(jobs)
+            if len(jobs) < HISTORY_PAGE_SIZE:
+                break
+            offset += len(jobs)
+        self.logger.debug(f"History sync for {host}: {fetched} jobs since {since}")
+        return fetched
+
+    def run(self):
+        started = time.monotonic()
+        total = 0
+        with ThreadPoolExecutor(max_workers=HISTORY_SYNC_WORKERS, thread_name_prefix="history") as executor:
+            futures = {executor.submit(self.sync_host, host): host for host in self.hosts}
+            for future in as_completed(futures):
+                host = futures[future]
+                try:
+                    fetched = future.result()
+                except Exception as e:
+                    self.logger.error(f"History sync failed for {host}: {e}")
+                    continue
+                total += fetched
+                self.host_synced.emit(host, fetched)
+        self.logger.debug(f"History sync finished: {total} jobs from {len(self.hosts)} hosts "
+                          f"in {time.monotonic() - started:.1f}s")
+        self.sync_finished.emit(total)
@@ -0,0 +1,64 @@
+# hosts.py
+
+from utils import STATE_OFFLINE
+
+UNKNOWN_NAME = "Неизвестно"
+
+
+class HostRecord:
+    """Компактная запись о хосте, которую создаёт сканер и используют таблица и конфигурация."""
+
+    __slots__ = ("address", "original_name", "custom_name", "state", "latency", "last_seen", "ssh")
+
+    def __init__(self, address, original_name=UNKNOWN_NAME, custom_name=None, state=STATE_OFFLINE,
+                 latency=None, last_seen=None, ssh=None):
+        self.address = address
+        self.original_name = original_name or UNKNOWN_NAME
+        self.custom_name = custom_name
+        self.state = state
+        self.latency = latency  # RTT подключения к Moonraker, секунды
+        self.last_seen = last_seen  # time.time() последнего ответа
+        self.ssh = ssh  # доступен ли SSH-порт при последней проверке (None — не проверялся)
+
+    @property
+    def display_name(self):
+        return self.custom_name if self.custom_name is not None else self.original_name
+
+    @property
+    def online(self):
+        return self.state != STATE_OFFLINE
+
+    def merge(self, other):
+        """Переносит данные свежего результата сканирования, сохраняя пользовательское имя."""
+        if other.original_name != UNKNOWN_NAME:
+            self.original_name = other.original_name
+        self.state = other.state
+        if other.latency is not None:
+            self.latency = other.latency
+        if other.last_seen is not None:
+            self.last_seen = other.last_seen
+        if other.ssh is not None:
+            self.ssh = other.ssh
+
+    def to_config(self):
+        return {"original_name": self.original_name, "custom_name": self.custom_name}
+
+    @classmethod
+    def from_config(cls, address, data):
+        """Создаёт запись из секции hosts config.json (строка-имя или словарь)."""
+        if isinstance(data, str):
+            return cls(address, data, data)
+        data = data or {}
+        return cls(address, data.get("original_name"), data.get("custom_name"))
+
+    def __repr__(self):
+        return f"HostRecord({self.address!r}, {self.display_name!r}, {self.state!r})"
+
+
+def hosts_from_config(hosts):
+    """Преобразует секцию hosts конфигурации в {адрес: HostRecord}."""
+    return {address: HostRecord.from_config(address, data) for address, data in (hosts or {}).items()}
+
+
+def hosts_to_config(hosts):
+    return {address: record.to_config() for address, record in hosts.items()}
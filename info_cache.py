@@ -0,0 +1,179 @@
+# info_cache.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from utils import PRINTER_INFO_TTL_S, PRINTER_INFO_NEGATIVE_TTL_S, PRINTER_INFO_STALE_TTL_S, \
+    PRINTER_INFO_CACHE_MIN_SIZE, PRINTER_INFO_REFRESH_WORKERS
+
+
+class SingleFlight:
+    """Объединяет одновременные вызовы с одинаковым ключом: выполняется один, остальные ждут его результат."""
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.shared += 1
+        if not leader:
+            if self.metrics is not None:
+                self.metrics.inc("http_requests_coalesced_total")
+            return future.result()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+        future.set_result(result)
+        return result
+
+
+class PrinterInfoCache:
+    """Потокобезопасный LRU-кэш ответов принтеров.
+
+    Успешные ответы живут ttl секунд, неудачные — negative_ttl (чтобы вернувшийся
+    принтер появлялся быстро). Просроченный успешный ответ ещё stale_ttl секунд
+    отдаётся сразу, а обновляется в фоне (stale-while-revalidate).
+    """
+
+    def __init__(self, ttl=PRINTER_INFO_TTL_S, negative_ttl=PRINTER_INFO_NEGATIVE_TTL_S,
+                 stale_ttl=PRINTER_INFO_STALE_TTL_S, maxsize=PRINTER_INFO_CACHE_MIN_SIZE, metrics=None,
+                 single_flight=None):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self.metrics = metrics
+        # Промахи и фоновые обновления одного хоста выполняются одним запросом
+        self.single_flight = single_flight if single_flight is not None else SingleFlight(metrics)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # host -> (value, ok, fetched_at)
+        self._refreshing = set()
+        self._executor = None
+        self.stats = {"hit": 0, "stale": 0, "negative": 0, "miss": 0, "refresh": 0, "eviction": 0}
+
+    def ensure_capacity(self, fleet_size):
+        """Подстраивает размер кэша под парк, чтобы обход всех хостов не вытеснял записи."""
+        with self._lock:
+            self.maxsize = max(PRINTER_INFO_CACHE_MIN_SIZE, fleet_size * 2)
+
+    def _count(self, result):
+        self.stats[result] += 1
+        if self.metrics is not None:
+            self.metrics.inc("printer_info_cache_total", {"result": result})
+
+    def _lookup(self, host, loader, revalidate):
+        """Возвращает (найдено, значение) из кэша, при необходимости запуская фоновое обновление."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None:
+                return False, None
+            value, ok, fetched_at = entry
+            age = now - fetched_at
+            if ok and age < self.ttl:
+                self._entries.move_to_end(host)
+                self._count("hit")
+                return True, value
+            if not ok and age < self.negative_ttl:
+                self._count("negative")
+                return True, value
+            if ok and age < self.ttl + self.stale_ttl and revalidate:
+                self._entries.move_to_end(host)
+                self._count("stale")
+                self._schedule_refresh(host, loader)
+                return True, value
+        return False, None
+
+    def get(self, host, loader):
+        """Значение из кэша или результат loader(host) -> (value, ok), вызванного в текущем потоке."""
+        found, value = self._lookup(host, loader, revalidate=True)
+        if found:
+            return value
+        with self._lock:
+            self._count("miss")
+        return self._load(host, loader)
+
+    def peek(self, host, loader=None):
+        """Неблокирующий доступ: значение из кэша (в т.ч. устаревшее) или None.
+
+        При промахе и заданном loader загрузка выполняется в фоне.
+        """
+        found, value = self._lookup(host, loader, revalidate=loader is not None)
+        if found:
+            return value
+        with self._lock:
+            entry = self._entries.get(host)
+            if loader is not None:
+                self._schedule_refresh(host, loader)
+            return entry[0] if entry is not None else None
+
+    def put(self, host, value, ok=True):
+        with self._lock:
+            self._entries[host] = (value, ok, time.monotonic())
+            self._entries.move_to_end(host)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats["eviction"] += 1
+
+    def invalidate(self, host):
+        with self._lock:
+            self._entries.pop(host, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, host):
+        with self._lock:
+            return host in self._entries
+
+    def hit_rate(self):
+        with self._lock:
+            served = self.stats["hit"] + self.stats["stale"] + self.stats["negative"]
+            total = served + self.stats["miss"]
+        return served / total if total else None
+
+    def _load(self, host, loader):
+        return self.single_flight.do(("printer_info", host), self._load_now, host, loader)
+
+    def _load_now(self, host, loader):
+        value, ok = loader(host)
+        self.put(host, value, ok)
+        return value
+
+    def _schedule_refresh(self, host, loader):
+        # Вызывается под self._lock; не более одного фонового обновления на хост
+        if host in self._refreshing:
+            return
+        self._refreshing.add(host)
+        self.stats["refresh"] += 1
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=PRINTER_INFO_REFRESH_WORKERS,
+                                                thread_name_prefix="info-refresh")
+        self._executor.submit(self._refresh, host, loader)
+
+    def _refresh(self, host, loader):
+        try:
+            self._load(host, loader)
+        except Exception as e:
+            self.logger.debug(f"Background refresh failed for {host}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(host)
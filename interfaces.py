@@ -0,0 +1,60 @@
+# interfaces.py
+
+import ipaddress
+import logging
+from PyQt6.QtNetwork import QNetworkInterface, QAbstractSocket
+from utils import SCAN_AUTO_SKIP_INTERFACES, SCAN_AUTO_MIN_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# Типы интерфейсов, за которыми не бывает принтеров в локальной сети
+SKIPPED_TYPES = (QNetworkInterface.InterfaceType.Loopback, QNetworkInterface.InterfaceType.Virtual)
+
+
+def skip_reason(interface):
+    """Причина, по которой интерфейс не сканируется, или None."""
+    flags = interface.flags()
+    if not (flags & QNetworkInterface.InterfaceFlag.IsUp and flags & QNetworkInterface.InterfaceFlag.IsRunning):
+        return "down"
+    if flags & QNetworkInterface.InterfaceFlag.IsLoopBack or interface.type() in SKIPPED_TYPES:
+        return "loopback/virtual"
+    if flags & QNetworkInterface.InterfaceFlag.IsPointToPoint:
+        return "point-to-point"
+    name = interface.name().lower()
+    readable = interface.humanReadableName().lower()
+    for marker in SCAN_AUTO_SKIP_INTERFACES:
+        if name.startswith(marker) or marker in readable:
+            return f"policy ({marker})"
+    return None
+
+
+def local_subnets(min_prefix=SCAN_AUTO_MIN_PREFIX):
+    """IPv4-подсети всех подходящих локальных интерфейсов с их настоящими префиксами.
+
+    Возвращает [(имя интерфейса, IPv4Network)] без повторов. Link-local адреса пропускаются,
+    а подсеть шире /min_prefix сужается до /min_prefix вокруг адреса интерфейса, чтобы
+    автоматическое сканирование не уходило в десятки тысяч адресов.
+    """
+    result = []
+    seen = set()
+    for interface in QNetworkInterface.allInterfaces():
+        reason = skip_reason(interface)
+        if reason is not None:
+            logger.debug(f"Skipping interface {interface.humanReadableName()}: {reason}")
+            continue
+        for entry in interface.addressEntries():
+            address = entry.ip()
+            if address.protocol() != QAbstractSocket.NetworkLayerProtocol.IPv4Protocol:
+                continue
+            ip = ipaddress.IPv4Address(address.toString())
+            prefix = entry.prefixLength()
+            if ip.is_link_local or ip.is_loopback or not 0 < prefix <= 32:
+                continue
+            if prefix < min_prefix:
+                logger.debug(f"Narrowing {ip}/{prefix} on {interface.humanReadableName()} to /{min_prefix}")
+                prefix = min_prefix
+            network = ipaddress.ip_network(f"{ip}/{prefix}", strict=False)
+            if network not in seen:
+                seen.add(network)
+                result.append((interface.humanReadableName(), network))
+    return result
@@ -0,0 +1,203 @@
+# job_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+from utils import JOB_CACHE_MAX_BYTES, JOB_CACHE_WORKERS, JOB_THUMBNAIL_MAX_WIDTH
+
+
+class JobCache:
+    """Дисковый кэш метаданных заданий и миниатюр с LRU-вытеснением по суммарному размеру.
+
+    Записи адресуются ключом (хост, путь файла, modified) и переживают перезапуск;
+    миниатюры хранятся по SHA-256 содержимого, так что один файл, загруженный на
+    много принтеров, занимает место один раз.
+    """
+
+    def __init__(self, directory, max_bytes=JOB_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.blob_dir = os.path.join(directory, "blobs")
+        self.index_file = os.path.join(directory, "index.json")
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.entries = {}  # ключ -> {"metadata", "thumbnail", "accessed"}
+        self.blobs = {}  # sha256 -> размер
+        self.latest = {}  # хост -> {"filename", "key"}
+        self._load_index()
+
+    @staticmethod
+    def key(host, filename, modified):
+        return f"{host}|{filename}|{modified}"
+
+    def _load_index(self):
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self.entries = index.get("entries", {})
+            self.blobs = index.get("blobs", {})
+            self.latest = index.get("latest", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Failed to load job cache index, starting empty: {e}")
+
+    def _save_index(self):
+        # Вызывается под self._lock; запись через временный файл, чтобы не оставить обрезанный индекс
+        temp_file = self.index_file + ".tmp"
+        try:
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump({"entries": self.entries, "blobs": self.blobs, "latest": self.latest}, f,
+                          ensure_ascii=False)
+            os.replace(temp_file, self.index_file)
+        except OSError as e:
+            self.logger.error(f"Failed to save job cache index: {e}")
+
+    def blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry["accessed"] = time.time()
+            return dict(entry) if entry is not None else None
+
+    def get_latest(self, host, filename):
+        """Последняя известная запись для файла, который печатает хост, без сетевых запросов."""
+        with self._lock:
+            latest = self.latest.get(host)
+            if latest is None or latest["filename"] != filename:
+                return None, None
+            entry = self.entries.get(latest["key"])
+            return latest["key"], dict(entry) if entry is not None else None
+
+    def put(self, host, filename, key, metadata, thumbnail=None):
+        digest = None
+        if thumbnail:
+            digest = hashlib.sha256(thumbnail).hexdigest()
+            path = self.blob_path(digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_file = f"{path}.{threading.get_ident()}.tmp"
+                with open(temp_file, "wb") as f:
+                    f.write(thumbnail)
+                os.replace(temp_file, path)
+        with self._lock:
+            if digest is not None:
+                self.blobs[digest] = len(thumbnail)
+            self.entries[key] = {"metadata": metadata, "thumbnail": digest, "accessed": time.time()}
+            self.latest[host] = {"filename": filename, "key": key}
+            self._evict()
+            self._save_index()
+            return dict(self.entries[key]) if key in self.entries else None
+
+    def set_latest(self, host, filename, key):
+        with self._lock:
+            if self.latest.get(host) != {"filename": filename, "key": key}:
+                self.latest[host] = {"filename": filename, "key": key}
+                self._save_index()
+
+    def size(self):
+        with self._lock:
+            return self._size()
+
+    def _size(self):
+        metadata_size = sum(len(json.dumps(entry["metadata"])) for entry in self.entries.values())
+        return metadata_size + sum(self.blobs.values())
+
+    def _evict(self):
+        # Вызывается под self._lock: удаляем давно не использованные записи, затем осиротевшие миниатюры
+        if self._size() <= self.max_bytes:
+            return
+        for key in sorted(self.entries, key=lambda k: self.entries[k]["accessed"]):
+            del self.entries[key]
+            if self._size() <= self.max_bytes:
+                break
+        referenced = {entry["thumbnail"] for entry in self.entries.values()}
+        for digest in [d for d in self.blobs if d not in referenced]:
+            del self.blobs[digest]
+            try:
+                os.remove(self.blob_path(digest))
+            except OSError:
+                pass
+        self.latest = {host: latest for host, latest in self.latest.items() if latest["key"] in self.entries}
+
+
+class JobInfoLoader(QObject):
+    """Загружает сведения о текущем задании хоста в фоне и отдаёт их сигналом в GUI-поток.
+
+    Сначала отдаётся запись из дискового кэша, затем метаданные проверяются один раз
+    за сессию на каждый новый файл; миниатюра скачивается только для новой пары (путь, modified).
+    """
+
+    # Хост, {"filename", "estimated_time", "size", "thumbnail"} или None
+    loaded = pyqtSignal(str, object)
+
+    def __init__(self, network_utils, cache, parent=None):
+        super().__init__(parent)
+        self.network_utils = network_utils
+        self.cache = cache
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=JOB_CACHE_WORKERS, thread_name_prefix="job-info")
+        self._validated = {}  # хост -> имя файла, проверенного в этой сессии
+
+    def request(self, host, filename):
+        if not filename:
+            self._validated.pop(host, None)
+            self.loaded.emit(host, None)
+            return
+        if self._validated.get(host) == filename:
+            return
+        self._validated[host] = filename
+        key, entry = self.cache.get_latest(host, filename)
+        if entry is not None:
+            self.loaded.emit(host, self._info(filename, entry))
+        self._executor.submit(self._revalidate, host, filename, key)
+
+    def _info(self, filename, entry):
+        metadata = entry.get("metadata") or {}
+        digest = entry.get("thumbnail")
+        return {
+            "filename": filename,
+            "estimated_time": metadata.get("estimated_time"),
+            "size": metadata.get("size"),
+            "thumbnail": self.cache.blob_path(digest) if digest else None,
+        }
+
+    def _revalidate(self, host, filename, cached_key):
+        try:
+            metadata = self.network_utils.get_file_metadata(host, filename)
+            if metadata is None:
+                return
+            key = self.cache.key(host, filename, metadata.get("modified"))
+            if key == cached_key:
+                return
+            entry = self.cache.get(key)
+            if entry is None:
+                thumbnail = None
+                thumbnails = [t for t in metadata.get("thumbnails") or [] if t.get("relative_path")]
+                if thumbnails:
+                    # Самая крупная миниатюра, не превышающая JOB_THUMBNAIL_MAX_WIDTH (или самая мелкая)
+                    fitting = [t for t in thumbnails if t.get("width", 0) <= JOB_THUMBNAIL_MAX_WIDTH]
+                    best = max(fitting, key=lambda t: t.get("width", 0)) if fitting else \
+                        min(thumbnails, key=lambda t: t.get("width", 0))
+                    thumbnail = self.network_utils.get_file_thumbnail(host, filename, best["relative_path"])
+                stored = {field: metadata.get(field) for field in ("modified", "size", "estimated_time")}
+                entry = self.cache.put(host, filename, key, stored, thumbnail)
+                self.logger.debug(f"Cached job info for {host}:{filename} (thumbnail={thumbnail is not None})")
+            else:
+                self.cache.set_latest(host, filename, key)
+            if entry is not None and self._validated.get(host) == filename:
+                self.loaded.emit(host, self._info(filename, entry))
+        except Exception as e:
+            self.logger.error(f"Failed to load job info for {host}:{filename}: {e}")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,202 @@
+# log_tail.py
+
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from utils import LOG_TAIL_BYTES, LOG_CACHE_MAX_BYTES, LOG_POLL_INTERVAL_MS, LOG_TAIL_WORKERS
+
+CONTENT_RANGE = re.compile(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)")
+
+
+def parse_content_range(header):
+    """Разбирает Content-Range: (start, end включительно, total) — неизвестные части как None."""
+    match = CONTENT_RANGE.match(header or "")
+    if not match:
+        return None, None, None
+    start, end, total = match.groups()
+    return (int(start) if start is not None else None, int(end) if end is not None else None,
+            int(total) if total not in (None, "*") else None)
+
+
+class LogSegment:
+    """Локальная копия непрерывного хвоста удалённого лога: байты [start, end) и их файл на диске."""
+
+    def __init__(self, directory, host, name, max_bytes=LOG_CACHE_MAX_BYTES):
+        base = re.sub(r"[^\w.-]", "_", f"{host}_{name}")
+        self.data_file = os.path.join(directory, base)
+        self.meta_file = self.data_file + ".json"
+        self.max_bytes = max_bytes
+        self.start = 0
+        self.end = 0
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if os.path.getsize(self.data_file) == meta["end"] - meta["start"]:
+                self.start, self.end = meta["start"], meta["end"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def read(self):
+        if self.end == self.start:
+            return b""
+        with open(self.data_file, "rb") as f:
+            return f.read()
+
+    def reset(self, start, data):
+        with open(self.data_file, "wb") as f:
+            f.write(data)
+        self.start, self.end = start, start + len(data)
+        self._save_meta()
+
+    def append(self, data):
+        with open(self.data_file, "ab") as f:
+            f.write(data)
+        self.end += len(data)
+        if self.end - self.start > self.max_bytes:
+            # Отбрасываем начало, сохраняя последние max_bytes байт
+            keep = self.read()[-self.max_bytes:]
+            self.reset(self.end - len(keep), keep)
+        else:
+            self._save_meta()
+
+    def _save_meta(self):
+        with open(self.meta_file, "w", encoding="utf-8") as f:
+            json.dump({"start": self.start, "end": self.end}, f)
+
+
+class LogTailer:
+    """Следит за одним удалённым логом, запрашивая только байты после уже полученных (HTTP Range)."""
+
+    def __init__(self, network_utils, host, name, directory):
+        self.network_utils = network_utils
+        self.host = host
+        self.name = name
+        self.segment = LogSegment(directory, host, name)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self.shown = None  # смещение, до которого текст уже отдан в просмотр
+
+    def cached_text(self):
+        """Текст из локального кэша (целыми строками) для мгновенного показа."""
+        with self._lock:
+            data = self.segment.read()
+            first = self._first_line(data)
+            cut = data.rfind(b"\n") + 1
+            self.shown = self.segment.start + max(cut, first)
+            return data[first:cut].decode("utf-8", errors="replace")
+
+    def _first_line(self, data):
+        # Хвост, начатый с середины файла, обычно начинается с обрывка строки — его не показываем
+        return data.find(b"\n") + 1 if self.segment.start > 0 else 0
+
+    def poll(self):
+        """Догружает новые байты; возвращает (новый текст целыми строками, лог был перезапущен)."""
+        with self._lock:
+            segment = self.segment
+            reset = False
+            if segment.end == 0:
+                status, content_range, data = self.network_utils.fetch_log_range(self.host, self.name,
+                                                                                 suffix=LOG_TAIL_BYTES)
+            else:
+                status, content_range, data = self.network_utils.fetch_log_range(self.host, self.name,
+                                                                                 start=segment.end)
+            start, _, total = parse_content_range(content_range)
+            if status == 206 and start is not None:
+                if segment.end == 0 or start != segment.end:
+                    segment.reset(start, data)
+                    reset = True
+                else:
+                    segment.append(data)
+            elif status == 416:
+                if total is not None and total < segment.end:
+                    # Лог ротирован или обрезан: начинаем заново с хвоста
+                    self.logger.debug(f"Log {self.name} on {self.host} shrank to {total}, re-reading tail")
+                    segment.reset(0, b"")
+                    self.shown = None
+                    return "", True
+            elif status == 200:
+                # Сервер не поддержал Range: берём хвост полного ответа
+                segment.reset(max(len(data) - LOG_TAIL_BYTES, 0), data[-LOG_TAIL_BYTES:])
+                reset = True
+            elif status is not None:
+                self.logger.debug(f"Unexpected status {status} tailing {self.name} on {self.host}")
+            data = segment.read()
+            if reset or self.shown is None or self.shown < segment.start:
+                self.shown = segment.start + self._first_line(data)
+                reset = True
+            offset = self.shown - segment.start
+            cut = data.rfind(b"\n") + 1
+            if cut <= offset:
+                return "", reset
+            text = data[offset:cut].decode("utf-8", errors="replace")
+            self.shown = segment.start + cut
+            return text, reset
+
+
+class LogFollower(QObject):
+    """Периодически опрашивает несколько удалённых логов в общем пуле потоков.
+
+    Новый текст приходит сигналом text_received в GUI-поток.
+    """
+
+    # Хост, новый текст, заменить ли показанный текст целиком
+    text_received = pyqtSignal(str, str, bool)
+
+    def __init__(self, network_utils, directory, name="klippy.log", parent=None):
+        super().__init__(parent)
+        self.network_utils = network_utils
+        self.directory = directory
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(directory, exist_ok=True)
+        self.tailers = {}
+        self._polling = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=LOG_TAIL_WORKERS, thread_name_prefix="log-tail")
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll_all)
+
+    def follow(self, host):
+        """Начинает следить за логом хоста; возвращает уже закэшированный текст."""
+        if host not in self.tailers:
+            self.tailers[host] = LogTailer(self.network_utils, host, self.name, self.directory)
+        if not self.timer.isActive():
+            self.timer.start(LOG_POLL_INTERVAL_MS)
+        text = self.tailers[host].cached_text()
+        self._submit(host)
+        return text
+
+    def unfollow(self, host):
+        self.tailers.pop(host, None)
+        if not self.tailers:
+            self.timer.stop()
+
+    def poll_all(self):
+        for host in list(self.tailers):
+            self._submit(host)
+
+    def _submit(self, host):
+        with self._lock:
+            if host in self._polling:
+                return
+            self._polling.add(host)
+        self._executor.submit(self._poll, host, self.tailers[host])
+
+    def _poll(self, host, tailer):
+        try:
+            text, reset = tailer.poll()
+            if (text or reset) and self.tailers.get(host) is tailer:
+                self.text_received.emit(host, text, reset)
+        except Exception as e:
+            self.logger.error(f"Failed to tail {self.name} on {host}: {e}")
+        finally:
+            with self._lock:
+                self._polling.discard(host)
+
+    def shutdown(self):
+        self.timer.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
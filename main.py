@@ -1,5 +1,6 @@
 # main.py
 
+import multiprocessing
 import sys
 from PyQt6.QtWidgets import QApplication
 from ui import MainWindow
@@ -24,4 +25,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Нужно для процессов многопроцессного сканирования в собранном приложении
+    multiprocessing.freeze_support()
     main()
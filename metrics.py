@@ -0,0 +1,188 @@
+# metrics.py
+
+import logging
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from utils import METRICS_SAMPLE_WINDOW
+
+# Описания метрик для экспорта в формате Prometheus
+METRIC_HELP = {
+    "scanner_probes_total": ("counter", "Port probes by result"),
+    "discovery_probes_total": ("counter", "Background discovery probes by result"),
+    "discovery_pass_duration_seconds": ("summary", "Duration of full background discovery passes"),
+    "scanner_connect_latency_seconds": ("summary", "TCP connect latency of answered probes"),
+    "scanner_queue_depth": ("gauge", "Probes in flight in the scan executor"),
+    "scanner_concurrency_window": ("gauge", "Current AIMD concurrency window"),
+    "scan_cycle_duration_seconds": ("summary", "Duration of scan and refresh cycles"),
+    "printer_info_latency_seconds": ("summary", "Latency of /printer/info requests per host"),
+    "printer_info_errors_total": ("counter", "Failed /printer/info requests per host"),
+    "printer_info_cache_total": ("counter", "printer info cache lookups by result"),
+    "http_requests_coalesced_total": ("counter", "Requests served by joining an identical in-flight request"),
+    "resolver_lookups_total": ("counter", "Host name cache lookups by result"),
+    "resolver_latency_seconds": ("summary", "Latency of getaddrinfo() calls for known host names"),
+    "export_events_total": ("counter", "Exported events per sink by result (sent, spooled, rejected, dropped)"),
+    "export_batch_latency_seconds": ("summary", "Latency of event batch POSTs per sink"),
+    "export_queue_depth": ("gauge", "Events waiting in memory per sink"),
+    "export_spool_bytes": ("gauge", "Undelivered events spooled to disk per sink, bytes"),
+}
+
+QUANTILES = (0.5, 0.99)
+
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    items = list(key) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in items) + "}"
+
+
+class Summary:
+    """Скользящее окно наблюдений с подсчётом квантилей и накопительными count/sum."""
+
+    def __init__(self, window=METRICS_SAMPLE_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class MetricsRegistry:
+    """Потокобезопасный реестр счётчиков, гейджей и сводок сканера и HTTP-слоя."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.summaries = {}
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, labels=None):
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, labels=None):
+        key = (name, _label_key(labels))
+        with self._lock:
+            if key not in self.summaries:
+                self.summaries[key] = Summary()
+            self.summaries[key].observe(value)
+
+    def counter_value(self, name, labels=None):
+        with self._lock:
+            return self.counters.get((name, _label_key(labels)), 0)
+
+    def gauge_value(self, name, labels=None, default=None):
+        with self._lock:
+            return self.gauges.get((name, _label_key(labels)), default)
+
+    def summary_stats(self, name, label=None):
+        """Возвращает {значение метки: (count, p50, p99)} для всех рядов сводки."""
+        with self._lock:
+            return {
+                dict(key).get(label, "") if label else "": (
+                    summary.count, summary.quantile(0.5), summary.quantile(0.99))
+                for (metric, key), summary in self.summaries.items() if metric == name
+            }
+
+    def cache_hit_rate(self):
+        """Доля запросов к кэшу, обслуженных без ожидания сети (свежие, устаревшие и отрицательные)."""
+        hits = sum(self.counter_value("printer_info_cache_total", {"result": result})
+                   for result in ("hit", "stale", "negative"))
+        misses = self.counter_value("printer_info_cache_total", {"result": "miss"})
+        return hits / (hits + misses) if hits + misses else None
+
+    def to_prometheus(self):
+        """Текстовый формат экспозиции Prometheus 0.0.4."""
+        lines = []
+        with self._lock:
+            series = {}
+            for (name, key), value in self.counters.items():
+                series.setdefault(name, []).append(f"{name}{_format_labels(key)} {value}")
+            for (name, key), value in self.gauges.items():
+                series.setdefault(name, []).append(f"{name}{_format_labels(key)} {value}")
+            for (name, key), summary in self.summaries.items():
+                rows = series.setdefault(name, [])
+                for q in QUANTILES:
+                    value = summary.quantile(q)
+                    if value is not None:
+                        rows.append(f"{name}{_format_labels(key, [('quantile', q)])} {value:.6f}")
+                rows.append(f"{name}_sum{_format_labels(key)} {summary.total:.6f}")
+                rows.append(f"{name}_count{_format_labels(key)} {summary.count}")
+        for name in sorted(series):
+            kind, help_text = METRIC_HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(series[name])
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Локальный HTTP-сервер, отдающий /metrics в формате Prometheus."""
+
+    def __init__(self, registry, port, host="127.0.0.1"):
+        self.registry = registry
+        self.port = port
+        self.host = host
+        self.logger = logging.getLogger(__name__)
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logging.getLogger(__name__).debug(f"Metrics request: {format % args}")
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            self.logger.error(f"Failed to start metrics server on {self.host}:{self.port}: {e}")
+            self._server = None
+            return False
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        self.logger.debug(f"Metrics server listening on http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self.logger.debug("Metrics server stopped")
@@ -2,72 +2,311 @@
 
 import socket
 import ipaddress
+import threading
+import time
 import requests
 import logging
-from cachetools import TTLCache
-from utils import DEFAULT_MOONRAKER_PORT, DEFAULT_HTTP_TIMEOUT_S, SCAN_CONNECT_TIMEOUT_S
+from urllib.parse import quote
+from info_cache import PrinterInfoCache, SingleFlight
+from interfaces import local_subnets
+from metrics import MetricsRegistry
+from resolver import HostResolver, ResolveError
+from scan_control import RttEstimator, AimdController, connect_probe
+from utils import DEFAULT_MOONRAKER_PORT, DEFAULT_HTTP_TIMEOUT_S, DEFAULT_SSH_PORT, SCAN_CONNECT_TIMEOUT_S, \
+    SSH_CHECK_TTL_S, UPLOAD_READ_TIMEOUT_S
+
+# Поля расширенного статуса: ключ -> (объект Klipper, атрибуты, подпись)
+STATUS_FIELDS = {
+    "progress": ("display_status", ("progress",), "Прогресс"),
+    "filename": ("print_stats", ("filename",), "Файл"),
+    "print_duration": ("print_stats", ("print_duration",), "Время печати"),
+    "eta": ("print_stats", ("print_duration",), "Осталось"),
+    "extruder": ("extruder", ("temperature", "target"), "Экструдер"),
+    "heater_bed": ("heater_bed", ("temperature", "target"), "Стол"),
+}
+DEFAULT_STATUS_FIELDS = ["progress", "filename", "eta", "extruder", "heater_bed"]
+
+# Нагреватели, температуры которых входят в телеметрию
+TELEMETRY_HEATERS = ("extruder", "heater_bed")
+
+# Состояния print_stats, которые при готовом Klippy показываются вместо состояния Klippy
+PRINT_STATES = ("printing", "paused", "error")
 
 
 class NetworkUtils:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        # Кэш для get_printer_info с TTL 30 секунд
-        self.printer_info_cache = TTLCache(maxsize=100, ttl=30)
+        self.metrics = MetricsRegistry()
+        # Кэш для get_printer_info: отдельные TTL для успехов и ошибок, фоновое обновление устаревших
+        # Одновременные запросы к одному хосту объединяются в один HTTP-вызов
+        self.single_flight = SingleFlight(self.metrics)
+        self.printer_info_cache = PrinterInfoCache(metrics=self.metrics, single_flight=self.single_flight)
+        # Оценки RTT по подсетям и окно параллелизма сохраняются между сканированиями
+        self.rtt_estimators = {}
+        self._rtt_lock = threading.Lock()
+        self.scan_concurrency = AimdController()
+        # Имена хостов (из /printer/info) и последние поля расширенного статуса для расчёта изменений
+        self.hostnames = {}
+        self.last_details = {}
+        self.details_seen = {}  # хост -> time.monotonic() последнего расширенного статуса
+        self._details_lock = threading.Lock()
+        # Результаты проверки SSH-порта: хост -> (доступен, time.monotonic() проверки)
+        self.ssh_status = {}
+        # DNS-имена известных хостов разрешаются один раз на TTL, а не в каждом сокете и запросе
+        self.resolver = HostResolver(metrics=self.metrics)
+
+    def _base_url(self, host):
+        """http://адрес:порт Moonraker; бросает ResolveError (requests.ConnectionError) для неразрешимого имени."""
+        return f"http://{self.resolver.resolve(host)}:{DEFAULT_MOONRAKER_PORT}"
 
-    def get_local_subnet(self):
-        """Получает подсеть локального компьютера."""
+    def _probe(self, host, port, timeout):
+        try:
+            address = self.resolver.resolve(str(host))
+        except ResolveError:
+            return False, None, socket.EAI_NONAME
+        return connect_probe(address, port, timeout)
+
+    def get_local_subnets(self):
+        """Подсети всех подходящих локальных интерфейсов (см. interfaces.local_subnets).
+
+        Если ни один интерфейс не подошёл, берётся /24 вокруг адреса маршрута по умолчанию,
+        а при отсутствии сети — 192.168.1.0/24.
+        """
+        try:
+            subnets = [str(network) for _, network in local_subnets()]
+            if subnets:
+                self.logger.debug(f"Local subnets detected: {subnets}")
+                return subnets
+        except Exception as e:
+            self.logger.error(f"Failed to enumerate network interfaces: {e}")
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
                 s.connect(('10.255.255.255', 1))
                 ip = s.getsockname()[0]
                 subnet = str(ipaddress.ip_network(f"{ip}/24", strict=False))
-                self.logger.debug(f"Local subnet detected: {subnet}")
-                return subnet
+                self.logger.debug(f"Local subnet detected from default route: {subnet}")
+                return [subnet]
         except Exception as e:
             self.logger.error(f"Failed to get local subnet: {e}")
-            return "192.168.1.0/24"  # Fallback subnet
+            return ["192.168.1.0/24"]  # Fallback subnet
+
+    def get_rtt_estimator(self, key):
+        """Возвращает оценщик RTT для подсети (или другой группы адресов)."""
+        with self._rtt_lock:
+            if key not in self.rtt_estimators:
+                self.rtt_estimators[key] = RttEstimator()
+            return self.rtt_estimators[key]
+
+    def probe_port(self, ip, port=DEFAULT_MOONRAKER_PORT, timeout=SCAN_CONNECT_TIMEOUT_S):
+        """Проверяет порт и измеряет время ответа.
+
+        Возвращает кортеж (open: bool, rtt: float | None, error: int).
+        rtt известен, если хост ответил (принял или отклонил подключение).
+        """
+        is_open, rtt, error = self._probe(ip, port, timeout)
+        self.logger.debug(f"Scanned {ip}:{port}, result={error}")
+        if rtt is not None:
+            self.metrics.observe("scanner_connect_latency_seconds", rtt)
+        return is_open, rtt, error
 
     def scan_port(self, ip, port=DEFAULT_MOONRAKER_PORT, timeout=SCAN_CONNECT_TIMEOUT_S):
         """Проверяет, открыт ли порт на указанном IP."""
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(timeout)
-                result = sock.connect_ex((str(ip), port))
-                self.logger.debug(f"Scanned {ip}:{port}, result={result}")
-                return str(ip) if result == 0 else None
-        except Exception as e:
-            self.logger.debug(f"Scan port failed for {ip}: {e}")
-            return None
+        is_open, _, _ = self.probe_port(ip, port, timeout)
+        return str(ip) if is_open else None
+
+    def check_ssh(self, host, timeout=SCAN_CONNECT_TIMEOUT_S):
+        """Доступен ли SSH-порт хоста; повторная проверка не чаще раза в SSH_CHECK_TTL_S.
+
+        Вызывается из потоков сканирования, GUI-поток читает только сохранённый результат.
+        """
+        cached = self.ssh_status.get(host)
+        if cached is not None and time.monotonic() - cached[1] < SSH_CHECK_TTL_S:
+            return cached[0]
+        is_open, _, error = self._probe(host, DEFAULT_SSH_PORT, timeout)
+        self.ssh_status[host] = (is_open, time.monotonic())
+        self.logger.debug(f"SSH port on {host}: open={is_open} (errno={error})")
+        return is_open
 
     def get_printer_info(self, host):
         """Получает hostname и state ПРЯМО из /printer/info (без objects/query), с кэшированием."""
-        if host in self.printer_info_cache:
-            self.logger.debug(f"Retrieved printer info for {host} from cache")
-            return self.printer_info_cache[host]
+        return self.printer_info_cache.get(host, self._fetch_printer_info)
+
+    def get_hostname(self, host):
+        """Последнее известное имя хоста без сетевых запросов."""
+        return self.hostnames.get(host, "Неизвестно")
+
+    def peek_printer_info(self, host):
+        """Неблокирующий вариант get_printer_info для GUI-потока.
 
-        hostname = "Неизвестно"
+        Возвращает закэшированный (возможно, устаревший) ответ или None; при промахе
+        запрос выполняется в фоне и попадёт в кэш к следующему обновлению.
+        """
+        return self.printer_info_cache.peek(host, self._fetch_printer_info)
+
+    def _fetch_printer_info(self, host):
+        """Запрашивает /printer/info; возвращает ((hostname, state), успех)."""
+        hostname = self.hostnames.get(host, "Неизвестно")
         state = "Недоступен"
+        ok = False
+        started = time.monotonic()
         try:
             response = requests.get(
-                f"http://{host}:{DEFAULT_MOONRAKER_PORT}/printer/info",
+                f"{self._base_url(host)}/printer/info",
                 timeout=DEFAULT_HTTP_TIMEOUT_S
             )
+            self.metrics.observe("printer_info_latency_seconds", time.monotonic() - started, {"host": host})
             if response.status_code == 200:
                 data = response.json()
                 result = data.get("result", {}) if isinstance(data, dict) else {}
                 hostname = result.get("hostname", hostname)
                 state = result.get("state", state)
+                self.hostnames[host] = hostname
+                ok = True
             else:
                 self.logger.debug(f"/printer/info returned non-200 for {host}: {response.status_code}")
             self.logger.debug(f"Printer info for {host}: hostname={hostname}, state={state}")
-        except requests.RequestException as e:
+        except (requests.RequestException, ValueError) as e:
+            self.metrics.inc("printer_info_errors_total", {"host": host})
             self.logger.debug(f"Failed to get printer info for {host}: {e}")
 
-        self.printer_info_cache[host] = (hostname, state)
-        return hostname, state
+        return (hostname, state), ok
+
+    def get_printer_status(self, host, fields):
+        """Получает состояние и выбранные поля одним запросом /printer/objects/query.
+
+        Возвращает кортеж (hostname, state, details). Имя хоста берётся из /printer/info
+        только при первом обращении, далее из кэша имён. Одновременные вызовы для одного
+        хоста и набора полей разделяют один запрос.
+        """
+        return self.single_flight.do(("printer_status", host, tuple(fields)), self._fetch_printer_status, host, fields)
+
+    def _fetch_printer_status(self, host, fields):
+        hostname = self.hostnames.get(host)
+        if hostname is None:
+            hostname, _ = self.get_printer_info(host)
+        objects = {"webhooks": {"state"}, "print_stats": {"state"}}
+        for field in fields:
+            if field in STATUS_FIELDS:
+                obj, attrs, _ = STATUS_FIELDS[field]
+                objects.setdefault(obj, set()).update(attrs)
+        if "eta" in fields:
+            objects.setdefault("display_status", set()).add("progress")
+        query = "&".join(f"{obj}={','.join(sorted(attrs))}" for obj, attrs in objects.items())
+
+        started = time.monotonic()
+        try:
+            response = requests.get(
+                f"{self._base_url(host)}/printer/objects/query?{query}",
+                timeout=DEFAULT_HTTP_TIMEOUT_S
+            )
+            self.metrics.observe("printer_info_latency_seconds", time.monotonic() - started, {"host": host})
+            if response.status_code != 200:
+                self.logger.debug(f"/printer/objects/query returned non-200 for {host}: {response.status_code}")
+                return hostname, "Недоступен", {}
+            data = response.json()
+            status = data.get("result", {}).get("status", {}) if isinstance(data, dict) else {}
+        except (requests.RequestException, ValueError) as e:
+            self.metrics.inc("printer_info_errors_total", {"host": host})
+            self.logger.debug(f"Failed to query printer objects for {host}: {e}")
+            return hostname, "Недоступен", {}
+
+        state = status.get("webhooks", {}).get("state", "Недоступен")
+        print_state = status.get("print_stats", {}).get("state")
+        if state == "ready" and print_state in PRINT_STATES:
+            state = print_state
+        details = {}
+        for field in fields:
+            if field not in STATUS_FIELDS:
+                continue
+            obj, attrs, _ = STATUS_FIELDS[field]
+            values = status.get(obj, {})
+            if field == "eta":
+                progress = status.get("display_status", {}).get("progress") or 0
+                duration = values.get("print_duration") or 0
+                details[field] = round(duration / progress - duration, -1) if progress > 0 else None
+            elif field == "progress":
+                details[field] = round(values.get("progress") or 0, 3)
+            elif field == "print_duration":
+                details[field] = round(values.get("print_duration") or 0, -1)
+            elif len(attrs) == 1:
+                details[field] = values.get(attrs[0])
+            else:
+                # Температуры округляются до градуса, чтобы шум датчика не порождал изменений
+                details[field] = tuple(
+                    round(values[attr]) if isinstance(values.get(attr), (int, float)) else None for attr in attrs)
+        self.logger.debug(f"Printer status for {host}: state={state}, details={details}")
+        return hostname, state, details
+
+    def diff_details(self, host, details):
+        """Запоминает поля статуса хоста и возвращает только изменившиеся (исчезнувшие — как None)."""
+        with self._details_lock:
+            previous = self.last_details.get(host, {})
+            changes = {key: value for key, value in details.items() if previous.get(key) != value}
+            changes.update({key: None for key in previous if key not in details})
+            self.last_details[host] = dict(details)
+            self.details_seen[host] = time.monotonic()
+        return changes
+
+    def status_temperatures(self, host, max_age):
+        """Температуры нагревателей из расширенного статуса хоста не старше max_age секунд: {метрика: число}."""
+        with self._details_lock:
+            details = self.last_details.get(host, {})
+            seen = self.details_seen.get(host)
+        sample = {}
+        if seen is None or time.monotonic() - seen > max_age:
+            return sample
+        for heater in TELEMETRY_HEATERS:
+            value = details.get(heater)
+            if not value:
+                continue
+            for attr, reading in zip(("temperature", "target"), value):
+                if isinstance(reading, (int, float)):
+                    sample[f"{heater}_{attr}"] = reading
+        return sample
+
+    def get_telemetry(self, host, heaters=TELEMETRY_HEATERS):
+        """Снимает одну точку телеметрии: температуры heaters из objects/query и нагрузку из /machine/proc_stats.
+
+        Пустой heaters — только /machine/proc_stats, температуры уже известны из расширенного статуса.
+        Возвращает {метрика: число} (недоступные метрики отсутствуют) или None, если хост не ответил.
+        """
+        sample = {}
+        try:
+            base = self._base_url(host)
+            if heaters:
+                query = "&".join(f"{heater}=temperature,target" for heater in heaters)
+                response = requests.get(f"{base}/printer/objects/query?{query}", timeout=DEFAULT_HTTP_TIMEOUT_S)
+                if response.status_code == 200:
+                    status = response.json().get("result", {}).get("status", {})
+                    for obj in heaters:
+                        for attr in ("temperature", "target"):
+                            value = status.get(obj, {}).get(attr)
+                            if isinstance(value, (int, float)):
+                                sample[f"{obj}_{attr}"] = value
+            response = requests.get(f"{base}/machine/proc_stats", timeout=DEFAULT_HTTP_TIMEOUT_S)
+            if response.status_code == 200:
+                result = response.json().get("result", {})
+                cpu = (result.get("system_cpu_usage") or {}).get("cpu")
+                if isinstance(cpu, (int, float)):
+                    sample["cpu_usage"] = cpu
+                memory = result.get("system_memory") or {}
+                if memory.get("total"):
+                    sample["memory_usage"] = 100.0 * memory.get("used", 0) / memory["total"]
+                if isinstance(result.get("cpu_temp"), (int, float)):
+                    sample["cpu_temp"] = result["cpu_temp"]
+                throttled = result.get("throttled_state") or {}
+                if isinstance(throttled.get("bits"), int):
+                    sample["throttled"] = throttled["bits"]
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            self.logger.debug(f"Failed to get telemetry for {host}: {e}")
+            return sample or None
+        return sample or None
 
     def check_network_connectivity(self):
-        """Проверяет доступность сети."""
+        """Проверяет доступность сети.
+
+        Имя разрешается каждый раз мимо кэша HostResolver: его устаревший адрес скрыл бы пропажу сети.
+        """
         try:
             socket.gethostbyname("google.com")
             self.logger.debug("Network connectivity test passed")
@@ -91,11 +330,185 @@ class NetworkUtils:
         if command not in commands:
             self.logger.error(f"Unknown command: {command}")
             return False, None
-        url = f"http://{host}:{DEFAULT_MOONRAKER_PORT}{commands[command]}"
         try:
-            response = requests.post(url, timeout=5)
+            response = requests.post(f"{self._base_url(host)}{commands[command]}", timeout=5)
             self.logger.debug(f"Sent command {command} to {host}, status={response.status_code}")
             return response.status_code == 200, response.status_code
         except requests.RequestException as e:
             self.logger.error(f"Failed to send {command} command to {host}: {e}")
             raise
+
+    def upload_file(self, host, body):
+        """Загружает файл на /server/files/upload потоковым телом (см. uploads.MultipartFileStream).
+
+        Возвращает кортеж (success: bool, сообщение). Тело не буферизуется целиком:
+        requests читает его порциями с Content-Length.
+        """
+        try:
+            response = requests.post(
+                f"{self._base_url(host)}/server/files/upload",
+                data=body,
+                headers={"Content-Type": body.content_type},
+                timeout=(DEFAULT_HTTP_TIMEOUT_S, UPLOAD_READ_TIMEOUT_S)
+            )
+        except requests.RequestException as e:
+            self.logger.error(f"Failed to upload file to {host}: {e}")
+            return False, str(e)
+        self.logger.debug(f"Uploaded file to {host}, status={response.status_code}")
+        if response.status_code in (200, 201):
+            return True, "Загружено"
+        return False, f"HTTP {response.status_code}"
+
+    def list_directory(self, host, path="gcodes"):
+        """Содержимое одного каталога из /server/files/directory (без вложенных).
+
+        Возвращает {имя: (каталог?, размер, modified)} или None при ошибке.
+        """
+        try:
+            response = requests.get(
+                f"{self._base_url(host)}/server/files/directory",
+                params={"path": path, "extended": "false"},
+                timeout=(DEFAULT_HTTP_TIMEOUT_S, UPLOAD_READ_TIMEOUT_S)
+            )
+            if response.status_code != 200:
+                self.logger.debug(f"/server/files/directory returned {response.status_code} for {host}:{path}")
+                return None
+            result = response.json().get("result", {})
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            self.logger.debug(f"Failed to list {host}:{path}: {e}")
+            return None
+        entries = {}
+        for item in result.get("dirs") or []:
+            if item.get("dirname"):
+                entries[item["dirname"]] = (True, item.get("size", 0), item.get("modified", 0))
+        for item in result.get("files") or []:
+            if item.get("filename"):
+                entries[item["filename"]] = (False, item.get("size", 0), item.get("modified", 0))
+        return entries
+
+    def list_files(self, host, root="gcodes"):
+        """Все файлы корня (рекурсивно) из /server/files/list одним запросом.
+
+        Возвращает {путь: (размер, modified)} или None при ошибке.
+        """
+        try:
+            response = requests.get(f"{self._base_url(host)}/server/files/list", params={"root": root},
+                                    timeout=(DEFAULT_HTTP_TIMEOUT_S, UPLOAD_READ_TIMEOUT_S))
+            if response.status_code != 200:
+                self.logger.debug(f"/server/files/list returned {response.status_code} for {host}:{root}")
+                return None
+            items = response.json().get("result") or []
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            self.logger.debug(f"Failed to list {root} on {host}: {e}")
+            return None
+        return {item["path"]: (item.get("size", 0), item.get("modified", 0))
+                for item in items if isinstance(item, dict) and item.get("path")}
+
+    def download_file(self, host, path, root="gcodes"):
+        """Содержимое файла (путь относительно root) или None."""
+        try:
+            response = requests.get(f"{self._base_url(host)}/server/files/{root}/{quote(path)}",
+                                    timeout=(DEFAULT_HTTP_TIMEOUT_S, UPLOAD_READ_TIMEOUT_S))
+            if response.status_code != 200:
+                self.logger.debug(f"Download of {root}/{path} from {host} returned {response.status_code}")
+                return None
+            return response.content
+        except requests.RequestException as e:
+            self.logger.debug(f"Failed to download {root}/{path} from {host}: {e}")
+            return None
+
+    def delete_file(self, host, path):
+        """Удаляет файл (путь от корня, например gcodes/part.gcode); возвращает успех."""
+        try:
+            response = requests.delete(f"{self._base_url(host)}/server/files/{quote(path)}",
+                                       timeout=DEFAULT_HTTP_TIMEOUT_S)
+            self.logger.debug(f"Deleted {host}:{path}, status={response.status_code}")
+            return response.status_code == 200
+        except requests.RequestException as e:
+            self.logger.error(f"Failed to delete {host}:{path}: {e}")
+            return False
+
+    def start_print_file(self, host, filename):
+        """Запускает печать файла (путь относительно gcodes); возвращает успех."""
+        try:
+            response = requests.post(f"{self._base_url(host)}/printer/print/start",
+                                     params={"filename": filename}, timeout=DEFAULT_HTTP_TIMEOUT_S)
+            self.logger.debug(f"Started print of {filename} on {host}, status={response.status_code}")
+            return response.status_code == 200
+        except requests.RequestException as e:
+            self.logger.error(f"Failed to start print of {filename} on {host}: {e}")
+            return False
+
+    def get_file_metadata(self, host, filename):
+        """Метаданные G-code файла из /server/files/metadata или None."""
+        try:
+            response = requests.get(
+                f"{self._base_url(host)}/server/files/metadata",
+                params={"filename": filename},
+                timeout=DEFAULT_HTTP_TIMEOUT_S
+            )
+            if response.status_code != 200:
+                self.logger.debug(f"/server/files/metadata returned {response.status_code} for {host}:{filename}")
+                return None
+            data = response.json()
+            return data.get("result") if isinstance(data, dict) else None
+        except (requests.RequestException, ValueError) as e:
+            self.logger.debug(f"Failed to get metadata for {host}:{filename}: {e}")
+            return None
+
+    def get_file_thumbnail(self, host, filename, relative_path):
+        """Содержимое миниатюры (путь relative_path задан относительно каталога файла) или None."""
+        directory = filename.rsplit("/", 1)[0] + "/" if "/" in filename else ""
+        path = f"/server/files/gcodes/{quote(directory + relative_path)}"
+        try:
+            url = f"{self._base_url(host)}{path}"
+            response = requests.get(url, timeout=DEFAULT_HTTP_TIMEOUT_S)
+            if response.status_code != 200:
+                self.logger.debug(f"Thumbnail {url} returned {response.status_code}")
+                return None
+            return response.content
+        except requests.RequestException as e:
+            # ResolveError возникает до построения url — в сообщении хост и путь
+            self.logger.debug(f"Failed to get thumbnail {path} from {host}: {e}")
+            return None
+
+    def get_job_history(self, host, since=0.0, start=0, limit=100):
+        """Страница /server/history/list по возрастанию времени начала, только задания новее since.
+
+        Возвращает список заданий или None при ошибке.
+        """
+        try:
+            response = requests.get(
+                f"{self._base_url(host)}/server/history/list",
+                params={"since": since, "start": start, "limit": limit, "order": "asc"},
+                timeout=DEFAULT_HTTP_TIMEOUT_S
+            )
+            if response.status_code != 200:
+                self.logger.debug(f"/server/history/list returned {response.status_code} for {host}")
+                return None
+            data = response.json()
+            result = data.get("result", {}) if isinstance(data, dict) else {}
+            return result.get("jobs", [])
+        except (requests.RequestException, ValueError) as e:
+            self.logger.debug(f"Failed to get job history for {host}: {e}")
+            return None
+
+    def fetch_log_range(self, host, name, start=None, suffix=None):
+        """Запрашивает часть лога Moonraker HTTP Range-запросом.
+
+        start — байты с этого смещения до конца, suffix — последние suffix байт.
+        Возвращает (status_code, Content-Range, содержимое) или (None, None, b"") при ошибке.
+        """
+        headers = {"Range": f"bytes={start}-" if start is not None else f"bytes=-{suffix}"}
+        try:
+            for path in (f"/server/files/logs/{quote(name)}", f"/server/files/{quote(name)}"):
+                response = requests.get(f"{self._base_url(host)}{path}", headers=headers,
+                                        timeout=DEFAULT_HTTP_TIMEOUT_S)
+                if response.status_code != 404:
+                    break
+            self.logger.debug(f"Log range {headers['Range']} of {name} on {host}: status={response.status_code}, "
+                              f"bytes={len(response.content)}")
+            return response.status_code, response.headers.get("Content-Range"), response.content
+        except requests.RequestException as e:
+            self.logger.debug(f"Failed to fetch {name} from {host}: {e}")
+            return None, None, b""
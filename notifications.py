@@ -0,0 +1,97 @@
+# notifications.py
+
+import logging
+import time
+from collections import deque
+from utils import NOTIFICATION_MAX_PER_MINUTE, NOTIFICATION_HISTORY_SIZE, NOTIFICATION_SUMMARY_NAMES
+
+
+class NotificationCenter:
+    """Очередь уведомлений о смене статусов с группировкой, подавлением дребезга и ограничением частоты.
+
+    submit() вызывается на каждое изменение статуса и только копит события;
+    flush() (по таймеру GUI-потока) превращает накопленное в одно сводное сообщение.
+    Хост, вернувшийся к прежнему статусу до отправки, не попадает в сообщение.
+    """
+
+    def __init__(self, max_per_minute=NOTIFICATION_MAX_PER_MINUTE, history_size=NOTIFICATION_HISTORY_SIZE):
+        self.logger = logging.getLogger(__name__)
+        self.max_per_minute = max_per_minute
+        self.history_size = history_size
+        self.pending = {}  # host -> {"name", "from", "to"}
+        self.history = {}  # host -> deque[(time, state, delivered)]
+        self._sent = deque()  # время отправленных сообщений за последнюю минуту
+
+    def submit(self, host, name, previous, state):
+        """Регистрирует смену статуса хоста (previous=None — хост появился впервые)."""
+        entry = self.pending.get(host)
+        if entry is None:
+            self.pending[host] = {"name": name, "from": previous, "to": state}
+        else:
+            entry["name"] = name
+            entry["to"] = state
+        self._remember(host, state, False)
+
+    def _remember(self, host, state, delivered):
+        if host not in self.history:
+            self.history[host] = deque(maxlen=self.history_size)
+        events = self.history[host]
+        if delivered and events and events[-1][1] == state:
+            events[-1] = (events[-1][0], state, True)
+        else:
+            events.append((time.time(), state, delivered))
+
+    def host_history(self, host):
+        """История статусов хоста: список (time, state, отправлено уведомление), от старых к новым."""
+        return list(self.history.get(host, ()))
+
+    def forget(self, host):
+        self.pending.pop(host, None)
+        self.history.pop(host, None)
+
+    def clear(self):
+        self.pending.clear()
+        self.history.clear()
+
+    def _allowed(self, now):
+        while self._sent and now - self._sent[0] >= 60:
+            self._sent.popleft()
+        return len(self._sent) < self.max_per_minute
+
+    def flush(self, notification_states, now=None):
+        """Возвращает текст одного сводного уведомления о переходах в notification_states или None.
+
+        При превышении лимита события остаются в очереди и сливаются со следующими.
+        """
+        if not self.pending:
+            return None
+        now = time.monotonic() if now is None else now
+        if not self._allowed(now):
+            self.logger.debug(f"Notification rate limit reached, {len(self.pending)} hosts pending")
+            return None
+        groups = {}
+        for host, entry in self.pending.items():
+            if entry["to"] == entry["from"]:
+                self.logger.debug(f"Suppressed flapping notification for {host} ({entry['to']})")
+                continue
+            if entry["to"] not in notification_states:
+                continue
+            groups.setdefault(entry["to"], []).append((host, entry["name"]))
+        self.pending.clear()
+        if not groups:
+            return None
+        lines = []
+        for state, hosts in groups.items():
+            for host, _ in hosts:
+                self._remember(host, state, True)
+            if len(hosts) == 1:
+                host, name = hosts[0]
+                lines.append(f"{name} ({host}) получил статус {state}")
+            else:
+                names = ", ".join(name for _, name in hosts[:NOTIFICATION_SUMMARY_NAMES])
+                more = len(hosts) - NOTIFICATION_SUMMARY_NAMES
+                if more > 0:
+                    names += f" и ещё {more}"
+                lines.append(f"{len(hosts)} принтеров получили статус {state}: {names}")
+        self._sent.append(now)
+        return "\n".join(lines)
@@ -0,0 +1,208 @@
+# profiling.py
+
+import logging
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from utils import PROFILE_SAMPLE_INTERVAL_S, PROFILE_TOP_N
+
+# Номер в конце имени потока пула (ThreadPoolExecutor-0_12, telemetry_3) — стеки пула сводятся вместе
+POOL_THREAD_SUFFIX = re.compile(r"_\d+$")
+# Потоки, созданные не через threading (QThread), threading называет Dummy-N
+FOREIGN_THREAD = re.compile(r"^Dummy-\d+$")
+GUI_IDLE = "[цикл событий Qt]"
+
+
+def _short_path(filename):
+    parts = filename.replace("\\", "/").split("/")
+    return "/".join(parts[-2:])
+
+
+def _is_idle(stack, is_main):
+    """Простаивающий поток пула (ждёт задачу) или GUI-поток внутри app.exec() без Python-кода."""
+    code, _ = stack[-1]
+    if code.co_name == "_worker" and code.co_filename.replace("\\", "/").endswith("concurrent/futures/thread.py"):
+        return True
+    return is_main and code.co_name in ("main", "<module>") and os.path.basename(code.co_filename) == "main.py"
+
+
+class SamplingProfiler:
+    """Статистический профилировщик всех потоков процесса.
+
+    Фоновый поток раз в interval снимает стеки через sys._current_frames(), поэтому
+    учитываются и потоки пулов сканера, и GUI-поток, а время ожидания в DNS, connect()
+    и HTTP попадает на вызывающую строку Python. Код не нужно инструментировать, а
+    накладные расходы ограничены частотой выборки.
+    """
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self.samples = Counter()  # (имя потока, ((code, lineno), ...) от корня к листу) -> число выборок
+        self.idle = Counter()  # имя потока -> выборок простоя
+        self.started = None
+        self.elapsed = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started = time.monotonic()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.elapsed = time.monotonic() - self.started
+
+    def _run(self):
+        own = threading.get_ident()
+        main = threading.main_thread().ident
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: FOREIGN_THREAD.sub("QThread", POOL_THREAD_SUFFIX.sub("", thread.name))
+                     for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append((frame.f_code, frame.f_lineno))
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                stack.reverse()
+                name = names.get(ident, str(ident))
+                if _is_idle(stack, ident == main):
+                    self.idle[GUI_IDLE if ident == main else name] += 1
+                else:
+                    self.samples[(name, tuple(stack))] += 1
+
+    @staticmethod
+    def _label(code):
+        return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+    def write_folded(self, path):
+        """Свёрнутые стеки (формат flamegraph.pl / speedscope): «поток;f1;f2;... N»."""
+        folded = Counter()
+        for (thread, stack), count in self.samples.items():
+            folded[";".join([thread] + [self._label(code) for code, _ in stack])] += count
+        for thread, count in self.idle.items():
+            folded[f"{thread};[простой]"] += count
+        with open(path, "w", encoding="utf-8") as f:
+            for line, count in sorted(folded.items()):
+                f.write(f"{line} {count}\n")
+
+    def write_pstats(self, path):
+        """Те же выборки в формате pstats (pstats.Stats, snakeviz): время = выборки × интервал."""
+        stats = {}
+        for (_, stack), count in self.samples.items():
+            seconds = count * self.interval
+            keys = [(code.co_filename, code.co_firstlineno, code.co_name) for code, _ in stack]
+            seen = set()
+            for depth, key in enumerate(keys):
+                cc, nc, tt, ct, callers = stats.get(key, (0, 0, 0.0, 0.0, {}))
+                leaf = depth == len(keys) - 1
+                # Рекурсивная функция учитывается во включительном времени один раз на выборку
+                inclusive = key not in seen
+                seen.add(key)
+                stats[key] = (cc + (count if inclusive else 0), nc + count, tt + (seconds if leaf else 0.0),
+                              ct + (seconds if inclusive else 0.0), callers)
+                if depth > 0:
+                    caller = keys[depth - 1]
+                    c_nc, c_cc, c_tt, c_ct = callers.get(caller, (0, 0, 0.0, 0.0))
+                    callers[caller] = (c_nc + count, c_cc + count, c_tt + (seconds if leaf else 0.0), c_ct + seconds)
+        with open(path, "wb") as f:
+            marshal.dump(stats, f)
+
+    def hot_spots(self, limit=PROFILE_TOP_N):
+        """Строки кода, на которых чаще всего заставала выборка: [(доля рабочих выборок, поток, место)]."""
+        lines = Counter()
+        for (thread, stack), count in self.samples.items():
+            code, lineno = stack[-1]
+            lines[(thread, f"{_short_path(code.co_filename)}:{lineno} {code.co_name}")] += count
+        total = sum(self.samples.values()) or 1
+        return [(count / total, thread, place) for (thread, place), count in lines.most_common(limit)]
+
+
+class CycleProfiler:
+    """Профилирование следующих N циклов сканирования или обновления.
+
+    Выборка идёт от начала первого цикла до конца последнего; результат пишется рядом
+    с moonraker_scanner.log как .pstats и .folded, а сводка горячих точек хранится в last_report.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.logger = logging.getLogger(__name__)
+        self.remaining = 0
+        self.cycles = 0
+        self.profiler = None
+        self.last_report = None
+
+    @property
+    def armed(self):
+        return self.remaining > 0
+
+    def arm(self, cycles):
+        self.remaining = cycles
+        self.cycles = 0
+        self.logger.info(f"Profiling armed for the next {cycles} scan/refresh cycles")
+
+    def cycle_started(self):
+        if self.remaining > 0 and self.profiler is None:
+            self.profiler = SamplingProfiler()
+            self.profiler.start()
+            self.logger.debug("Profiler started")
+
+    def cycle_finished(self):
+        """Возвращает отчёт, если профилирование только что завершилось, иначе None."""
+        if self.profiler is None:
+            return None
+        self.remaining -= 1
+        self.cycles += 1
+        if self.remaining > 0:
+            return None
+        profiler, self.profiler = self.profiler, None
+        profiler.stop()
+        base = os.path.join(self.directory, time.strftime("profile-%Y%m%d-%H%M%S"))
+        report = {
+            "pstats": base + ".pstats",
+            "folded": base + ".folded",
+            "cycles": self.cycles,
+            "elapsed": profiler.elapsed,
+            "samples": sum(profiler.samples.values()),
+            "gui_idle": profiler.idle.get(GUI_IDLE, 0),
+            "hot_spots": profiler.hot_spots(),
+        }
+        try:
+            profiler.write_pstats(report["pstats"])
+            profiler.write_folded(report["folded"])
+        except OSError as e:
+            self.logger.error(f"Failed to write profile {base}: {e}")
+            report["error"] = str(e)
+        self.last_report = report
+        self.logger.info(f"Profile of {self.cycles} cycles written to {base}.pstats / .folded")
+        return report
+
+
+def format_report(report):
+    """Текст отчёта для вкладки «Диагностика»."""
+    lines = [f"Профиль {report['cycles']} циклов за {report['elapsed']:.1f} с, "
+             f"рабочих выборок {report['samples']}, GUI-поток в цикле событий Qt: {report['gui_idle']} выборок"]
+    if "error" in report:
+        lines.append(f"Не удалось записать файлы: {report['error']}")
+    else:
+        lines.append(f"Файлы: {report['pstats']}")
+        lines.append(f"       {report['folded']}")
+    lines.append("Горячие точки (доля выборок, поток, строка):")
+    for share, thread, place in report["hot_spots"]:
+        lines.append(f"  {share * 100:5.1f}%  {thread[:24]:<24} {place}")
+    if not report["hot_spots"]:
+        lines.append("  нет выборок")
+    return lines
@@ -0,0 +1,140 @@
+# resolver.py
+
+import ipaddress
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import requests
+from utils import RESOLVER_TTL_S, RESOLVER_NEGATIVE_TTL_S, RESOLVER_STALE_TTL_S, RESOLVER_WORKERS, \
+    RESOLVER_BATCH_TIMEOUT_S
+
+
+class ResolveError(requests.ConnectionError):
+    """Имя хоста не разрешилось. Наследует ConnectionError, чтобы его ловили обработчики ошибок requests."""
+
+
+class HostResolver:
+    """Кэш разрешения DNS-имён известных хостов в IPv4-адреса.
+
+    Успешный ответ живёт ttl секунд, ошибка — negative_ttl. Просроченный адрес ещё
+    stale_ttl секунд отдаётся сразу, а переразрешается в фоне; при ошибке DNS старый адрес
+    остаётся в силе, поэтому медленный или нестабильный DNS-сервер не задерживает пробы и
+    HTTP-запросы. Одновременные запросы одного имени выполняются одним getaddrinfo().
+    IP-адреса возвращаются как есть, без обращения к кэшу.
+    """
+
+    def __init__(self, ttl=RESOLVER_TTL_S, negative_ttl=RESOLVER_NEGATIVE_TTL_S, stale_ttl=RESOLVER_STALE_TTL_S,
+                 metrics=None):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.metrics = metrics
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        # имя -> (адрес или None, time.monotonic() последнего успеха, time.monotonic() последней попытки)
+        self._entries = {}
+        self._inflight = {}  # имя -> Future идущего getaddrinfo()
+        self._executor = ThreadPoolExecutor(max_workers=RESOLVER_WORKERS, thread_name_prefix="resolver")
+        self.stats = {"hit": 0, "stale": 0, "negative": 0, "miss": 0}
+
+    @staticmethod
+    def is_address(host):
+        try:
+            ipaddress.ip_address(host)
+            return True
+        except ValueError:
+            return False
+
+    def _count(self, result):
+        self.stats[result] += 1
+        if self.metrics is not None:
+            self.metrics.inc("resolver_lookups_total", {"result": result})
+
+    def _submit(self, host):
+        """Запускает разрешение имени, если оно ещё не идёт; вызывается под self._lock."""
+        future = self._inflight.get(host)
+        if future is None:
+            future = self._inflight[host] = self._executor.submit(self._lookup, host)
+        return future
+
+    def _lookup(self, host):
+        started = time.monotonic()
+        try:
+            infos = socket.getaddrinfo(host, None, socket.AF_INET, socket.SOCK_STREAM)
+            address = infos[0][4][0] if infos else None
+        except (OSError, UnicodeError) as e:
+            self.logger.debug(f"Failed to resolve {host}: {e}")
+            address = None
+        now = time.monotonic()
+        if self.metrics is not None:
+            self.metrics.observe("resolver_latency_seconds", now - started)
+        with self._lock:
+            previous = self._entries.get(host)
+            if address is not None:
+                self._entries[host] = (address, now, now)
+            elif previous is not None and previous[0] is not None and now - previous[1] < self.ttl + self.stale_ttl:
+                # DNS не ответил, но прежний адрес ещё допустим: продолжаем пользоваться им
+                address = previous[0]
+                self._entries[host] = (address, previous[1], now)
+            else:
+                self._entries[host] = (None, now, now)
+            self._inflight.pop(host, None)
+        self.logger.debug(f"Resolved {host} -> {address} in {now - started:.3f}s")
+        return address
+
+    def resolve(self, host):
+        """IPv4-адрес хоста; бросает ResolveError, если имя не разрешается."""
+        if self.is_address(host):
+            return host
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is not None:
+                address, resolved_at, checked_at = entry
+                if address is None:
+                    if now - checked_at < self.negative_ttl:
+                        self._count("negative")
+                        raise ResolveError(f"Cannot resolve {host}")
+                elif now - resolved_at < self.ttl:
+                    self._count("hit")
+                    return address
+                elif now - resolved_at < self.ttl + self.stale_ttl:
+                    self._count("stale")
+                    # Повторная попытка после ошибки DNS — не чаще раза в negative_ttl
+                    if now - checked_at >= min(self.negative_ttl, self.ttl):
+                        self._submit(host)
+                    return address
+            self._count("miss")
+            future = self._submit(host)
+        address = future.result()
+        if address is None:
+            raise ResolveError(f"Cannot resolve {host}")
+        return address
+
+    def resolve_many(self, hosts, timeout=RESOLVER_BATCH_TIMEOUT_S):
+        """Параллельно переразрешает имена без свежей записи и ждёт их не дольше timeout.
+
+        Вызывается перед обновлением, чтобы пробы хостов брали адреса из кэша. Возвращает
+        число запущенных разрешений; не успевшие к timeout продолжаются в фоне.
+        """
+        now = time.monotonic()
+        futures = []
+        with self._lock:
+            for host in dict.fromkeys(hosts):
+                if self.is_address(host):
+                    continue
+                entry = self._entries.get(host)
+                if entry is not None and (now - entry[1] < self.ttl if entry[0] is not None
+                                          else now - entry[2] < self.negative_ttl):
+                    continue
+                futures.append(self._submit(host))
+        if futures:
+            done, not_done = wait(futures, timeout=timeout)
+            self.logger.debug(f"Batch resolved {len(done)} names, {len(not_done)} still pending")
+        return len(futures)
+
+    def forget(self, host):
+        with self._lock:
+            self._entries.pop(host, None)
@@ -0,0 +1,137 @@
+# scan_control.py
+
+import errno
+import socket
+import threading
+import time
+from utils import DEFAULT_MOONRAKER_PORT, SCAN_CONNECT_TIMEOUT_S, SCAN_TIMEOUT_MIN_S, SCAN_TIMEOUT_MAX_S, \
+    SUBNET_SCAN_WORKERS, SCAN_MIN_WORKERS, SCAN_MAX_WORKERS, AIMD_INCREASE_STEP, AIMD_DECREASE_FACTOR
+
+# Ошибки, говорящие о перегрузке локального стека или сети (а не об отсутствии хоста)
+PRESSURE_ERRNOS = frozenset(
+    code for code in (
+        getattr(errno, "EMFILE", None),
+        getattr(errno, "ENFILE", None),
+        getattr(errno, "ENOBUFS", None),
+        getattr(errno, "ENOMEM", None),
+        getattr(errno, "ECONNRESET", None),
+        getattr(errno, "EADDRNOTAVAIL", None),
+        getattr(errno, "WSAEMFILE", None),
+        getattr(errno, "WSAENOBUFS", None),
+        getattr(errno, "WSAECONNRESET", None),
+    ) if code is not None
+)
+
+# Коды connect_ex, означающие, что хост ответил (SYN-ACK или RST)
+ANSWERED_ERRNOS = (0, errno.ECONNREFUSED, getattr(errno, "WSAECONNREFUSED", errno.ECONNREFUSED))
+
+
+def connect_probe(ip, port=DEFAULT_MOONRAKER_PORT, timeout=SCAN_CONNECT_TIMEOUT_S):
+    """TCP-проба порта: (open, rtt | None, errno). rtt известен, если хост ответил."""
+    started = time.monotonic()
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            result = sock.connect_ex((str(ip), port))
+    except OSError as e:
+        return False, None, e.errno or 0
+    rtt = time.monotonic() - started
+    if result in ANSWERED_ERRNOS:
+        return result == 0, rtt, result
+    return False, None, result
+
+
+class RttEstimator:
+    """Оценка RTT подсети (SRTT/RTTVAR, как в TCP) и расчёт тайм-аута подключения."""
+
+    def __init__(self, initial_timeout=SCAN_CONNECT_TIMEOUT_S):
+        self._lock = threading.Lock()
+        self.initial_timeout = initial_timeout
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+
+    def add_sample(self, rtt):
+        """Учитывает RTT завершённого подключения (принятого или отклонённого хостом)."""
+        with self._lock:
+            if self.srtt is None:
+                self.srtt = rtt
+                self.rttvar = rtt / 2
+            else:
+                self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+                self.srtt = 0.875 * self.srtt + 0.125 * rtt
+            self.samples += 1
+
+    @property
+    def timeout(self):
+        """Текущий тайм-аут подключения; до первых замеров — исходный."""
+        with self._lock:
+            if self.srtt is None:
+                return self.initial_timeout
+            rto = self.srtt + 4 * self.rttvar
+        return min(max(rto, SCAN_TIMEOUT_MIN_S), SCAN_TIMEOUT_MAX_S)
+
+
+class AimdController:
+    """Окно параллелизма: аддитивный рост без ошибок, мультипликативное снижение при перегрузке."""
+
+    def __init__(self, initial=SUBNET_SCAN_WORKERS, minimum=SCAN_MIN_WORKERS, maximum=SCAN_MAX_WORKERS):
+        self._lock = threading.Lock()
+        self.minimum = minimum
+        self.maximum = maximum
+        self._window = float(min(max(initial, minimum), maximum))
+        self._clean = 0
+        self._since_decrease = self._window
+
+    @property
+    def window(self):
+        with self._lock:
+            return int(self._window)
+
+    def on_success(self):
+        """Завершённая без ошибок проба: каждое полное окно таких проб расширяет окно."""
+        with self._lock:
+            self._clean += 1
+            self._since_decrease += 1
+            if self._clean >= self._window:
+                self._clean = 0
+                self._window = min(self._window + AIMD_INCREASE_STEP, self.maximum)
+
+    def on_pressure(self):
+        """Ошибка перегрузки: окно сокращается не чаще одного раза за окно проб."""
+        with self._lock:
+            self._clean = 0
+            self._since_decrease += 1
+            if self._since_decrease < self._window:
+                return
+            self._since_decrease = 0
+            self._window = max(self._window * AIMD_DECREASE_FACTOR, self.minimum)
+
+
+class RateLimiter:
+    """Ограничитель скорости (token bucket): пакетов или байт в секунду; rate <= 0 — без ограничения.
+
+    Токены резервируются сразу, а вызывающий ждёт, пока долг не погасится, поэтому
+    порции больше ёмкости корзины (например, блоки загрузки файла) тоже проходят.
+    burst — ёмкость корзины (по умолчанию секунда трафика); burst=1 даёт равномерный поток без всплесков.
+    """
+
+    def __init__(self, rate=0, burst=None):
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = float(burst if burst is not None else rate)
+        self._last = time.monotonic()
+
+    def acquire(self, amount=1):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            capacity = self.burst if self.burst is not None else self.rate
+            self._tokens = min(self._tokens + (now - self._last) * self.rate, float(capacity))
+            self._last = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
@@ -0,0 +1,139 @@
+# scan_plan.py
+
+import ipaddress
+
+# Префикс записи подсети, исключающей диапазон из сканирования: "!192.168.1.0/28"
+EXCLUDE_PREFIX = "!"
+
+
+def parse_subnet(entry):
+    """Разбирает запись подсети из настроек; возвращает (network, исключение) или бросает ValueError."""
+    text = entry.strip()
+    excluded = text.startswith(EXCLUDE_PREFIX)
+    if excluded:
+        text = text[len(EXCLUDE_PREFIX):].strip()
+    return ipaddress.ip_network(text, strict=False), excluded
+
+
+def host_range(network):
+    """Диапазон (first, last) целых адресов, совпадающий с network.hosts()."""
+    first = int(network.network_address)
+    last = int(network.broadcast_address)
+    if network.prefixlen < network.max_prefixlen - 1:
+        first += 1
+        if network.version == 4:
+            last -= 1
+    return first, last
+
+
+def _subtract(intervals, first, last):
+    """Части [first, last], не покрытые отсортированными непересекающимися intervals."""
+    pieces = []
+    for start, end in intervals:
+        if end < first:
+            continue
+        if start > last:
+            break
+        if start > first:
+            pieces.append((first, start - 1))
+        first = max(first, end + 1)
+        if first > last:
+            return pieces
+    pieces.append((first, last))
+    return pieces
+
+
+def _insert(intervals, first, last):
+    """Добавляет [first, last] в отсортированный список, сливая пересекающиеся и соседние интервалы."""
+    merged = []
+    for start, end in intervals:
+        if end + 1 < first or start > last + 1:
+            merged.append((start, end))
+        else:
+            first, last = min(first, start), max(last, end)
+    merged.append((first, last))
+    merged.sort()
+    return merged
+
+
+class ScanPlan:
+    """План одного прохода сканирования, в котором каждый адрес проверяется ровно один раз.
+
+    Известные хосты проверяются первыми и исключаются из диапазонов подсетей.
+    Пересекающиеся подсети сливаются, а адрес относится к самой узкой подсети,
+    по которой ведётся оценка RTT. Записи вида "!10.0.5.0/28" исключают диапазон.
+    Цели хранятся интервалами целых адресов (key, version, first, last), а не списками.
+    """
+
+    def __init__(self, subnets, known_hosts=()):
+        self.invalid = []
+        self.networks = []
+        excluded = {4: [], 6: []}
+        for entry in subnets:
+            try:
+                network, is_excluded = parse_subnet(entry)
+            except ValueError:
+                self.invalid.append(entry)
+                continue
+            if is_excluded:
+                excluded[network.version] = _insert(
+                    excluded[network.version], int(network.network_address), int(network.broadcast_address))
+            else:
+                self.networks.append((entry, network))
+
+        self.known_hosts = list(dict.fromkeys(known_hosts or ()))
+        known = {4: [], 6: []}
+        for host in self.known_hosts:
+            address = self._address(host)
+            if address is not None:
+                known[address.version] = _insert(known[address.version], int(address), int(address))
+
+        # Узкие подсети первыми: они забирают свои адреса, широкие получают остаток
+        covered = {4: [], 6: []}
+        self.segments = []
+        for subnet, network in sorted(self.networks, key=lambda item: -item[1].prefixlen):
+            version = network.version
+            first, last = host_range(network)
+            pieces = [(first, last)]
+            for intervals in (covered[version], excluded[version], known[version]):
+                pieces = [part for start, end in pieces for part in _subtract(intervals, start, end)]
+            self.segments.extend((subnet, version, start, end) for start, end in pieces)
+            covered[version] = _insert(covered[version], first, last)
+        order = {subnet: index for index, (subnet, _) in enumerate(self.networks)}
+        self.segments.sort(key=lambda segment: (order[segment[0]], segment[2]))
+
+        self.subnet_total = sum(last - first + 1 for _, _, first, last in self.segments)
+        self.total = len(self.known_hosts) + self.subnet_total
+
+    @staticmethod
+    def _address(host):
+        try:
+            return ipaddress.ip_address(host)
+        except ValueError:
+            return None
+
+    def subnets(self):
+        """Ключи подсетей, у которых остались адреса для проверки, в порядке настроек."""
+        return list(dict.fromkeys(segment[0] for segment in self.segments))
+
+    def timing_key(self, host):
+        """Ключ оценщика RTT для известного хоста: самая узкая содержащая его подсеть."""
+        address = self._address(host)
+        if address is None:
+            return "known"
+        containing = [(network.prefixlen, subnet) for subnet, network in self.networks
+                      if address.version == network.version and address in network]
+        return max(containing)[1] if containing else "known"
+
+    def known_targets(self):
+        for host in self.known_hosts:
+            yield host, self.timing_key(host)
+
+    def subnet_targets(self, subnet):
+        """Адреса подсети (без известных хостов, исключений и адресов более узких подсетей)."""
+        for key, version, first, last in self.segments:
+            if key != subnet:
+                continue
+            address = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+            for value in range(first, last + 1):
+                yield address(value), subnet
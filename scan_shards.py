@@ -0,0 +1,107 @@
+# scan_shards.py
+
+import ipaddress
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from scan_control import PRESSURE_ERRNOS, RttEstimator, AimdController, RateLimiter, connect_probe
+from utils import SCAN_MAX_WORKERS, SCAN_SHARD_SIZE, SCAN_SHARD_BATCH_INTERVAL_S
+
+# Состояние рабочего процесса, задаётся инициализатором пула. Окно AIMD и корзина лимита
+# общие для всех шардов процесса: выученный параллелизм не теряется, а новый шард не даёт
+# всплеска сверх лимита pps
+_results = None
+_cancel = None
+_resume = None
+_concurrency = None
+_limiter = None
+
+
+def make_shards(segments, shard_size=SCAN_SHARD_SIZE):
+    """Делит интервалы плана сканирования (subnet, version, first, last) на шарды не больше shard_size адресов."""
+    for subnet, version, first, last in segments:
+        for start in range(first, last + 1, shard_size):
+            yield subnet, version, start, min(start + shard_size - 1, last)
+
+
+def init_worker(results, cancel_event, resume_event, max_pps):
+    """Инициализатор процесса пула: очередь результатов, события отмены/паузы и доля лимита pps."""
+    global _results, _cancel, _resume, _concurrency, _limiter
+    _results = results
+    _cancel = cancel_event
+    _resume = resume_event
+    _concurrency = AimdController()
+    _limiter = RateLimiter(max_pps)
+
+
+def sweep_shard(index, shard, initial_timeout):
+    """Сканирует диапазон адресов собственным пулом потоков с окном AIMD.
+
+    Результаты отправляются в очередь пачками (index, проверено, {результат: число}, [(ip, rtt)]).
+    Возвращает (число пачек, srtt диапазона или None).
+    """
+    _, version, first, last = shard
+    address = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+    estimator = RttEstimator(initial_timeout)
+    concurrency = _concurrency
+    limiter = _limiter
+    batches = 0
+    scanned = 0
+    counts = {}
+    found = []
+    flushed_at = time.monotonic()
+
+    def flush():
+        nonlocal batches, scanned, counts, found, flushed_at
+        if scanned:
+            _results.put((index, scanned, counts, found))
+            batches += 1
+        scanned, counts, found = 0, {}, []
+        flushed_at = time.monotonic()
+
+    targets = iter(range(first, last + 1))
+    pending = {}
+    exhausted = False
+    with ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS) as executor:
+        while pending or not exhausted:
+            if not exhausted:
+                _resume.wait()
+            if _cancel.is_set() and not exhausted:
+                exhausted = True
+                for future in [f for f in pending if f.cancel()]:
+                    del pending[future]
+            while not exhausted and len(pending) < concurrency.window:
+                value = next(targets, None)
+                if value is None:
+                    exhausted = True
+                    break
+                limiter.acquire()
+                ip = str(address(value))
+                pending[executor.submit(connect_probe, ip, timeout=estimator.timeout)] = ip
+            if not pending:
+                break
+            done, _ = wait(pending, timeout=SCAN_SHARD_BATCH_INTERVAL_S, return_when=FIRST_COMPLETED)
+            for future in done:
+                ip = pending.pop(future)
+                is_open, rtt, error = future.result()
+                if rtt is not None:
+                    estimator.add_sample(rtt)
+                if error in PRESSURE_ERRNOS:
+                    concurrency.on_pressure()
+                else:
+                    concurrency.on_success()
+                if error == 0:
+                    result = "open"
+                elif rtt is not None:
+                    result = "closed"
+                elif error in PRESSURE_ERRNOS:
+                    result = "error"
+                else:
+                    result = "timeout"
+                counts[result] = counts.get(result, 0) + 1
+                if is_open:
+                    found.append((ip, rtt))
+                scanned += 1
+            if time.monotonic() - flushed_at >= SCAN_SHARD_BATCH_INTERVAL_S:
+                flush()
+    flush()
+    return batches, estimator.srtt
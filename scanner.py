@@ -1,73 +1,307 @@
 # scanner.py
 
 from PyQt6.QtCore import QThread, pyqtSignal
-from concurrent.futures import ThreadPoolExecutor
-import ipaddress
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 import logging
-from utils import KNOWN_HOSTS_WORKERS, SUBNET_SCAN_WORKERS, PROGRESS_EMIT_STEP, STATE_OFFLINE
+import multiprocessing
+import queue
+import threading
+import time
+from hosts import HostRecord
+from scan_control import PRESSURE_ERRNOS, RateLimiter
+from scan_plan import ScanPlan
+from scan_shards import make_shards, init_worker, sweep_shard
+from utils import SCAN_MAX_WORKERS, SCAN_SHARD_MIN_HOSTS, SCAN_SHARD_BATCH_INTERVAL_S, SCAN_SHARD_PREFETCH, \
+    PROGRESS_EMIT_STEP, STATE_OFFLINE
 
 
 class ScanThread(QThread):
-    host_found = pyqtSignal(str, str, str)
+    host_found = pyqtSignal(object)  # HostRecord
+    # Только изменившиеся поля расширенного статуса хоста
+    details_changed = pyqtSignal(str, object)
     progress_updated = pyqtSignal(float)
-    scan_finished = pyqtSignal(list)
+    # Скорость (проб/с), найдено хостов, оценка оставшегося времени в секундах (-1 — неизвестно)
+    stats_updated = pyqtSignal(float, int, float)
+    scan_finished = pyqtSignal(list)  # HostRecord найденных хостов
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, subnets, known_hosts, network_utils):
+    def __init__(self, subnets, known_hosts, network_utils, max_pps=0, status_fields=None, processes=0):
         super().__init__()
         self.subnets = subnets
         self.known_hosts = known_hosts
         self.network_utils = network_utils
+        # None — обычный режим (/printer/info), иначе список полей для /printer/objects/query
+        self.status_fields = status_fields
+        # Число процессов для больших подсетей (0 — все пробы в потоках этого процесса)
+        self.processes = processes
+        self.rate_limiter = RateLimiter(max_pps)
         self.logger = logging.getLogger(__name__)
+        self.total_hosts = 0
+        self.scanned_hosts = 0
+        self.hosts_found = 0
+        self._cancel_event = threading.Event()
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._active_time = 0.0
+        self._active_since = None
+        self._rate = 0.0
+        self._last_stats = (0.0, 0)
+
+    def cancel(self):
+        """Запрашивает остановку: новые пробы не запускаются, текущие дожидаются завершения."""
+        self._cancel_event.set()
+        self._resume_event.set()
+        self.logger.debug("Scan cancellation requested")
+
+    def pause(self):
+        if not self._cancel_event.is_set():
+            self._resume_event.clear()
+            self.logger.debug("Scan paused")
+
+    def resume(self):
+        self._resume_event.set()
+        self.logger.debug("Scan resumed")
+
+    @property
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def is_paused(self):
+        return not self._resume_event.is_set()
+
+    def _wait_if_paused(self):
+        """Блокирует отправку новых проб на время паузы; время паузы не учитывается в скорости."""
+        if self._resume_event.is_set():
+            return
+        self._active_time += time.monotonic() - self._active_since
+        self._resume_event.wait()
+        self._active_since = time.monotonic()
+        self._last_stats = (self._active_time, self.scanned_hosts)
+
+    def _emit_progress(self):
+        self.progress_updated.emit(self.scanned_hosts / self.total_hosts * 100)
+        elapsed = self._active_time + time.monotonic() - self._active_since
+        last_elapsed, last_scanned = self._last_stats
+        if elapsed > last_elapsed:
+            current = (self.scanned_hosts - last_scanned) / (elapsed - last_elapsed)
+            self._rate = current if self._rate == 0 else 0.7 * self._rate + 0.3 * current
+        self._last_stats = (elapsed, self.scanned_hosts)
+        remaining = self.total_hosts - self.scanned_hosts
+        eta = remaining / self._rate if self._rate > 0 else -1.0
+        self.stats_updated.emit(self._rate, self.hosts_found, eta)
+
+    def _fetch_info(self, host):
+        """Возвращает (hostname, state, изменения полей, доступен ли SSH) для найденного хоста."""
+        # SSH-порт проверяется здесь же, в потоке сканирования, чтобы клик по колонке SSH не ждал сети
+        ssh = self.network_utils.check_ssh(host)
+        if self.status_fields is None:
+            hostname, state = self.network_utils.get_printer_info(host)
+            return hostname, state, {}, ssh
+        hostname, state, details = self.network_utils.get_printer_status(host, self.status_fields)
+        return hostname, state, self.network_utils.diff_details(host, details), ssh
+
+    def _probe_host(self, ip, timeout):
+        """Проба одного адреса; для открытых портов сразу запрашивает состояние принтера."""
+        is_open, rtt, error = self.network_utils.probe_port(ip, timeout=timeout)
+        info = self._fetch_info(str(ip)) if is_open else None
+        return is_open, rtt, error, info
+
+    def _sweep(self, executor, targets, found):
+        """Сканирует пары (ip, ключ RTT) с адаптивными тайм-аутами и окном AIMD."""
+        concurrency = self.network_utils.scan_concurrency
+        metrics = self.network_utils.metrics
+        targets = iter(targets)
+        pending = {}
+        exhausted = False
+        while pending or not exhausted:
+            self._wait_if_paused()
+            if self._cancel_event.is_set() and not exhausted:
+                exhausted = True
+                for future in [f for f in pending if f.cancel()]:
+                    del pending[future]
+                self.logger.debug(f"Scan cancelled, draining {len(pending)} in-flight probes")
+            while not exhausted and len(pending) < concurrency.window:
+                target = next(targets, None)
+                if target is None:
+                    exhausted = True
+                    break
+                ip, key = target
+                estimator = self.network_utils.get_rtt_estimator(key)
+                self.rate_limiter.acquire()
+                future = executor.submit(self._probe_host, ip, estimator.timeout)
+                pending[future] = (str(ip), estimator)
+            if not pending:
+                break
+            metrics.set_gauge("scanner_queue_depth", len(pending))
+            metrics.set_gauge("scanner_concurrency_window", concurrency.window)
+            done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                ip, estimator = pending.pop(future)
+                is_open, rtt, error, info = future.result()
+                if rtt is not None:
+                    estimator.add_sample(rtt)
+                if error in PRESSURE_ERRNOS:
+                    concurrency.on_pressure()
+                    self.logger.debug(f"Scan pressure on {ip} (errno={error}), window={concurrency.window}")
+                else:
+                    concurrency.on_success()
+                if error == 0:
+                    result = "open"
+                elif rtt is not None:
+                    result = "closed"
+                elif error in PRESSURE_ERRNOS:
+                    result = "error"
+                else:
+                    result = "timeout"
+                metrics.inc("scanner_probes_total", {"result": result})
+                if is_open:
+                    self._record_found(ip, rtt, info, found)
+                self._advance(1)
+
+    def _record_found(self, ip, rtt, info, found):
+        hostname, state, changes, ssh = info
+        record = HostRecord(ip, hostname, state=state, latency=rtt, last_seen=time.time(), ssh=ssh)
+        found[ip] = record
+        self.hosts_found += 1
+        self.host_found.emit(record)
+        if changes:
+            self.details_changed.emit(ip, changes)
+
+    def _advance(self, count):
+        """Учитывает проверенные адреса; прогресс отправляется примерно раз в PROGRESS_EMIT_STEP проб."""
+        before = self.scanned_hosts
+        self.scanned_hosts += count
+        if self.total_hosts > 0 and (before // PROGRESS_EMIT_STEP != self.scanned_hosts // PROGRESS_EMIT_STEP
+                                     or self.scanned_hosts == self.total_hosts):
+            self._emit_progress()
+
+    def _sweep_sharded(self, executor, plan, found):
+        """Сканирует подсети в пуле процессов: каждый шард — диапазон адресов со своим окном AIMD.
+
+        Рабочие процессы только проверяют порт и присылают пачки результатов;
+        запросы к найденным принтерам выполняются здесь, через общий кэш и single-flight.
+        """
+        metrics = self.network_utils.metrics
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        cancel_event = context.Event()
+        resume_event = context.Event()
+        resume_event.set()
+        # Шарды создаются по мере отправки: в пуле не больше SCAN_SHARD_PREFETCH на процесс,
+        # а начальный тайм-аут следующих шардов учитывает RTT уже просканированных
+        shards = enumerate(make_shards(plan.segments))
+        max_pps = self.rate_limiter.rate / self.processes if self.rate_limiter.rate > 0 else 0
+        self.logger.debug(f"Sharded scan: {plan.subnet_total} addresses across {self.processes} processes")
+        with ProcessPoolExecutor(max_workers=self.processes, mp_context=context, initializer=init_worker,
+                                 initargs=(results, cancel_event, resume_event, max_pps)) as pool:
+            shard_futures = {}
+
+            def submit_shards():
+                while not cancel_event.is_set() and len(shard_futures) < self.processes * SCAN_SHARD_PREFETCH:
+                    index, shard = next(shards, (None, None))
+                    if shard is None:
+                        return
+                    timeout = self.network_utils.get_rtt_estimator(shard[0]).timeout
+                    shard_futures[pool.submit(sweep_shard, index, shard, timeout)] = (index, shard)
+
+            submit_shards()
+            # Пачки из очереди могут прийти позже результата шарда, поэтому сверяем их число
+            expected = {}
+            received = {}
+            fetches = {}
+            while shard_futures or fetches or any(received.get(i, 0) < n for i, n in expected.items()):
+                if self.is_paused:
+                    resume_event.clear()
+                    self._wait_if_paused()
+                    resume_event.set()
+                if self._cancel_event.is_set() and not cancel_event.is_set():
+                    cancel_event.set()
+                    for future in [f for f in shard_futures if f.cancel()]:
+                        del shard_futures[future]
+                    self.logger.debug(f"Sharded scan cancelled, draining {len(shard_futures)} shards")
+                try:
+                    index, scanned, counts, opened = results.get(timeout=SCAN_SHARD_BATCH_INTERVAL_S)
+                except queue.Empty:
+                    pass
+                else:
+                    received[index] = received.get(index, 0) + 1
+                    for result, count in counts.items():
+                        metrics.inc("scanner_probes_total", {"result": result}, count)
+                    for ip, rtt in opened:
+                        metrics.observe("scanner_connect_latency_seconds", rtt)
+                        fetches[executor.submit(self._fetch_info, ip)] = (ip, rtt)
+                    self._advance(scanned)
+                for future in [f for f in shard_futures if f.done()]:
+                    index, shard = shard_futures.pop(future)
+                    try:
+                        batches, srtt = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Scan shard {shard} failed: {e}")
+                        continue
+                    expected[index] = batches
+                    if srtt is not None:
+                        self.network_utils.get_rtt_estimator(shard[0]).add_sample(srtt)
+                submit_shards()
+                for future in [f for f in fetches if f.done()]:
+                    ip, rtt = fetches.pop(future)
+                    self._record_found(ip, rtt, future.result(), found)
 
     def run(self):
-        open_hosts = set()
-        known_hosts = set(self.known_hosts or [])
-        total_hosts = len(known_hosts) + sum(
-            len(list(ipaddress.ip_network(subnet, strict=False).hosts())) for subnet in self.subnets)
-        scanned_hosts = 0
+        started = time.monotonic()
+        found = {}
+        # Каждый адрес проверяется один раз: известные хосты и пересечения подсетей исключены из диапазонов
+        plan = ScanPlan(self.subnets, self.known_hosts)
+        for subnet in plan.invalid:
+            self.logger.error(f"Invalid subnet {subnet}")
+            self.error_occurred.emit(f"Некорректная подсеть: {subnet}")
+        known_hosts = set(plan.known_hosts)
+        self.total_hosts = plan.total
+        self.scanned_hosts = 0
+        self.hosts_found = 0
+        self._active_since = time.monotonic()
+        self.network_utils.printer_info_cache.ensure_capacity(len(known_hosts))
         self.logger.debug(
-            f"Starting scan: {len(known_hosts)} known hosts, {len(self.subnets)} subnets, total={total_hosts}")
+            f"Starting scan: {len(known_hosts)} known hosts, {len(plan.networks)} subnets "
+            f"({len(plan.segments)} ranges), total={self.total_hosts}")
 
         if not self.network_utils.check_network_connectivity():
             self.error_occurred.emit("Нет доступа к сети. Проверьте подключение.")
             return
+        # DNS-имена известных хостов переразрешаются параллельно заранее, пробы берут адреса из кэша
+        self.network_utils.resolver.resolve_many(known_hosts)
 
-        with ThreadPoolExecutor(max_workers=KNOWN_HOSTS_WORKERS) as executor:
-            futures = [executor.submit(self.network_utils.scan_port, ip) for ip in known_hosts]
-            for idx, future in enumerate(futures, start=1):
-                scanned_hosts += 1
-                result = future.result()
-                if result:
-                    open_hosts.add(result)
-                    hostname, state = self.network_utils.get_printer_info(result)
-                    self.host_found.emit(result, hostname, state)
-                if total_hosts > 0 and (idx % PROGRESS_EMIT_STEP == 0 or scanned_hosts == total_hosts):
-                    self.progress_updated.emit(scanned_hosts / total_hosts * 100)
-
-        for subnet in self.subnets:
-            try:
-                network = ipaddress.ip_network(subnet, strict=False)
+        with ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS) as executor:
+            self._sweep(executor, plan.known_targets(), found)
+            subnets = plan.subnets()
+            if self.processes > 0 and plan.subnet_total >= SCAN_SHARD_MIN_HOSTS and not self._cancel_event.is_set():
+                self._sweep_sharded(executor, plan, found)
+                subnets = []
+            for subnet in subnets:
+                if self._cancel_event.is_set():
+                    break
                 self.logger.debug(f"Scanning subnet: {subnet}")
-                with ThreadPoolExecutor(max_workers=SUBNET_SCAN_WORKERS) as executor:
-                    futures = [executor.submit(self.network_utils.scan_port, ip) for ip in network.hosts()]
-                    for idx, future in enumerate(futures, start=1):
-                        scanned_hosts += 1
-                        result = future.result()
-                        if result:
-                            open_hosts.add(result)
-                            hostname, state = self.network_utils.get_printer_info(result)
-                            self.host_found.emit(result, hostname, state)
-                        if total_hosts > 0 and (idx % PROGRESS_EMIT_STEP == 0 or scanned_hosts == total_hosts):
-                            self.progress_updated.emit(scanned_hosts / total_hosts * 100)
-            except ValueError as e:
-                self.logger.error(f"Invalid subnet {subnet}: {e}")
-                self.error_occurred.emit(f"Некорректная подсеть: {subnet}")
-                continue
-
-        for host in known_hosts - open_hosts:
-            hostname, _ = self.network_utils.get_printer_info(host)
-            self.host_found.emit(host, hostname, STATE_OFFLINE)
-
-        self.scan_finished.emit(list(open_hosts))
-        self.logger.debug(f"Scan finished, found hosts: {open_hosts}")
+                self._sweep(executor, plan.subnet_targets(subnet), found)
+                estimator = self.network_utils.get_rtt_estimator(subnet)
+                self.logger.debug(
+                    f"Subnet {subnet}: srtt={estimator.srtt}, timeout={estimator.timeout:.3f}s, "
+                    f"samples={estimator.samples}, window={self.network_utils.scan_concurrency.window}")
+
+            # После отмены непроверенные хосты не помечаются оффлайн
+            if not self._cancel_event.is_set():
+                offline = sorted(known_hosts - found.keys())
+                # Moonraker не отвечает, но SSH может быть доступен — он и нужен, чтобы разобраться
+                ssh_checks = [executor.submit(self.network_utils.check_ssh, host) for host in offline]
+                for host, ssh_check in zip(offline, ssh_checks):
+                    # Порт закрыт — /printer/info заведомо недоступен, берём последнее известное имя
+                    self.host_found.emit(HostRecord(host, self.network_utils.get_hostname(host), state=STATE_OFFLINE,
+                                                    ssh=ssh_check.result()))
+                    changes = self.network_utils.diff_details(host, {})
+                    if changes:
+                        self.details_changed.emit(host, changes)
+
+        self.network_utils.metrics.set_gauge("scanner_queue_depth", 0)
+        self.network_utils.metrics.observe("scan_cycle_duration_seconds", time.monotonic() - started,
+                                           {"kind": "scan" if self.subnets else "refresh"})
+        self.scan_finished.emit(list(found.values()))
+        self.logger.debug(f"Scan finished (cancelled={self.is_cancelled}), found hosts: {list(found)}")
@@ -0,0 +1,217 @@
+# telemetry.py
+
+import logging
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from network import TELEMETRY_HEATERS
+from utils import TELEMETRY_INTERVAL_MS, TELEMETRY_HISTORY_SIZE, TELEMETRY_WORKERS, TELEMETRY_STATUS_MAX_AGE_S
+
+# Метрики, которые хранятся для каждого хоста (см. NetworkUtils.get_telemetry)
+TELEMETRY_METRICS = (
+    "extruder_temperature", "extruder_target", "heater_bed_temperature", "heater_bed_target",
+    "cpu_usage", "memory_usage", "cpu_temp", "throttled",
+)
+
+NAN = float("nan")
+
+
+class TelemetryRing:
+    """История телеметрии одного хоста: кольцевые буферы фиксированной ёмкости поверх array.
+
+    Память выделяется один раз при первой точке (8 байт на время и по 4 байта на метрику),
+    дальше новые точки перезаписывают самые старые. Отсутствующее значение хранится как NaN.
+    """
+
+    __slots__ = ("capacity", "head", "count", "times", "columns")
+
+    def __init__(self, capacity=TELEMETRY_HISTORY_SIZE):
+        self.capacity = capacity
+        self.head = 0
+        self.count = 0
+        self.times = array("d", [0.0]) * capacity
+        self.columns = {metric: array("f", [NAN]) * capacity for metric in TELEMETRY_METRICS}
+
+    def append(self, at, sample):
+        index = self.head
+        self.times[index] = at
+        for metric, column in self.columns.items():
+            value = sample.get(metric)
+            column[index] = value if value is not None else NAN
+        self.head = (index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _ordered(self, buffer):
+        if self.count < self.capacity:
+            return buffer[:self.count]
+        return buffer[self.head:] + buffer[:self.head]
+
+    def latest(self):
+        if not self.count:
+            return None, {}
+        index = (self.head - 1) % self.capacity
+        return self.times[index], {metric: column[index] for metric, column in self.columns.items()
+                                   if not math.isnan(column[index])}
+
+    def downsample(self, metric, buckets, since=None):
+        """Сворачивает историю метрики в не более чем buckets корзин: [(время начала, минимум, максимум)].
+
+        Минимум и максимум корзины сохраняют пики, которые потерялись бы при усреднении,
+        а число точек для отрисовки не зависит от глубины истории.
+        """
+        times = self._ordered(self.times)
+        values = self._ordered(self.columns[metric])
+        first = bisect_left(times, since) if since is not None else 0
+        total = len(times) - first
+        if total <= 0 or buckets <= 0:
+            return []
+        result = []
+        step = max(total / buckets, 1.0)
+        position = float(first)
+        while position < len(times):
+            start = int(position)
+            position += step
+            # NaN != NaN: пропуски отбрасываются без вызова math.isnan на каждую точку
+            chunk = [value for value in values[start:int(position)] if value == value]
+            if chunk:
+                result.append((times[start], min(chunk), max(chunk)))
+        return result
+
+
+class TelemetryStore:
+    """Потокобезопасное хранилище историй телеметрии по хостам."""
+
+    def __init__(self, capacity=TELEMETRY_HISTORY_SIZE):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self.rings = {}
+
+    def record(self, host, sample, at=None):
+        with self._lock:
+            ring = self.rings.get(host)
+            if ring is None:
+                ring = self.rings[host] = TelemetryRing(self.capacity)
+            ring.append(time.time() if at is None else at, sample)
+
+    def latest(self, host):
+        with self._lock:
+            ring = self.rings.get(host)
+            return ring.latest() if ring is not None else (None, {})
+
+    def downsample(self, host, metric, buckets, since=None):
+        with self._lock:
+            ring = self.rings.get(host)
+            return ring.downsample(metric, buckets, since) if ring is not None else []
+
+    def forget(self, host):
+        with self._lock:
+            self.rings.pop(host, None)
+
+    def memory_bytes(self):
+        with self._lock:
+            return sum(ring.times.itemsize * ring.capacity
+                       + sum(column.itemsize * ring.capacity for column in ring.columns.values())
+                       for ring in self.rings.values())
+
+
+class TelemetryPoller(QObject):
+    """Снимает телеметрию доступных хостов в общем пуле потоков.
+
+    Хосты с открытым окном телеметрии (view) опрашиваются раз в TELEMETRY_INTERVAL_MS. Остальные
+    доступные хосты — раз в background_interval секунд, если фоновый сбор включён (0 — выключен);
+    без открытых окон и фонового сбора принтеры не опрашиваются вовсе. Свежие температуры берутся
+    из расширенного статуса, тогда отдельно запрашивается только /machine/proc_stats.
+    О новой точке хоста сообщает сигнал sampled; сами данные читаются из store.
+    """
+
+    sampled = pyqtSignal(str)
+
+    def __init__(self, network_utils, store, background_interval=0, parent=None):
+        super().__init__(parent)
+        self.network_utils = network_utils
+        self.store = store
+        self.logger = logging.getLogger(__name__)
+        self.hosts = set()
+        self.viewed = set()
+        self.background_interval = background_interval
+        self._background_at = 0.0
+        self._polling = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=TELEMETRY_WORKERS, thread_name_prefix="telemetry")
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.poll_all)
+        self._update_timer()
+
+    def _update_timer(self):
+        if self.viewed or self.background_interval:
+            if not self.timer.isActive():
+                self.timer.start(TELEMETRY_INTERVAL_MS)
+        else:
+            self.timer.stop()
+
+    def set_background_interval(self, interval):
+        self.background_interval = interval
+        self._update_timer()
+
+    def view(self, host):
+        """Открыто окно телеметрии хоста: первая точка снимается сразу, дальше — с полной частотой."""
+        self.viewed.add(host)
+        self._update_timer()
+        if host in self.hosts:
+            self._submit(host)
+
+    def unview(self, host):
+        self.viewed.discard(host)
+        self._update_timer()
+
+    def watch(self, host, online):
+        """Опрашиваются только хосты, которые были доступны при последнем сканировании."""
+        if online:
+            self.hosts.add(host)
+        else:
+            self.hosts.discard(host)
+
+    def forget(self, host):
+        self.hosts.discard(host)
+        self.store.forget(host)
+
+    def poll_all(self):
+        hosts = self.hosts & self.viewed
+        now = time.monotonic()
+        if self.background_interval and now - self._background_at >= self.background_interval:
+            self._background_at = now
+            hosts = self.hosts
+        for host in list(hosts):
+            self._submit(host)
+
+    def _submit(self, host):
+        with self._lock:
+            # Медленный хост не копит очередь запросов: пока идёт предыдущий, новый не ставится
+            if host in self._polling:
+                return
+            self._polling.add(host)
+        self._executor.submit(self._poll, host)
+
+    def _poll(self, host):
+        try:
+            temperatures = self.network_utils.status_temperatures(host, TELEMETRY_STATUS_MAX_AGE_S)
+            heaters = [heater for heater in TELEMETRY_HEATERS if f"{heater}_temperature" not in temperatures]
+            sample = self.network_utils.get_telemetry(host, heaters)
+            if sample is not None:
+                sample = {**temperatures, **sample}
+            if sample is not None and host in self.hosts:
+                self.store.record(host, sample)
+                self.sampled.emit(host)
+        except Exception as e:
+            self.logger.error(f"Failed to poll telemetry for {host}: {e}")
+        finally:
+            with self._lock:
+                self._polling.discard(host)
+
+    def shutdown(self):
+        self.timer.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
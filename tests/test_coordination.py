@@ -0,0 +1,137 @@
+# tests/test_coordination.py
+
+import socket
+import threading
+import time
+import unittest
+from unittest import mock
+from PyQt6.QtCore import Qt
+from coordination import Coordinator, LEADER, FOLLOWER
+from fleet_api import FleetState
+
+
+def free_port():
+    """Порт, свободный и для TCP-сервера ведущего, и для UDP-маяков."""
+    while True:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as tcp:
+            tcp.bind(("127.0.0.1", 0))
+            port = tcp.getsockname()[1]
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp:
+                udp.bind(("", port))
+        except OSError:
+            continue
+        return port
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class Instance:
+    """Копия приложения в этом процессе: координатор со своим FleetState и журналом событий потока."""
+
+    def __init__(self, port, started):
+        self.fleet_state = FleetState()
+        self.coordinator = Coordinator(self.fleet_state, port)
+        # Старшинство задаётся явно, чтобы не зависеть от порядка запуска в пределах одной секунды
+        self.coordinator.started = started
+        self.events = []
+        self.lock = threading.Lock()
+        # Без цикла событий Qt сигналы из фоновых потоков принимаются напрямую
+        self.coordinator.fleet_event.connect(self.on_event, Qt.ConnectionType.DirectConnection)
+
+    def on_event(self, event_type, data):
+        with self.lock:
+            self.events.append((event_type, data))
+
+    def received(self, event_type):
+        with self.lock:
+            return [data for kind, data in self.events if kind == event_type]
+
+    def received_host(self, host, state):
+        return any(data["host"]["host"] == host and data["host"]["state"] == state
+                   for data in self.received("update"))
+
+    def knows_host(self, host):
+        """Хост пришёл в снимке или в обновлении — в зависимости от того, что случилось раньше подписки."""
+        return (any(record["host"] == host for data in self.received("snapshot") for record in data["hosts"])
+                or any(data["host"]["host"] == host for data in self.received("update")))
+
+
+@mock.patch("coordination.COORDINATION_BEACON_INTERVAL_S", 0.2)
+@mock.patch("coordination.COORDINATION_LEADER_TIMEOUT_S", 0.8)
+@mock.patch("fleet_api.FLEET_API_SSE_KEEPALIVE_S", 0.5)
+class CoordinatorTest(unittest.TestCase):
+    def setUp(self):
+        self.port = free_port()
+        self.instances = []
+
+    def tearDown(self):
+        for instance in self.instances:
+            instance.coordinator.stop()
+
+    def start_instances(self, count):
+        now = time.time()
+        for index in range(count):
+            instance = Instance(self.port, now + index)
+            self.assertTrue(instance.coordinator.start())
+            self.instances.append(instance)
+        return self.instances
+
+    def leaders(self):
+        return [instance for instance in self.instances if instance.coordinator.role == LEADER]
+
+    def followers(self):
+        return [instance for instance in self.instances if instance.coordinator.role == FOLLOWER]
+
+    def wait_for_roles(self, leaders, followers):
+        return wait_until(lambda: len(self.leaders()) == leaders and len(self.followers()) == followers)
+
+    def test_single_leader_is_elected(self):
+        instances = self.start_instances(3)
+        self.assertTrue(self.wait_for_roles(1, 2))
+        self.assertIs(self.leaders()[0], instances[0])
+        # Роли устойчивы: второй ведущий не появляется за несколько интервалов маяков
+        time.sleep(1.0)
+        self.assertEqual(len(self.leaders()), 1)
+        self.assertTrue(all(instance.coordinator.peer_count == 2 for instance in instances))
+
+    def test_followers_receive_snapshot_and_updates(self):
+        leader, *followers = self.start_instances(3)
+        leader.fleet_state.update("10.0.0.5", "Voron", "ready")
+        self.assertTrue(self.wait_for_roles(1, 2))
+        for follower in followers:
+            self.assertTrue(wait_until(lambda: follower.received("snapshot")))
+            hosts = follower.received("snapshot")[0]["hosts"]
+            self.assertEqual([(host["host"], host["state"]) for host in hosts], [("10.0.0.5", "ready")])
+        leader.fleet_state.update("10.0.0.5", "Voron", "printing")
+        leader.fleet_state.remove("10.0.0.5")
+        for follower in followers:
+            self.assertTrue(wait_until(lambda: follower.received("remove")))
+            self.assertTrue(follower.received_host("10.0.0.5", "printing"))
+            self.assertEqual(follower.received("remove")[0]["host"]["host"], "10.0.0.5")
+
+    def test_follower_takes_over_when_leader_stops(self):
+        leader, follower = self.start_instances(2)
+        self.assertTrue(self.wait_for_roles(1, 1))
+        self.assertIs(self.leaders()[0], leader)
+        leader.coordinator.stop()
+        self.instances.remove(leader)
+        self.assertTrue(wait_until(lambda: follower.coordinator.role == LEADER))
+        # Новый ведущий раздаёт собственное состояние парка на том же порту
+        joined = Instance(self.port, time.time() + 10)
+        self.assertTrue(joined.coordinator.start())
+        self.instances.append(joined)
+        follower.fleet_state.update("10.0.0.7", "Ender", "ready")
+        self.assertTrue(wait_until(lambda: joined.knows_host("10.0.0.7")))
+        self.assertEqual(joined.coordinator.role, FOLLOWER)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+# tests/test_event_export.py
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import mock
+from event_export import SinkExporter
+from metrics import MetricsRegistry
+
+
+class LocalSink:
+    """Локальный HTTP-приёмник: запоминает пакеты, пока available, иначе отвечает 503."""
+
+    def __init__(self):
+        self.batches = []
+        self.available = True
+        self.lock = threading.Lock()
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with sink.lock:
+                    status = 200 if sink.available else 503
+                    if sink.available:
+                        sink.batches.append(json.loads(body)["events"])
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/events"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def received(self):
+        with self.lock:
+            return [event["seq"] for batch in self.batches for event in batch]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def event(seq):
+    return {"id": str(seq), "type": "state", "time": time.time(), "seq": seq}
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@mock.patch("event_export.EXPORT_RETRY_BASE_S", 0.05)
+@mock.patch("event_export.EXPORT_RETRY_MAX_S", 0.2)
+class SinkExporterTest(unittest.TestCase):
+    def setUp(self):
+        self.sink = LocalSink()
+        self.spool_dir = tempfile.TemporaryDirectory()
+        self.metrics = MetricsRegistry()
+        self.exporters = []
+
+    def tearDown(self):
+        for exporter in self.exporters:
+            exporter.stop()
+        self.sink.close()
+        self.spool_dir.cleanup()
+
+    def exporter(self, **kwargs):
+        exporter = SinkExporter(self.sink.url, self.spool_dir.name, self.metrics, **kwargs)
+        exporter.start()
+        self.exporters.append(exporter)
+        return exporter
+
+    def test_full_batches_and_partial_flush(self):
+        exporter = self.exporter(batch_size=10, flush_interval=0.2)
+        for seq in range(25):
+            exporter.offer(event(seq))
+        self.assertTrue(wait_until(lambda: len(self.sink.received()) == 25))
+        self.assertEqual(self.sink.received(), list(range(25)))
+        self.assertTrue(all(len(batch) <= 10 for batch in self.sink.batches))
+        self.assertLess(len(self.sink.batches), 25)
+
+    def test_retry_and_spool_drain_keep_order(self):
+        self.sink.available = False
+        exporter = self.exporter(batch_size=10, flush_interval=0.05)
+        for seq in range(30):
+            exporter.offer(event(seq))
+        self.assertTrue(wait_until(lambda: exporter.down and exporter.spooled_bytes > 0))
+        for seq in range(30, 45):
+            exporter.offer(event(seq))
+        self.sink.available = True
+        self.assertTrue(wait_until(lambda: len(self.sink.received()) == 45))
+        self.assertEqual(self.sink.received(), list(range(45)))
+        self.assertTrue(wait_until(lambda: not exporter.down and exporter.spooled_bytes == 0))
+        self.assertFalse(os.path.exists(exporter.spool_file))
+
+    def test_spool_survives_restart(self):
+        self.sink.available = False
+        exporter = self.exporter(batch_size=5, flush_interval=0.05)
+        for seq in range(12):
+            exporter.offer(event(seq))
+        self.assertTrue(wait_until(lambda: exporter.down))
+        exporter.stop()
+        self.exporters.remove(exporter)
+        self.sink.available = True
+        self.exporter(batch_size=5, flush_interval=0.05)
+        self.assertTrue(wait_until(lambda: len(self.sink.received()) == 12))
+        self.assertEqual(self.sink.received(), list(range(12)))
+
+    def test_full_spool_drops_oldest_events(self):
+        line_size = len(json.dumps(event(0), ensure_ascii=False)) + 1
+        with mock.patch("event_export.EXPORT_SPOOL_MAX_BYTES", line_size * 20):
+            self.sink.available = False
+            exporter = self.exporter(batch_size=5, flush_interval=0.05)
+            for seq in range(60):
+                exporter.offer(event(seq))
+                time.sleep(0.002)
+            self.assertTrue(wait_until(lambda: exporter.queued == 0))
+            exporter.stop()
+            self.exporters.remove(exporter)
+            self.assertLessEqual(os.path.getsize(exporter.spool_file), line_size * 20 + 2 * 5)
+            self.sink.available = True
+            self.exporter(batch_size=5, flush_interval=0.05)
+            self.assertTrue(wait_until(lambda: 59 in self.sink.received()))
+        received = self.sink.received()
+        self.assertEqual(received, sorted(received))
+        self.assertNotIn(0, received)
+        self.assertEqual(received[-1], 59)
+        self.assertGreater(self.metrics.counter_value("export_events_total",
+                                                      {"sink": self.sink.url, "result": "dropped"}), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# tests/test_scan_plan.py
+
+import ipaddress
+import unittest
+from scan_plan import ScanPlan, parse_subnet
+
+
+def addresses(plan):
+    """Все адреса подсетей плана в порядке обхода."""
+    return [str(address) for subnet in plan.subnets() for address, _ in plan.subnet_targets(subnet)]
+
+
+class ParseSubnetTest(unittest.TestCase):
+    def test_host_bits_are_accepted(self):
+        network, excluded = parse_subnet(" 192.168.1.77/24 ")
+        self.assertEqual(network, ipaddress.ip_network("192.168.1.0/24"))
+        self.assertFalse(excluded)
+
+    def test_exclusion_prefix(self):
+        network, excluded = parse_subnet("! 10.0.5.3/28")
+        self.assertEqual(network, ipaddress.ip_network("10.0.5.0/28"))
+        self.assertTrue(excluded)
+
+    def test_invalid_entry_raises(self):
+        with self.assertRaises(ValueError):
+            parse_subnet("192.168.1.0/33")
+
+
+class ScanPlanTest(unittest.TestCase):
+    def test_overlapping_subnets_scan_each_address_once(self):
+        plan = ScanPlan(["192.168.1.0/24", "192.168.1.128/25", "192.168.1.0/24"])
+        targets = addresses(plan)
+        self.assertEqual(len(targets), len(set(targets)))
+        self.assertEqual(plan.subnet_total, 254)
+        self.assertEqual(len(targets), plan.subnet_total)
+        # Адреса узкой подсети относятся к ней, а не к широкой
+        narrow = [str(address) for address, _ in plan.subnet_targets("192.168.1.128/25")]
+        self.assertEqual(narrow[0], "192.168.1.129")
+        self.assertEqual(narrow[-1], "192.168.1.254")
+        self.assertEqual(plan.timing_key("192.168.1.200"), "192.168.1.128/25")
+        self.assertEqual(plan.timing_key("192.168.1.20"), "192.168.1.0/24")
+
+    def test_exclusion_splits_range(self):
+        plan = ScanPlan(["10.0.5.0/24", "!10.0.5.16/28"])
+        targets = addresses(plan)
+        self.assertEqual(plan.subnet_total, 254 - 16)
+        self.assertEqual(len(targets), plan.subnet_total)
+        self.assertIn("10.0.5.15", targets)
+        self.assertIn("10.0.5.32", targets)
+        self.assertFalse(any(address in targets for address in
+                             (str(host) for host in ipaddress.ip_network("10.0.5.16/28"))))
+        self.assertEqual([segment[2:] for segment in plan.segments],
+                         [(int(ipaddress.ip_address("10.0.5.1")), int(ipaddress.ip_address("10.0.5.15"))),
+                          (int(ipaddress.ip_address("10.0.5.32")), int(ipaddress.ip_address("10.0.5.254")))])
+
+    def test_exclusion_covering_whole_subnet(self):
+        plan = ScanPlan(["10.0.0.0/24", "10.0.1.0/28", "!10.0.1.0/24"])
+        self.assertEqual(plan.subnets(), ["10.0.0.0/24"])
+        self.assertEqual(plan.subnet_total, 254)
+        self.assertEqual(list(plan.subnet_targets("10.0.1.0/28")), [])
+
+    def test_host_bits_and_known_hosts(self):
+        plan = ScanPlan(["192.168.2.10/30", "bogus", "!not-a-net"], known_hosts=["192.168.2.9", "printer.local"])
+        self.assertEqual(plan.invalid, ["bogus", "!not-a-net"])
+        # 192.168.2.8/30: хосты .9 и .10, известный .9 проверяется отдельно
+        self.assertEqual(addresses(plan), ["192.168.2.10"])
+        self.assertEqual(plan.subnet_total, 1)
+        self.assertEqual(plan.total, 3)
+        self.assertEqual(plan.timing_key("printer.local"), "known")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,40 @@
 import logging
 from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QProgressBar, QCheckBox, QMenu, \
-    QSpacerItem, QSizePolicy, QMessageBox, QInputDialog, QApplication, QSystemTrayIcon, QTableWidgetItem
+    QSpacerItem, QSizePolicy, QMessageBox, QInputDialog, QApplication, QSystemTrayIcon, QLabel
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QIcon
+import os
 import platform
+import time
 from config import ConfigManager
 from scanner import ScanThread
-from network import NetworkUtils
+from network import NetworkUtils, DEFAULT_STATUS_FIELDS, STATUS_FIELDS
+from metrics import MetricsServer
+from fleet_api import FleetState, FleetApiServer
+from hosts import HostRecord, UNKNOWN_NAME, hosts_from_config
+from notifications import NotificationCenter
+from job_cache import JobCache, JobInfoLoader
+from history_sync import HistoryStore, HistorySyncThread
+from log_tail import LogFollower
+from telemetry import TelemetryStore, TelemetryPoller
+from profiling import CycleProfiler
+from discovery import DiscoveryThread
+from config_sync import RemoteHashCache
+from event_export import EventExporter
+from coordination import Coordinator, LEADER, FOLLOWER
+from file_browser import ListingCache, ListingLoader
 from utils import APP_NAME, open_ssh_terminal, set_log_level, resource_path, REFRESH_INTERVAL_MS, \
-    AUTO_REFRESH_INTERVAL_MS, STATE_OFFLINE
+    AUTO_REFRESH_INTERVAL_MS, STATE_OFFLINE, DEFAULT_METRICS_PORT, DEFAULT_FLEET_API_PORT, \
+    NOTIFICATION_BATCH_INTERVAL_MS, HISTORY_SYNC_INTERVAL_MS, DEFAULT_DISCOVERY_PPS, DEFAULT_COORDINATION_PORT, \
+    DEFAULT_TELEMETRY_INTERVAL_S
 from HostTable import HostTable
 from WebcamDialog import WebcamDialog
 from SettingsDialog import SettingsDialog
+from UploadDialog import UploadDialog
+from ConfigSyncDialog import ConfigSyncDialog
+from LogViewerDialog import LogViewerDialog
+from TelemetryDialog import TelemetryDialog
+from FileBrowserDialog import FileBrowserDialog
 
 
 class MainWindow(QMainWindow):
@@ -22,23 +45,45 @@ class MainWindow(QMainWindow):
         self.logger = logging.getLogger(__name__)
 
         QApplication.setQuitOnLastWindowClosed(False)
+        QApplication.instance().aboutToQuit.connect(self.stop_scan_thread)
 
         self.config_manager = ConfigManager()
         self.network_utils = NetworkUtils()
         self.config = self.config_manager.load_config()
         self.subnets = self.config.get("subnets", [])
-        self.known_hosts = self.config.get("hosts", {})
+        self.known_hosts = hosts_from_config(self.config.get("hosts", {}))
         self.notification_states = self.config.get("notification_states", [])
         self.ssh_user = self.config.get("ssh_user", "")
         self.log_level = self.config.get("log_level", "INFO")
         self.auto_refresh = self.config.get("auto_refresh", True)
+        self.scan_rate_limit = self.config.get("scan_rate_limit", 0)
+        self.scan_processes = self.config.get("scan_processes", 0)
+        self.discovery_pps = self.config.get("discovery_pps", DEFAULT_DISCOVERY_PPS)
+        self.discovery_thread = None
+        self.metrics_port = self.config.get("metrics_port", DEFAULT_METRICS_PORT)
+        self.metrics_server = None
+        self.api_port = self.config.get("api_port", DEFAULT_FLEET_API_PORT)
+        self.fleet_state = FleetState()
+        self.fleet_api = None
+        self.export_sinks = self.config.get("export_sinks", [])
+        self.event_exporter = EventExporter(os.path.join(self.config_manager.config_dir, "spool"),
+                                            self.network_utils.metrics)
+        self.coordination_port = self.config.get("coordination_port", DEFAULT_COORDINATION_PORT)
+        self.coordinator = None
+        self.telemetry_interval = self.config.get("telemetry_interval", DEFAULT_TELEMETRY_INTERVAL_S)
+        self.rich_status = self.config.get("rich_status", False)
+        self.status_fields = self.config.get("status_fields", list(DEFAULT_STATUS_FIELDS))
         self.previous_states = {}
+        self.notifications = NotificationCenter()
         self.current_hosts = []
 
         set_log_level(self.log_level)
+        self.apply_metrics_server()
+        self.apply_fleet_api()
+        self.event_exporter.configure(self.export_sinks)
 
         if not self.subnets:
-            self.subnets = [self.network_utils.get_local_subnet()]
+            self.subnets = self.network_utils.get_local_subnets()
             self.config_manager.save_current_config(self)
 
         icon_path = ""
@@ -69,7 +114,9 @@ class MainWindow(QMainWindow):
         buttons = [
             ("Настройки", self.open_settings),
             ("Сканировать", self.scan_network),
-            ("Обновить", self.refresh_hosts)
+            ("Обновить", self.refresh_hosts),
+            ("Загрузить G-code", self.open_upload_dialog),
+            ("Синхронизировать конфиги", self.open_config_sync_dialog)
         ]
         self.scan_button = None
         self.refresh_button = None
@@ -86,17 +133,35 @@ class MainWindow(QMainWindow):
         self.auto_refresh_checkbox.stateChanged.connect(self.toggle_auto_refresh)
         button_layout.addWidget(self.auto_refresh_checkbox)
         button_layout.addStretch()
+        self.coordination_label = QLabel()
+        self.coordination_label.setVisible(False)
+        button_layout.addWidget(self.coordination_label)
         layout.addLayout(button_layout)
 
         self.table = HostTable(self)
+        self.table.set_details_visible(self.rich_status)
         self.table.cellClicked.connect(self.cell_clicked)
         self.table.customContextMenuRequested.connect(self.show_context_menu)
+        # Сведения о текущем файле (оценка времени, миниатюра) — из дискового кэша, сеть только при смене файла
+        self.job_loader = JobInfoLoader(
+            self.network_utils, JobCache(os.path.join(self.config_manager.config_dir, "cache", "jobs")), self)
+        self.job_loader.loaded.connect(self.table.update_job_info)
         layout.addWidget(self.table)
 
+        progress_layout = QHBoxLayout()
         self.progress_bar = QProgressBar()
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(False)
-        layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.progress_bar)
+        self.pause_button = QPushButton("Пауза")
+        self.pause_button.clicked.connect(self.toggle_scan_pause)
+        self.pause_button.setVisible(False)
+        progress_layout.addWidget(self.pause_button)
+        self.cancel_scan_button = QPushButton("Отменить")
+        self.cancel_scan_button.clicked.connect(self.cancel_scan)
+        self.cancel_scan_button.setVisible(False)
+        progress_layout.addWidget(self.cancel_scan_button)
+        layout.addLayout(progress_layout)
 
         exit_layout = QHBoxLayout()
         exit_layout.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum))
@@ -115,9 +180,47 @@ class MainWindow(QMainWindow):
         if self.auto_refresh:
             self.refresh_timer.start(REFRESH_INTERVAL_MS)
 
+        # Уведомления копятся и отправляются одной сводкой раз в интервал
+        self.notification_timer = QTimer(self)
+        self.notification_timer.timeout.connect(self.deliver_notifications)
+        self.notification_timer.start(NOTIFICATION_BATCH_INTERVAL_MS)
+
+        # История печати догружается в локальную базу в фоне; сводки строятся по ней
+        self.history_store = HistoryStore(os.path.join(self.config_manager.config_dir, "history.sqlite3"))
+        self.history_thread = None
+        self.history_timer = QTimer(self)
+        self.history_timer.timeout.connect(lambda: self.sync_history(auto=True))
+        self.history_timer.start(HISTORY_SYNC_INTERVAL_MS)
+
+        # Хвосты klippy.log догружаются по Range поверх локального кэша
+        self.log_follower = LogFollower(self.network_utils,
+                                        os.path.join(self.config_manager.config_dir, "cache", "logs"), parent=self)
+        self.log_viewer = None
+
+        # Температуры и нагрузка хостов в кольцевых буферах фиксированного размера
+        self.telemetry_store = TelemetryStore()
+        self.telemetry_poller = TelemetryPoller(self.network_utils, self.telemetry_store, parent=self)
+        self.apply_telemetry()
+        self.telemetry_dialogs = {}
+
+        # Листинги каталогов принтеров: мгновенный показ из кэша, обновление разницей
+        self.file_listing_cache = ListingCache(os.path.join(self.config_manager.config_dir, "cache", "files"))
+        self.file_loader = ListingLoader(self.network_utils, self)
+        self.file_browsers = {}
+
+        # Хэши файлов конфигурации на принтерах для разностной синхронизации
+        self.config_sync_cache = RemoteHashCache(
+            os.path.join(self.config_manager.config_dir, "cache", "config_sync.json"))
+
+        # Профилирование следующих N циклов по запросу из настроек; файлы пишутся рядом с логом
+        self.profiler = CycleProfiler(self.config_manager.config_dir)
+
         self.initialize_table()
+        self.apply_coordination()
+        self.apply_discovery()
 
-        # Первое обновление сразу при старте (без ожидания таймера)
+        # Первое обновление сразу при старте (без ожидания таймера); в режиме координации
+        # его сделает эта копия, если станет ведущей
         self.refresh_hosts(auto=True)
 
     def toggle_auto_refresh(self, state):
@@ -131,16 +234,187 @@ class MainWindow(QMainWindow):
 
     def open_settings(self):
         dialog = SettingsDialog(self.subnets, self.notification_states, self.ssh_user, self.log_level,
-                                self.config_manager, self)
+                                self.config_manager, self, scan_rate_limit=self.scan_rate_limit,
+                                scan_processes=self.scan_processes, discovery_pps=self.discovery_pps,
+                                metrics_port=self.metrics_port, api_port=self.api_port,
+                                export_sinks=self.export_sinks, coordination_port=self.coordination_port,
+                                telemetry_interval=self.telemetry_interval,
+                                rich_status=self.rich_status, status_fields=self.status_fields)
         if dialog.exec():
+            if dialog.get_subnets() != self.subnets:
+                # Подсети изменились: текущее сканирование больше не актуально
+                self.cancel_scan()
             self.subnets = dialog.get_subnets()
             self.notification_states = dialog.get_notification_states()
             self.ssh_user = dialog.get_ssh_credentials()
             self.log_level = dialog.get_log_level()
+            self.scan_rate_limit = dialog.get_scan_rate_limit()
+            self.scan_processes = dialog.get_scan_processes()
+            self.discovery_pps = dialog.get_discovery_pps()
+            self.apply_discovery()
+            if dialog.get_metrics_port() != self.metrics_port:
+                self.metrics_port = dialog.get_metrics_port()
+                self.apply_metrics_server()
+            if dialog.get_api_port() != self.api_port:
+                self.api_port = dialog.get_api_port()
+                self.apply_fleet_api()
+            self.export_sinks = dialog.get_export_sinks()
+            self.event_exporter.configure(self.export_sinks)
+            self.telemetry_interval = dialog.get_telemetry_interval()
+            self.apply_telemetry()
+            if dialog.get_coordination_port() != self.coordination_port:
+                self.coordination_port = dialog.get_coordination_port()
+                self.apply_coordination()
+            self.rich_status = dialog.get_rich_status()
+            self.status_fields = dialog.get_status_fields()
+            self.table.set_details_visible(self.rich_status)
             self.config_manager.save_current_config(self)
             self.logger.debug(
                 f"Settings updated: subnets={self.subnets}, notification_states={self.notification_states}, "
-                f"ssh_user={self.ssh_user}, log_level={self.log_level}")
+                f"ssh_user={self.ssh_user}, log_level={self.log_level}, scan_rate_limit={self.scan_rate_limit}")
+
+    def sync_history(self, auto=False):
+        """Запускает инкрементальную синхронизацию истории печати с хостами в сети."""
+        if auto and not self.polls_printers():
+            # По таймеру историю забирает только копия, которая опрашивает принтеры
+            return None
+        if self.history_thread is not None and self.history_thread.isRunning():
+            self.logger.debug("History sync requested but already running; skipping")
+            return self.history_thread
+        hosts = [host for host, record in self.known_hosts.items() if record.online]
+        self.history_thread = HistorySyncThread(hosts, self.network_utils, self.history_store)
+        self.history_thread.start()
+        self.logger.debug(f"Started history sync for {len(hosts)} hosts")
+        return self.history_thread
+
+    def open_upload_dialog(self):
+        dialog = UploadDialog(list(self.known_hosts.values()), self.network_utils, self)
+        dialog.exec()
+
+    def open_config_sync_dialog(self):
+        dialog = ConfigSyncDialog(list(self.known_hosts.values()), self.network_utils, self.config_sync_cache, self)
+        dialog.exec()
+
+    def apply_metrics_server(self):
+        """Запускает или останавливает экспорт метрик Prometheus согласно metrics_port."""
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        if self.metrics_port:
+            server = MetricsServer(self.network_utils.metrics, self.metrics_port)
+            if server.start():
+                self.metrics_server = server
+
+    def apply_fleet_api(self):
+        """Запускает или останавливает локальный API состояния парка согласно api_port."""
+        if self.fleet_api is not None:
+            self.fleet_api.stop()
+            self.fleet_api = None
+        if self.api_port:
+            server = FleetApiServer(self.fleet_state, self.api_port)
+            if server.start():
+                self.fleet_api = server
+
+    def apply_telemetry(self):
+        """Включает или выключает фоновый сбор телеметрии со всех принтеров согласно telemetry_interval.
+
+        В режиме координации фоновый сбор ведёт только опрашивающая копия.
+        """
+        self.telemetry_poller.set_background_interval(self.telemetry_interval if self.polls_printers() else 0)
+
+    def apply_coordination(self):
+        """Включает или выключает координацию с другими копиями приложения согласно coordination_port."""
+        if self.coordinator is not None:
+            self.coordinator.stop()
+            self.coordinator = None
+        if self.coordination_port:
+            coordinator = Coordinator(self.fleet_state, self.coordination_port, self)
+            coordinator.role_changed.connect(self.on_coordination_role)
+            coordinator.fleet_event.connect(self.on_leader_event)
+            if coordinator.start():
+                self.coordinator = coordinator
+        self.update_coordination_label()
+        self.apply_telemetry()
+
+    def polls_printers(self):
+        """Опрашивает ли эта копия принтеры сама: без координации — всегда, с ней — только ведущая."""
+        return self.coordinator is None or self.coordinator.polls_printers
+
+    def update_coordination_label(self):
+        if self.coordinator is None:
+            self.coordination_label.setVisible(False)
+            return
+        if self.coordinator.role == LEADER:
+            text = "Ведущая копия: опрашивает принтеры"
+        elif self.coordinator.role == FOLLOWER:
+            text = f"Данные от копии {self.coordinator.leader_address}"
+        else:
+            text = "Выбор ведущей копии..."
+        self.coordination_label.setText(text)
+        self.coordination_label.setVisible(True)
+
+    def on_coordination_role(self, role, leader_address):
+        self.logger.info(f"Coordination role: {role} {leader_address}".rstrip())
+        self.update_coordination_label()
+        self.apply_discovery()
+        self.apply_telemetry()
+        if role == LEADER:
+            # Данные ведомого режима могли устареть — сразу опрашиваем принтеры сами
+            self.refresh_hosts(auto=True)
+
+    def on_leader_event(self, event_type, data):
+        """Применяет снимок или изменение парка из потока ведущей копии как результат своего опроса."""
+        if self.polls_printers():
+            return
+        if event_type == "snapshot":
+            entries = data.get("hosts", [])
+        elif event_type == "update":
+            entries = [data.get("host", {})]
+        else:
+            # Удаление хоста у ведущего не удаляет его из списка этой копии
+            return
+        added = False
+        for entry in entries:
+            host = entry.get("host")
+            if not host:
+                continue
+            added = added or host not in self.known_hosts
+            self.add_host_to_table(HostRecord(host, entry.get("original_name") or entry.get("name"),
+                                              state=entry.get("state", STATE_OFFLINE),
+                                              last_seen=entry.get("updated"), ssh=entry.get("ssh")))
+            # JSON превращает кортежи температур в списки; сравниваем в том же виде, что и при своём опросе
+            details = {field: tuple(value) if isinstance(value, list) else value
+                       for field, value in entry.items() if field in STATUS_FIELDS}
+            changes = self.network_utils.diff_details(host, details)
+            if changes:
+                self.update_host_details(host, changes)
+        if added:
+            self.config_manager.save_current_config(self)
+
+    def apply_discovery(self):
+        """Запускает, перенастраивает или останавливает фоновый поиск согласно discovery_pps."""
+        if not self.discovery_pps or not self.polls_printers():
+            if self.discovery_thread is not None:
+                self.discovery_thread.stop()
+                self.discovery_thread.wait()
+                self.discovery_thread = None
+                self.logger.debug("Background discovery stopped")
+            return
+        if self.discovery_thread is None:
+            self.discovery_thread = DiscoveryThread(self.subnets, list(self.known_hosts), self.network_utils,
+                                                    self.discovery_pps)
+            self.discovery_thread.host_found.connect(self.add_discovered_host)
+            self.discovery_thread.start()
+            self.logger.debug(f"Background discovery started at {self.discovery_pps} probes/s")
+        else:
+            self.discovery_thread.set_rate(self.discovery_pps)
+            self.discovery_thread.update_targets(self.subnets, list(self.known_hosts))
+
+    def add_discovered_host(self, record):
+        if record.address in self.known_hosts:
+            return
+        self.add_host_to_table(record)
+        self.config_manager.save_current_config(self)
 
     def check_notification_permissions(self):
         try:
@@ -173,44 +447,116 @@ class MainWindow(QMainWindow):
             return
         menu = QMenu()
         rename_action = menu.addAction("Переименовать")
+        history_action = menu.addAction("История статусов")
+        log_action = menu.addAction("Лог klippy")
+        telemetry_action = menu.addAction("Телеметрия")
+        files_action = menu.addAction("Файлы")
         action = menu.exec(self.table.viewport().mapToGlobal(position))
-        if action == rename_action:
+        if action == history_action:
+            self.show_host_history(self.table.host_at(index.row()))
+        elif action == log_action:
+            self.show_host_log(self.table.host_at(index.row()))
+        elif action == telemetry_action:
+            self.show_host_telemetry(self.table.host_at(index.row()))
+        elif action == files_action:
+            self.show_host_files(self.table.host_at(index.row()))
+        elif action == rename_action:
             row = index.row()
-            host = self.table.item(row, 1).text().lstrip('🟢🔴 ').strip()
-            current_name = self.table.item(row, 0).text().lstrip('▶▼ ').strip()
-            new_name, ok = QInputDialog.getText(self, "Переименовать хост", "Введите новое имя:", text=current_name)
+            host = self.table.host_at(row)
+            if host is None or host not in self.known_hosts:
+                return
+            record = self.known_hosts[host]
+            new_name, ok = QInputDialog.getText(self, "Переименовать хост", "Введите новое имя:",
+                                                text=record.display_name)
             if ok and new_name:
-                self.known_hosts[host]["custom_name"] = new_name
+                record.custom_name = new_name
                 self.config_manager.save_current_config(self)
-                triangle = "▼" if host in self.table.expanded_rows else "▶"
-                self.table.setItem(row, 0, QTableWidgetItem(f"{triangle} {new_name}"))
+                self.table.update_host_state(record)
+                self.fleet_state.update(host, record.display_name, record.state)
                 if host not in self.current_hosts:
                     self.current_hosts.append(host)
                 self.logger.debug(f"Renamed host {host} to {new_name}, current_hosts: {self.current_hosts}")
 
+    def show_host_history(self, host):
+        if host is None:
+            return
+        events = self.notifications.host_history(host)
+        if events:
+            lines = [
+                f"{time.strftime('%d.%m %H:%M:%S', time.localtime(at))} — {state}"
+                f"{' (уведомление)' if delivered else ''}"
+                for at, state, delivered in reversed(events)
+            ]
+        else:
+            lines = ["Изменений статуса пока не было."]
+        name = self.known_hosts[host].display_name if host in self.known_hosts else host
+        QMessageBox.information(self, f"История статусов: {name}", "\n".join(lines))
+
+    def show_host_log(self, host):
+        if host is None:
+            return
+        if self.log_viewer is None:
+            self.log_viewer = LogViewerDialog(self.log_follower, self)
+        name = self.known_hosts[host].display_name if host in self.known_hosts else host
+        self.log_viewer.open_host(host, name)
+
+    def show_host_telemetry(self, host):
+        if host is None:
+            return
+        dialog = self.telemetry_dialogs.get(host)
+        if dialog is None:
+            name = self.known_hosts[host].display_name if host in self.known_hosts else host
+            dialog = TelemetryDialog(host, name, self.telemetry_store, self.telemetry_poller, self)
+            dialog.finished.connect(lambda _, h=host: self.telemetry_dialogs.pop(h, None))
+            self.telemetry_dialogs[host] = dialog
+        dialog.show()
+        dialog.raise_()
+        dialog.activateWindow()
+
+    def show_host_files(self, host):
+        if host is None:
+            return
+        dialog = self.file_browsers.get(host)
+        if dialog is None:
+            name = self.known_hosts[host].display_name if host in self.known_hosts else host
+            dialog = FileBrowserDialog(host, name, self.network_utils, self.file_listing_cache, self.file_loader, self)
+            dialog.finished.connect(lambda _, h=host: self.file_browsers.pop(h, None))
+            self.file_browsers[host] = dialog
+        dialog.show()
+        dialog.raise_()
+        dialog.activateWindow()
+
     def cell_clicked(self, row, column):
-        if column == 5:  # Игнорируем клики по столбцу с кнопками
+        if column in (self.table.COL_ACTIONS, self.table.COL_DETAILS):  # Игнорируем клики по кнопкам и деталям
             return
-        host = self.table.item(row, 1).text().lstrip('🟢🔴 ').strip()
-        if column == 0:  # Клик по имени
+        host = self.table.host_at(row)
+        if host is None:  # Строка с кнопками управления
+            return
+        if column == self.table.COL_NAME:  # Клик по имени
             self.table.toggle_control_row(host)
-        elif column == 1:  # Хост
+        elif column == self.table.COL_HOST:  # Хост
             import webbrowser
             webbrowser.open(f"http://{host}")
             self.logger.debug(f"Opened browser for host: {host}")
-        elif column == 2:  # SSH
+        elif column == self.table.COL_SSH:  # SSH
+            # Доступность порта известна из последнего сканирования — в GUI-потоке сеть не трогаем
+            record = self.known_hosts.get(host)
+            if record is not None and record.ssh is False:
+                QMessageBox.warning(self, "Ошибка SSH",
+                                    f"SSH на {host} не отвечал при последней проверке.")
+                return
             try:
                 open_ssh_terminal(host, self.ssh_user)
                 self.logger.debug(f"Attempted SSH connection for host: {host}")
             except RuntimeError as e:
                 self.logger.error(f"SSH connection failed for {host}: {e}")
                 QMessageBox.critical(self, "Ошибка SSH", f"Не удалось подключиться к {host}: {str(e)}")
-        elif column == 4:  # Камера
+        elif column == self.table.COL_CAMERA:  # Камера
             dialog = WebcamDialog(host, self)
             dialog.exec()
             self.logger.debug(f"Opened webcam dialog for host: {host}")
 
-    def delete_host(self, host, row):
+    def delete_host(self, host):
         reply = QMessageBox.question(
             self,
             "Подтверждение удаления",
@@ -222,11 +568,20 @@ class MainWindow(QMainWindow):
                 del self.known_hosts[host]
             if host in self.current_hosts:
                 self.current_hosts.remove(host)
+            self.fleet_state.remove(host)
+            self.notifications.forget(host)
+            self.telemetry_poller.forget(host)
+            self.network_utils.resolver.forget(host)
+            self.file_listing_cache.forget(host)
+            self.config_sync_cache.forget(host)
+            self.history_store.forget(host)
             # Удаляем строку управления, если она открыта
             if host in self.table.expanded_rows:
                 self.table.removeRow(self.table.expanded_rows[host])
                 del self.table.expanded_rows[host]
-            self.table.removeRow(row)
+            row = self.table.find_host_row(host)
+            if row is not None:
+                self.table.removeRow(row)
             self.config_manager.save_current_config(self)
             self.logger.debug(f"Deleted host {host} from configuration and table")
 
@@ -234,50 +589,121 @@ class MainWindow(QMainWindow):
         self.progress_bar.setValue(int(value))
         self.logger.debug(f"Progress updated: {value}%")
 
+    def update_scan_stats(self, rate, hosts_found, eta):
+        eta_text = f"{int(eta) // 60}:{int(eta) % 60:02d}" if eta >= 0 else "—"
+        self.progress_bar.setFormat(f"%p% · {rate:.0f} проб/с · найдено: {hosts_found} · осталось: {eta_text}")
+
+    def set_scan_controls_visible(self, visible):
+        self.progress_bar.setVisible(visible)
+        self.pause_button.setVisible(visible)
+        self.cancel_scan_button.setVisible(visible)
+        if not visible:
+            self.progress_bar.setFormat("%p%")
+            self.pause_button.setText("Пауза")
+
+    def toggle_scan_pause(self):
+        if not (hasattr(self, "scan_thread") and self.scan_thread.isRunning()):
+            return
+        if self.scan_thread.is_paused:
+            self.scan_thread.resume()
+            self.pause_button.setText("Пауза")
+        else:
+            self.scan_thread.pause()
+            self.pause_button.setText("Продолжить")
+
+    def stop_scan_thread(self):
+        """Останавливает сканирование и фоновые службы перед выходом."""
+        if hasattr(self, "scan_thread") and self.scan_thread.isRunning():
+            self.scan_thread.cancel()
+            self.scan_thread.wait()
+            self.logger.debug("Scan thread stopped on exit")
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        if self.fleet_api is not None:
+            self.fleet_api.stop()
+            self.fleet_api = None
+        if self.coordinator is not None:
+            self.coordinator.stop()
+            self.coordinator = None
+        self.job_loader.shutdown()
+        self.log_follower.shutdown()
+        self.telemetry_poller.shutdown()
+        self.file_loader.shutdown()
+        self.event_exporter.shutdown()
+        if self.discovery_thread is not None:
+            self.discovery_thread.stop()
+            self.discovery_thread.wait()
+        if self.history_thread is not None and self.history_thread.isRunning():
+            self.history_thread.wait()
+
+    def cancel_scan(self):
+        if hasattr(self, "scan_thread") and self.scan_thread.isRunning():
+            self.scan_thread.cancel()
+            self.pause_button.setText("Пауза")
+            self.cancel_scan_button.setEnabled(False)
+            self.logger.debug("Scan cancellation requested by user")
+
     def initialize_table(self):
         self.table.setRowCount(0)
         self.current_hosts = []
-        for host, host_info in self.known_hosts.items():
-            hostname, state = self.network_utils.get_printer_info(host)
-            self.known_hosts[host]["original_name"] = hostname or "Неизвестно"
-            display_name = host_info.get("custom_name") if host_info.get("custom_name") is not None else (
-                        hostname or "Неизвестно")
+        for host, record in self.known_hosts.items():
+            # Не блокируем GUI-поток сетью: имя из кэша или из конфигурации, свежие данные придут с обновлением
+            cached = self.network_utils.peek_printer_info(host)
+            if cached is not None and cached[0] != UNKNOWN_NAME:
+                record.original_name = cached[0]
+            record.state = STATE_OFFLINE
             self.current_hosts.append(host)
             row = self.table.rowCount()
             self.table.insertRow(row)
-            self.table.add_host(row, host, display_name, STATE_OFFLINE, self.known_hosts)
-            self.logger.debug(f"Initialized host {host} with display_name={display_name}")
-
-    def add_host_to_table(self, host, hostname, state):
-        hostname = hostname or "Неизвестно"
-        if host not in self.known_hosts:
-            self.known_hosts[host] = {"original_name": hostname, "custom_name": None}
-            self.logger.debug(f"Added new host {host} with original_name={hostname}")
+            self.table.add_host(row, record)
+            self.logger.debug(f"Initialized host {host} with display_name={record.display_name}")
+
+    def add_host_to_table(self, found):
+        """Принимает HostRecord из потока сканирования и сливает его с известными хостами."""
+        host = found.address
+        record = self.known_hosts.get(host)
+        if record is None:
+            record = self.known_hosts[host] = found
+            self.logger.debug(f"Added new host {host} with original_name={found.original_name}")
         else:
-            self.known_hosts[host]["original_name"] = hostname
-            self.logger.debug(f"Updated original_name for {host} to {hostname}")
-        custom_name = self.known_hosts[host].get("custom_name") if self.known_hosts[host].get(
-            "custom_name") is not None else hostname
-        was_updated = self.table.update_host_state(host, custom_name, state, self.known_hosts)
+            record.merge(found)
+        state = record.state
+        custom_name = record.display_name
+        was_updated = self.table.update_host_state(record)
         if not was_updated:
             self.current_hosts.append(host)
-        if state in self.notification_states and (
-                host not in self.previous_states or self.previous_states[host] != state):
-            try:
-                self.tray_icon.showMessage(
-                    APP_NAME,
-                    f"{custom_name} ({host}) получил статус {state}",
-                    QSystemTrayIcon.MessageIcon.Information,
-                    5000
-                )
-                self.logger.debug(f"Notification sent for {host}: {custom_name} ({host}) получил статус {state}")
-            except Exception as e:
-                self.logger.error(f"Failed to send notification for {host}: {e}")
+        self.fleet_state.update(host, custom_name, state, original_name=record.original_name, ssh=record.ssh)
+        self.telemetry_poller.watch(host, record.online)
+        previous = self.previous_states.get(host)
+        if previous != state:
+            self.notifications.submit(host, custom_name, previous, state)
+            if self.polls_printers():
+                # Ведомые копии не экспортируют: иначе приёмник получил бы смену статуса от каждой копии
+                # под разными id
+                self.event_exporter.publish("state", host=host, name=custom_name, previous=previous, state=state)
         self.previous_states[host] = state
 
+    def deliver_notifications(self):
+        message = self.notifications.flush(self.notification_states)
+        if message is None:
+            return
+        try:
+            self.tray_icon.showMessage(APP_NAME, message, QSystemTrayIcon.MessageIcon.Information, 5000)
+            self.logger.debug(f"Notification sent: {message}")
+        except Exception as e:
+            self.logger.error(f"Failed to send notification: {e}")
+
+    def update_host_details(self, host, changes):
+        """Принимает только изменившиеся поля расширенного статуса."""
+        self.table.update_host_details(host, changes)
+        self.fleet_state.update_fields(host, changes)
+        if "filename" in changes:
+            self.job_loader.request(host, changes["filename"])
+
     def handle_thread_error(self, message, auto=False):
         QMessageBox.critical(self, "Ошибка", message)
-        self.progress_bar.setVisible(False)
+        self.set_scan_controls_visible(False)
         if not auto:
             self.scan_button.setEnabled(True)
             self.refresh_button.setEnabled(True)
@@ -290,17 +716,36 @@ class MainWindow(QMainWindow):
             return
         self.scan_button.setEnabled(False)
         self.refresh_button.setEnabled(False)
-        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.cancel_scan_button.setEnabled(True)
+        self.set_scan_controls_visible(True)
 
-        self.scan_thread = ScanThread(self.subnets, self.known_hosts.keys(), self.network_utils)
+        self.scan_thread = ScanThread(self.subnets, list(self.known_hosts), self.network_utils,
+                                      max_pps=self.scan_rate_limit, status_fields=self.active_status_fields(),
+                                      processes=self.scan_processes)
         self.scan_thread.host_found.connect(self.add_host_to_table)
+        self.scan_thread.details_changed.connect(self.update_host_details)
         self.scan_thread.progress_updated.connect(self.update_progress)
+        self.scan_thread.stats_updated.connect(self.update_scan_stats)
         self.scan_thread.error_occurred.connect(lambda message: self.handle_thread_error(message, auto=False))
         self.scan_thread.scan_finished.connect(lambda hosts: self.finish_scan(hosts, auto=False))
+        self.scan_thread.finished.connect(self.finish_profiled_cycle)
+        if self.discovery_thread is not None:
+            # Полное сканирование и так проверяет все адреса — фоновый поиск ждёт его окончания
+            self.discovery_thread.pause()
+            self.scan_thread.finished.connect(self.discovery_thread.resume)
+        self.profiler.cycle_started()
         self.scan_thread.start()
         self.logger.debug("Started network scan")
 
+    def active_status_fields(self):
+        """Поля расширенного статуса для потока сканирования; None — обычный режим /printer/info."""
+        return list(self.status_fields) if self.rich_status else None
+
     def refresh_hosts(self, auto=False):
+        if auto and not self.polls_printers():
+            # Состояние парка приходит от ведущей копии
+            return
         # Не запускаем второй поток обновления, если предыдущий ещё идёт
         if hasattr(self, "scan_thread") and self.scan_thread.isRunning():
             self.logger.debug(f"Refresh requested (auto={auto}) but a scan is already running; skipping")
@@ -308,34 +753,40 @@ class MainWindow(QMainWindow):
         if not auto:
             self.scan_button.setEnabled(False)
             self.refresh_button.setEnabled(True)
-        self.scan_thread = ScanThread([], self.known_hosts.keys(), self.network_utils)
+        self.scan_thread = ScanThread([], list(self.known_hosts), self.network_utils,
+                                      max_pps=self.scan_rate_limit, status_fields=self.active_status_fields())
         self.scan_thread.host_found.connect(self.add_host_to_table)
+        self.scan_thread.details_changed.connect(self.update_host_details)
         self.scan_thread.progress_updated.connect(self.update_progress)
         self.scan_thread.error_occurred.connect(lambda message: self.handle_thread_error(message, auto))
         self.scan_thread.scan_finished.connect(lambda hosts: self.finish_scan(hosts, auto))
+        self.scan_thread.finished.connect(self.finish_profiled_cycle)
+        self.profiler.cycle_started()
         self.scan_thread.start()
         self.logger.debug(f"Started refresh hosts (auto={auto})")
 
-    def finish_scan(self, hosts, auto):
-        new_hosts = {}
-        for host in hosts:
-            hostname, _ = self.network_utils.get_printer_info(host)
-            hostname = hostname or "Неизвестно"
-            new_hosts[host] = {
-                "original_name": hostname,
-                "custom_name": self.known_hosts.get(host, {}).get("custom_name", None)
-            }
-            self.logger.debug(f"Scanned host {host} with original_name={hostname}")
-        for host in self.known_hosts:
-            if host not in new_hosts:
-                new_hosts[host] = self.known_hosts[host]
-        self.known_hosts = new_hosts
+    def finish_scan(self, records, auto):
+        # Записи уже слиты в known_hosts по сигналу host_found — повторные запросы не нужны
         self.config_manager.save_current_config(self)
-        self.progress_bar.setVisible(False)
+        if self.discovery_thread is not None:
+            self.discovery_thread.update_targets(known_hosts=list(self.known_hosts))
+        self.set_scan_controls_visible(False)
         if not auto:
             self.scan_button.setEnabled(True)
             self.refresh_button.setEnabled(True)
-        self.logger.debug(f"Scan finished, updated hosts: {new_hosts}")
+        self.logger.debug(f"Scan finished, updated hosts: {records}")
+
+    def finish_profiled_cycle(self):
+        report = self.profiler.cycle_finished()
+        if report is None:
+            return
+        top = report["hot_spots"][0][2] if report["hot_spots"] else "—"
+        try:
+            self.tray_icon.showMessage(APP_NAME, f"Профиль {report['cycles']} циклов записан рядом с логом.\n"
+                                                 f"Горячая точка: {top}",
+                                       QSystemTrayIcon.MessageIcon.Information, 5000)
+        except Exception as e:
+            self.logger.error(f"Failed to send profiler notification: {e}")
 
     def closeEvent(self, event):
         reply = QMessageBox.question(
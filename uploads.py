@@ -0,0 +1,170 @@
+# uploads.py
+
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt6.QtCore import QThread, pyqtSignal
+from scan_control import RateLimiter
+from utils import UPLOAD_CHUNK_SIZE, UPLOAD_CACHE_CHUNKS, UPLOAD_MAX_PARALLEL
+
+
+class ChunkCache:
+    """Общие для всех загрузок блоки файла: ограниченное число последних прочитанных блоков в памяти.
+
+    Загрузки идут примерно вровень, поэтому блок читается с диска один раз и
+    отдаётся всем; отставшая загрузка просто перечитывает вытесненный блок.
+    """
+
+    def __init__(self, path, chunk_size=UPLOAD_CHUNK_SIZE, max_chunks=UPLOAD_CACHE_CHUNKS):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.size = os.path.getsize(path)
+        self._lock = threading.Lock()
+        self._file = open(path, "rb")
+        self._chunks = OrderedDict()
+        self.reads = 0
+
+    def get(self, index):
+        with self._lock:
+            chunk = self._chunks.get(index)
+            if chunk is None:
+                self._file.seek(index * self.chunk_size)
+                chunk = self._file.read(self.chunk_size)
+                self.reads += 1
+                self._chunks[index] = chunk
+                while len(self._chunks) > self.max_chunks:
+                    self._chunks.popitem(last=False)
+            else:
+                self._chunks.move_to_end(index)
+            return chunk
+
+    def close(self):
+        with self._lock:
+            self._chunks.clear()
+            self._file.close()
+
+
+class MultipartFileStream:
+    """Тело multipart/form-data для /server/files/upload, читаемое потоком.
+
+    requests передаёт объект с read() и __len__ по частям с Content-Length,
+    не собирая тело в памяти. Каждая порция файла проходит общий ограничитель
+    скорости, а progress(sent) вызывается по мере отправки.
+    """
+
+    def __init__(self, chunks, filename, fields=None, limiter=None, progress=None):
+        self.chunks = chunks
+        self.limiter = limiter
+        self.progress = progress
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = b""
+        for name, value in (fields or {}).items():
+            head += (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n"
+                     f"{value}\r\n").encode("utf-8")
+        head += (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+                 f"Content-Type: application/octet-stream\r\n\r\n").encode("utf-8")
+        self._head = head
+        self._tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+        self._length = len(head) + chunks.size + len(self._tail)
+        self._position = 0
+        self.sent = 0
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.chunks.chunk_size
+        position = self._position
+        head_end = len(self._head)
+        file_end = head_end + self.chunks.size
+        if position < head_end:
+            data = self._head[position:position + size]
+        elif position < file_end:
+            offset = position - head_end
+            index, start = divmod(offset, self.chunks.chunk_size)
+            data = self.chunks.get(index)[start:start + size]
+            if self.limiter is not None:
+                self.limiter.acquire(len(data))
+        else:
+            data = self._tail[position - file_end:position - file_end + size]
+        self._position += len(data)
+        if position < file_end and self._position > head_end:
+            self.sent = min(self._position, file_end) - head_end
+            if self.progress is not None:
+                self.progress(self.sent)
+        return data
+
+
+class UploadThread(QThread):
+    """Параллельная потоковая загрузка одного файла на несколько принтеров."""
+
+    # Хост, отправлено байт, размер файла
+    progress_updated = pyqtSignal(str, int, int)
+    # Хост, успех, сообщение
+    host_finished = pyqtSignal(str, bool, str)
+    upload_finished = pyqtSignal(int, int)  # успешно, всего
+
+    def __init__(self, path, hosts, network_utils, bandwidth_limit=0, start_print=False):
+        super().__init__()
+        self.path = path
+        self.hosts = list(hosts)
+        self.network_utils = network_utils
+        # Общий лимит скорости всех загрузок, байт/с (0 — без ограничения)
+        self.limiter = RateLimiter(bandwidth_limit)
+        self.start_print = start_print
+        self.logger = logging.getLogger(__name__)
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def _upload(self, host, chunks):
+        filename = os.path.basename(self.path)
+        last_percent = [-1]
+
+        def progress(sent):
+            if self._cancel_event.is_set():
+                raise InterruptedError("Загрузка отменена")
+            percent = sent * 100 // chunks.size if chunks.size else 100
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                self.progress_updated.emit(host, sent, chunks.size)
+
+        fields = {"root": "gcodes"}
+        if self.start_print:
+            fields["print"] = "true"
+        body = MultipartFileStream(chunks, filename, fields, self.limiter, progress)
+        return self.network_utils.upload_file(host, body)
+
+    def run(self):
+        try:
+            chunks = ChunkCache(self.path)
+        except OSError as e:
+            self.logger.error(f"Failed to open {self.path} for upload: {e}")
+            for host in self.hosts:
+                self.host_finished.emit(host, False, str(e))
+            self.upload_finished.emit(0, len(self.hosts))
+            return
+        self.logger.debug(f"Uploading {self.path} ({chunks.size} bytes) to {len(self.hosts)} hosts")
+        succeeded = 0
+        try:
+            with ThreadPoolExecutor(max_workers=UPLOAD_MAX_PARALLEL, thread_name_prefix="upload") as executor:
+                futures = {executor.submit(self._upload, host, chunks): host for host in self.hosts}
+                for future in as_completed(futures):
+                    host = futures[future]
+                    try:
+                        ok, message = future.result()
+                    except Exception as e:
+                        ok, message = False, str(e)
+                    succeeded += ok
+                    self.host_finished.emit(host, ok, message)
+        finally:
+            self.logger.debug(f"Upload finished: {succeeded}/{len(self.hosts)} hosts, {chunks.reads} chunk reads")
+            chunks.close()
+        self.upload_finished.emit(succeeded, len(self.hosts))
@@ -4,7 +4,6 @@ from __future__ import annotations
 import os
 import platform
 import subprocess
-import socket
 import logging
 import shutil
 from config import ConfigManager
@@ -17,11 +16,43 @@ DEFAULT_MOONRAKER_PORT: int = 7125
 DEFAULT_HTTP_TIMEOUT_S: int = 2
 DEFAULT_SSH_PORT: int = 22
 SCAN_CONNECT_TIMEOUT_S: int = 1
+# Сколько секунд результат проверки SSH-порта считается актуальным
+SSH_CHECK_TTL_S: int = 60
+
+# Адаптивные тайм-ауты подключения (по RTT подсети); нижняя граница оставляет запас
+# медленным Wi-Fi-принтерам в подсети, где остальные хосты отвечают за миллисекунды
+SCAN_TIMEOUT_MIN_S: float = 0.3
+SCAN_TIMEOUT_MAX_S: float = 3.0
 
 # Сканирование сети
-KNOWN_HOSTS_WORKERS: int = 20
 SUBNET_SCAN_WORKERS: int = 100
 
+# Автоопределение подсетей: интерфейсы, которые не сканируются (по началу системного имени или
+# вхождению в отображаемое имя), и самая широкая подсеть — более широкие сужаются вокруг своего адреса
+SCAN_AUTO_SKIP_INTERFACES: tuple = ("docker", "br-", "veth", "virbr", "vmnet", "vboxnet", "vethernet", "virtualbox",
+                                    "vmware", "hyper-v", "tun", "tap", "wg", "utun", "ppp", "ipsec", "tailscale",
+                                    "zerotier", "wireguard", "vpn")
+SCAN_AUTO_MIN_PREFIX: int = 20
+
+# AIMD-управление параллелизмом сканирования
+SCAN_MIN_WORKERS: int = 4
+SCAN_MAX_WORKERS: int = 256
+AIMD_INCREASE_STEP: int = 2
+AIMD_DECREASE_FACTOR: float = 0.5
+
+# Фоновый поиск новых принтеров: проверок/с по умолчанию (0 — выключен), параллельных проверок,
+# пауза между полными обходами подсетей
+DEFAULT_DISCOVERY_PPS: int = 0
+DISCOVERY_MAX_WORKERS: int = 16
+DISCOVERY_PASS_PAUSE_S: int = 60
+
+# Многопроцессное сканирование: размер шарда (адресов), минимальный объём подсетей для запуска процессов,
+# интервал пачек результатов, сколько шардов на процесс отправляется в пул заранее
+SCAN_SHARD_SIZE: int = 4096
+SCAN_SHARD_MIN_HOSTS: int = 8192
+SCAN_SHARD_BATCH_INTERVAL_S: float = 0.2
+SCAN_SHARD_PREFETCH: int = 2
+
 # UI интервалы
 REFRESH_INTERVAL_MS: int = 5000
 AUTO_REFRESH_INTERVAL_MS: int = 5000
@@ -32,6 +63,101 @@ PROGRESS_EMIT_STEP: int = 32
 # Состояния
 STATE_OFFLINE: str = "Оффлайн"
 
+# Загрузка G-code на принтеры: размер блока чтения, число общих блоков в памяти, параллельных загрузок
+UPLOAD_CHUNK_SIZE: int = 256 * 1024
+UPLOAD_CACHE_CHUNKS: int = 16
+UPLOAD_MAX_PARALLEL: int = 8
+UPLOAD_READ_TIMEOUT_S: int = 60
+
+# Синхронизация конфигурации Klipper: параллельно обрабатываемых хостов, расширения синхронизируемых файлов
+CONFIG_SYNC_MAX_PARALLEL: int = 16
+CONFIG_SYNC_EXTENSIONS: tuple = (".cfg", ".conf")
+
+# Дисковый кэш метаданных заданий и миниатюр
+JOB_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+JOB_CACHE_WORKERS: int = 4
+JOB_THUMBNAIL_MAX_WIDTH: int = 64
+JOB_THUMBNAIL_ICON_SIZE: int = 32
+
+# Синхронизация истории печати: размер страницы, параллельных хостов, период
+HISTORY_PAGE_SIZE: int = 100
+HISTORY_SYNC_WORKERS: int = 4
+HISTORY_SYNC_INTERVAL_MS: int = 10 * 60 * 1000
+
+# Просмотр удалённых логов: начальный хвост, локальный кэш на лог, период опроса, строк в окне
+LOG_TAIL_BYTES: int = 64 * 1024
+LOG_CACHE_MAX_BYTES: int = 1024 * 1024
+LOG_POLL_INTERVAL_MS: int = 2000
+LOG_TAIL_WORKERS: int = 4
+LOG_VIEW_MAX_LINES: int = 5000
+
+# Браузер файлов принтера: период обновления открытого каталога, параллельных запросов,
+# доля изменившихся строк, начиная с которой модель перестраивается целиком
+FILE_BROWSER_REFRESH_MS: int = 15000
+FILE_BROWSER_WORKERS: int = 2
+FILE_BROWSER_RESET_FRACTION: float = 0.5
+
+# Телеметрия (температуры, /machine/proc_stats): период опроса хостов с открытым окном, глубина истории
+# на хост, параллельных запросов, период фонового сбора со всех хостов (0 — выключен), сколько секунд
+# температуры из расширенного статуса считаются свежими и заменяют отдельный запрос
+TELEMETRY_INTERVAL_MS: int = 2000
+TELEMETRY_HISTORY_SIZE: int = 900
+TELEMETRY_WORKERS: int = 8
+DEFAULT_TELEMETRY_INTERVAL_S: int = 0
+TELEMETRY_STATUS_MAX_AGE_S: float = 12.0
+
+# Уведомления: период сборки сводки, лимит сообщений в минуту, глубина истории на хост
+NOTIFICATION_BATCH_INTERVAL_MS: int = 2000
+NOTIFICATION_MAX_PER_MINUTE: int = 6
+NOTIFICATION_HISTORY_SIZE: int = 50
+NOTIFICATION_SUMMARY_NAMES: int = 3
+
+# Кэш /printer/info: TTL успешных и неудачных ответов, окно stale-while-revalidate
+PRINTER_INFO_TTL_S: int = 30
+PRINTER_INFO_NEGATIVE_TTL_S: int = 5
+PRINTER_INFO_STALE_TTL_S: int = 300
+PRINTER_INFO_CACHE_MIN_SIZE: int = 256
+PRINTER_INFO_REFRESH_WORKERS: int = 4
+
+# Разрешение DNS-имён известных хостов: TTL адреса и ошибки, окно отдачи устаревшего адреса,
+# параллельных запросов, ожидание пакетного разрешения перед обновлением
+RESOLVER_TTL_S: int = 300
+RESOLVER_NEGATIVE_TTL_S: int = 30
+RESOLVER_STALE_TTL_S: int = 3600
+RESOLVER_WORKERS: int = 8
+RESOLVER_BATCH_TIMEOUT_S: float = 3.0
+
+# Профилирование циклов сканирования: период снятия стеков, строк в списке горячих точек
+PROFILE_SAMPLE_INTERVAL_S: float = 0.01
+PROFILE_TOP_N: int = 20
+
+# Метрики: размер окна наблюдений для квантилей, порт экспорта Prometheus (0 — выключен)
+METRICS_SAMPLE_WINDOW: int = 1024
+DEFAULT_METRICS_PORT: int = 0
+
+# Экспорт событий во внешние приёмники: очередь в памяти на приёмник, размер пакета, период отправки
+# неполного пакета, задержки повтора, таймаут запроса, предел файла недоставленных событий и какая его
+# доля освобождается от самых старых событий при переполнении
+EXPORT_QUEUE_SIZE: int = 5000
+EXPORT_BATCH_SIZE: int = 100
+EXPORT_FLUSH_INTERVAL_S: float = 2.0
+EXPORT_RETRY_BASE_S: float = 1.0
+EXPORT_RETRY_MAX_S: float = 60.0
+EXPORT_HTTP_TIMEOUT_S: float = 5.0
+EXPORT_SPOOL_MAX_BYTES: int = 50 * 1024 * 1024
+EXPORT_SPOOL_TRIM_FRACTION: float = 0.1
+
+# Локальный API состояния парка (0 — выключен)
+DEFAULT_FLEET_API_PORT: int = 0
+FLEET_API_SSE_KEEPALIVE_S: int = 15
+FLEET_API_SSE_QUEUE_SIZE: int = 1000
+
+# Координация нескольких копий приложения: порт UDP-маяков и API ведущего (0 — выключена),
+# период маяков, через сколько секунд без маяков ведущий считается пропавшим
+DEFAULT_COORDINATION_PORT: int = 0
+COORDINATION_BEACON_INTERVAL_S: float = 1.0
+COORDINATION_LEADER_TIMEOUT_S: float = 3.5
+
 
 def setup_logging(log_level="INFO"):
     """Настраивает логирование в файл и консоль."""
@@ -70,14 +196,6 @@ def open_ssh_terminal(host, ssh_user=""):
         logger.error("SSH client not found in PATH")
         raise RuntimeError("SSH client not found. Please install OpenSSH and ensure 'ssh' is in PATH")
 
-    # Test host reachability
-    try:
-        socket.create_connection((host, DEFAULT_SSH_PORT), timeout=2)
-        logger.debug(f"Host {host} is reachable on port {DEFAULT_SSH_PORT}")
-    except (socket.timeout, socket.gaierror, ConnectionRefusedError) as e:
-        logger.error(f"Host {host} is not reachable on port {DEFAULT_SSH_PORT}: {e}")
-        raise RuntimeError(f"Cannot connect to {host}: Host is unreachable or SSH is not available")
-
     try:
         system_name = platform.system()
         if system_name == "Windows":